@@ -1,5 +0,0 @@
-# 模型包初始化文件
-from .base import Base
-from .plant import Plant
-from .material import Material
-from .project import Project
@@ -1,22 +0,0 @@
-landscape_lab/
-├── main.py
-├── database/
-│   └── db.py
-├── models/
-│   ├── user.py
-│   ├── plant.py
-│   ├── material.py
-│   └── project.py
-├── controllers/
-│   ├── user_controller.py
-│   ├── plant_controller.py
-│   ├── material_controller.py
-│   └── project_controller.py
-├── views/
-│   ├── user_view.py
-│   ├── plant_view.py
-│   ├── material_view.py
-│   └── project_view.py
-└── utils/
-    ├── file_utils.py
-    └── analysis_utils.py
\ No newline at end of file
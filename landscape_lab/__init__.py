@@ -0,0 +1,2 @@
+"""Landscape Lab：景观设计实验平台"""
+__version__ = "0.1"
@@ -0,0 +1,61 @@
+# landscape_lab/benchmarks/bench_analysis.py
+"""分析函数微基准"""
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict
+
+from .datagen import (
+    generate_plant_positions,
+    write_dxf_file,
+    write_image_file,
+    write_scene_file
+)
+from .timing import measure
+
+def run_analysis_benchmarks(workdir: str,
+                            plant_count: int = 10_000,
+                            dxf_entities: int = 100_000,
+                            image_size: int = 4096,
+                            repeat: int = 5) -> Dict[str, Any]:
+    """运行分析函数基准，返回各函数的耗时统计"""
+    from ..utils.analysis_utils import (
+        analyze_plant_distribution,
+        calculate_coverage_area,
+        calculate_sunlight_exposure,
+        parse_dxf_file
+    )
+    from ..utils.file_utils import generate_thumbnail
+    from ..utils.growth_utils import simulate_growth
+
+    workdir = Path(workdir)
+    scene_path = write_scene_file(str(workdir / "plants.glb"), plant_count)
+    dxf_path = write_dxf_file(str(workdir / "site.dxf"), dxf_entities)
+    image_path = write_image_file(str(workdir / "photo.png"), image_size, image_size)
+
+    positions = generate_plant_positions(plant_count, seed=0).tolist()
+    plant_stats = {"synthetic": {"count": len(positions), "positions": positions}}
+    mature_heights = [8.0] * plant_count
+    mature_spreads = [6.0] * plant_count
+    growth_rates = ["medium"] * plant_count
+
+    params = {
+        "plant_count": plant_count,
+        "dxf_entities": dxf_entities,
+        "image_size": image_size,
+    }
+    return {
+        "analyze_plant_distribution": {
+            **measure(analyze_plant_distribution, scene_path, repeat=repeat), **params},
+        "calculate_coverage_area": {
+            **measure(calculate_coverage_area, plant_stats, repeat=repeat), **params},
+        "parse_dxf_file": {
+            **measure(parse_dxf_file, dxf_path, repeat=repeat), **params},
+        "calculate_sunlight_exposure": {
+            **measure(calculate_sunlight_exposure, positions, datetime(2024, 6, 21, 12),
+                      31.23, 121.47, repeat=repeat), **params},
+        "generate_thumbnail": {
+            **measure(generate_thumbnail, image_path, repeat=repeat), **params},
+        "simulate_growth": {
+            **measure(simulate_growth, positions, mature_heights, mature_spreads, growth_rates,
+                      years=20, repeat=repeat), **params},
+    }
@@ -0,0 +1,118 @@
+# landscape_lab/benchmarks/bench_api.py
+"""API负载测试（进程内ASGI客户端，不经过网络）"""
+import asyncio
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from .datagen import SCALES, isolated_database, populate_database
+from .timing import summarize
+
+# 只读接口：(名称, 路径)
+READ_ENDPOINTS: List[Tuple[str, str]] = [
+    ("list_plants", "/api/plants/?limit=100"),
+    ("search_plants", "/api/plants/?search=银杏&limit=100"),
+    ("get_plant", "/api/plants/{plant_id}"),
+    ("list_materials", "/api/materials/?limit=100"),
+    ("search_materials", "/api/materials/?search=stone&limit=100"),
+    ("list_projects", "/api/projects/?limit=100"),
+    ("search_projects", "/api/projects/?search=project-1&limit=100"),
+    ("get_project", "/api/projects/{project_id}"),
+]
+
+PLANT_PAYLOAD = {
+    "name": "bench-plant",
+    "scientific_name": "Benchmarkia testii",
+    "height": 3.0,
+    "spread": 2.0,
+}
+
+async def _run_load(client, request_factory, total: int, concurrency: int) -> Dict[str, Any]:
+    """以固定并发执行请求，统计延迟与吞吐"""
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            ok = await request_factory(client, i)
+            latencies.append(time.perf_counter() - start)
+            if not ok:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    result = summarize(latencies)
+    result.update({
+        "throughput": total / elapsed,
+        "errors": errors,
+        "concurrency": concurrency,
+    })
+    return result
+
+def _read_request(path: str, headers: Dict[str, str]):
+    async def request(client, i):
+        response = await client.get(path, headers=headers)
+        return response.status_code < 400
+    return request
+
+def _crud_request(headers: Dict[str, str]):
+    async def request(client, i):
+        payload = dict(PLANT_PAYLOAD, name=f"bench-plant-{i}")
+        created = await client.post("/api/plants/", json=payload, headers=headers)
+        if created.status_code >= 400:
+            return False
+        plant_id = created.json()["id"]
+        updated = await client.put(f"/api/plants/{plant_id}", json={"height": 4.0}, headers=headers)
+        deleted = await client.delete(f"/api/plants/{plant_id}", headers=headers)
+        return updated.status_code < 400 and deleted.status_code < 400
+    return request
+
+def _prepare_database(session_factory, scale: str) -> Dict[str, str]:
+    """写入合成数据并签发管理员令牌"""
+    from ..models.user import User
+    from ..utils.security import create_access_token
+
+    db = session_factory()
+    try:
+        admin = User(username="bench-admin", email="bench@example.com",
+                     hashed_password="!", is_admin=True)
+        db.add(admin)
+        db.commit()
+        populate_database(db, scale, owner_ids=[admin.id])
+    finally:
+        db.close()
+    return {"Authorization": f"Bearer {create_access_token({'sub': 'bench-admin'})}"}
+
+def run_api_benchmarks(workdir: str,
+                       scale: str = "10k",
+                       requests: int = 500,
+                       concurrency: int = 16) -> Dict[str, Any]:
+    """运行CRUD与搜索接口的负载测试（使用 workdir 下的独立数据库）"""
+    import httpx
+
+    from ..main import app
+
+    count = SCALES[scale]
+    ids = {"plant_id": count // 2, "project_id": count // 2}
+
+    async def run_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            results = {}
+            for name, path in READ_ENDPOINTS:
+                results[name] = await _run_load(
+                    client, _read_request(path.format(**ids), headers), requests, concurrency)
+            results["crud_plant_cycle"] = await _run_load(
+                client, _crud_request(headers), max(1, requests // 5), concurrency)
+            return results
+
+    with isolated_database(str(Path(workdir) / "bench.db")) as (_, session_factory):
+        headers = _prepare_database(session_factory, scale)
+        results = asyncio.run(run_all())
+    for result in results.values():
+        result["scale"] = scale
+    return results
@@ -0,0 +1,46 @@
+# landscape_lab/benchmarks/bench_startup.py
+"""应用启动耗时基准：在新的解释器进程中测量模块导入时间"""
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from .timing import summarize
+
+# 包所在目录（仓库根目录），未安装时也能导入 landscape_lab
+APP_ROOT = Path(__file__).resolve().parent.parent.parent
+# 需测量导入耗时的模块
+STARTUP_MODULES = ["landscape_lab.main", "landscape_lab.utils.analysis_utils"]
+
+def _import_once(module: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import {module}"], cwd=APP_ROOT, check=True)
+    return time.perf_counter() - start
+
+def top_imports(module: str, limit: int = 15) -> List[Dict[str, Any]]:
+    """解析 -X importtime 输出，返回累计耗时最高的导入"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=APP_ROOT, capture_output=True, text=True, check=True
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # 格式: "import time:   self[us] | cumulative[us] | module"
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append({"module": name.strip(), "cumulative_ms": int(cumulative_us) / 1000})
+    entries.sort(key=lambda entry: entry["cumulative_ms"], reverse=True)
+    return entries[:limit]
+
+def run_startup_benchmarks(repeat: int = 5) -> Dict[str, Any]:
+    """测量各模块在新进程中的导入耗时"""
+    results = {}
+    for module in STARTUP_MODULES:
+        samples = [_import_once(module) for _ in range(repeat)]
+        results[f"import_{module.replace('.', '_')}"] = {
+            **summarize(samples),
+            "top_imports": top_imports(module),
+        }
+    return results
@@ -0,0 +1,212 @@
+# landscape_lab/benchmarks/datagen.py
+"""基准测试用的合成数据生成"""
+import random
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+# 数据规模
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+# 批量写入数据库的行数
+INSERT_BATCH_SIZE = 10_000
+
+SPECIES = [
+    ("Acer palmatum", "鸡爪槭"), ("Ginkgo biloba", "银杏"), ("Cinnamomum camphora", "香樟"),
+    ("Magnolia grandiflora", "广玉兰"), ("Prunus serrulata", "樱花"), ("Osmanthus fragrans", "桂花"),
+    ("Salix babylonica", "垂柳"), ("Pinus thunbergii", "黑松"), ("Buxus sinica", "黄杨"),
+    ("Nandina domestica", "南天竹"),
+]
+GROWTH_RATES = ["slow", "medium", "fast"]
+SUNLIGHT = ["full sun", "partial shade", "full shade"]
+WATER = ["low", "medium", "high"]
+SOILS = ["clay", "loam", "sand", "acidic", "alkaline"]
+MATERIAL_TYPES = ["stone", "wood", "concrete", "metal", "gravel", "brick"]
+PROJECT_STATUSES = ["planning", "design", "construction", "completed"]
+
+def generate_plants(count: int, seed: int = 0) -> Iterator[Dict]:
+    """生成植物数据行"""
+    rng = random.Random(seed)
+    for i in range(count):
+        scientific_name, name = SPECIES[i % len(SPECIES)]
+        yield {
+            "name": f"{name}-{i}",
+            "scientific_name": f"{scientific_name} var. {i}",
+            "description": "synthetic plant",
+            "height": round(rng.uniform(0.3, 30.0), 2),
+            "spread": round(rng.uniform(0.3, 15.0), 2),
+            "growth_rate": rng.choice(GROWTH_RATES),
+            "sunlight": rng.choice(SUNLIGHT),
+            "water_requirements": rng.choice(WATER),
+            "soil_type": rng.choice(SOILS),
+            "hardiness_zone": str(rng.randint(3, 11)),
+        }
+
+def generate_materials(count: int, seed: int = 0) -> Iterator[Dict]:
+    """生成材料数据行"""
+    rng = random.Random(seed)
+    for i in range(count):
+        material_type = rng.choice(MATERIAL_TYPES)
+        yield {
+            "name": f"{material_type}-{i}",
+            "type": material_type,
+            "description": "synthetic material",
+            "unit": rng.choice(["m2", "m3", "t", "pcs"]),
+            "unit_price": round(rng.uniform(5, 2000), 2),
+            "density": round(rng.uniform(0.3, 8.0), 2),
+            "strength": round(rng.uniform(1, 100), 1),
+            "color": rng.choice(["grey", "red", "brown", "white", "black"]),
+        }
+
+def generate_projects(count: int, owner_ids: List[int], seed: int = 0) -> Iterator[Dict]:
+    """生成项目数据行"""
+    rng = random.Random(seed)
+    for i in range(count):
+        yield {
+            "name": f"project-{i}",
+            "description": "synthetic project",
+            "location": f"site-{rng.randint(1, 500)}",
+            "area": round(rng.uniform(100, 1_000_000), 1),
+            "status": rng.choice(PROJECT_STATUSES),
+            "owner_id": rng.choice(owner_ids),
+        }
+
+@contextmanager
+def isolated_database(path: str) -> Iterator[Tuple]:
+    """将应用的数据库会话与操作日志切换到独立的SQLite文件，产出 (引擎, 会话工厂)
+
+    配置在导入时即已读取，修改 SQLALCHEMY_DATABASE_URL 环境变量不会生效，
+    因此通过 dependency_overrides 替换 get_db；退出前写完操作日志，再释放连接。
+    """
+    from sqlalchemy.orm import sessionmaker
+
+    from ..database import create_database_engine, get_db, init_db
+    from ..main import app
+    from ..utils.audit import start_audit_writer, stop_audit_writer
+
+    engine = create_database_engine(f"sqlite:///{path}")
+    init_db(engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def get_isolated_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = get_isolated_db
+    start_audit_writer(bind=engine)
+    try:
+        yield engine, session_factory
+    finally:
+        stop_audit_writer()
+        app.dependency_overrides.pop(get_db, None)
+        engine.dispose()
+
+def bulk_insert(db, table, rows: Iterator[Dict]) -> int:
+    """分批写入数据行"""
+    total = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= INSERT_BATCH_SIZE:
+            db.execute(table.insert(), batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        db.execute(table.insert(), batch)
+        total += len(batch)
+    db.commit()
+    return total
+
+def populate_database(db, scale: str, owner_ids: List[int], seed: int = 0) -> Dict[str, int]:
+    """按规模向数据库写入植物、材料与项目"""
+    from ..models.material import Material
+    from ..models.plant import Plant
+    from ..models.project import Project
+
+    count = SCALES[scale]
+    return {
+        "plants": bulk_insert(db, Plant.__table__, generate_plants(count, seed)),
+        "materials": bulk_insert(db, Material.__table__, generate_materials(count, seed)),
+        "projects": bulk_insert(db, Project.__table__, generate_projects(count, owner_ids, seed)),
+    }
+
+def generate_plant_positions(count: int, seed: int = 0) -> np.ndarray:
+    """生成平面上随机分布的植物坐标"""
+    rng = np.random.default_rng(seed)
+    side = max(1.0, np.sqrt(count) * 5.0)
+    positions = rng.uniform(0, side, size=(count, 3))
+    positions[:, 2] = 0.0
+    return positions
+
+def write_obj_file(path: str, plant_count: int, seed: int = 0) -> str:
+    """生成OBJ模型：每株植物为一个立方体对象"""
+    import trimesh
+
+    box = trimesh.creation.box(extents=(1.0, 1.0, 3.0))
+    lines = []
+    offset = 1
+    for i, position in enumerate(generate_plant_positions(plant_count, seed)):
+        lines.append(f"o plant_{SPECIES[i % len(SPECIES)][0].replace(' ', '_')}_{i}")
+        lines.extend(f"v {x:.3f} {y:.3f} {z:.3f}" for x, y, z in box.vertices + position)
+        lines.extend(f"f {a + offset} {b + offset} {c + offset}" for a, b, c in box.faces)
+        offset += len(box.vertices)
+    Path(path).write_text("\n".join(lines) + "\n")
+    return path
+
+def write_scene_file(path: str, plant_count: int, seed: int = 0) -> str:
+    """生成带命名节点的场景模型（GLB等），植物以实例节点表示"""
+    import trimesh
+
+    scene = trimesh.Scene()
+    geometries = {
+        species: trimesh.creation.cone(radius=1.5, height=4.0)
+        for species, _ in SPECIES
+    }
+    for i, position in enumerate(generate_plant_positions(plant_count, seed)):
+        species = SPECIES[i % len(SPECIES)][0]
+        transform = np.eye(4)
+        transform[:3, 3] = position
+        scene.add_geometry(
+            geometries[species],
+            node_name=f"plant_{species.replace(' ', '_')}_{i}",
+            geom_name=species,
+            transform=transform
+        )
+    scene.export(path)
+    return path
+
+def write_dxf_file(path: str, entity_count: int, seed: int = 0) -> str:
+    """生成DXF图纸：多个图层上的线、圆与文字"""
+    import ezdxf
+
+    rng = random.Random(seed)
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    layers = ["PLANTS", "PAVING", "WATER", "BUILDINGS", "TEXT"]
+    for layer in layers:
+        doc.layers.add(layer)
+    for i in range(entity_count):
+        x, y = rng.uniform(0, 1000), rng.uniform(0, 1000)
+        kind = i % 3
+        if kind == 0:
+            msp.add_line((x, y), (x + rng.uniform(1, 20), y + rng.uniform(1, 20)),
+                         dxfattribs={"layer": rng.choice(layers)})
+        elif kind == 1:
+            msp.add_circle((x, y), radius=rng.uniform(0.5, 5), dxfattribs={"layer": "PLANTS"})
+        else:
+            msp.add_text(f"T{i}", dxfattribs={"layer": "TEXT", "insert": (x, y)})
+    doc.saveas(path)
+    return path
+
+def write_image_file(path: str, width: int, height: int, seed: int = 0) -> str:
+    """生成随机噪声图片"""
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    pixels = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+    Image.fromarray(pixels).save(path)
+    return path
@@ -0,0 +1,140 @@
+# landscape_lab/benchmarks/query_plans.py
+"""查询计划检查：热点接口执行的SQL不得出现全表扫描
+
+在临时SQLite数据库上调用各接口，记录执行的语句并逐条 EXPLAIN QUERY PLAN。
+计划中出现不带索引的 "SCAN <表>" 即视为回退，退出码为1。
+
+    landscape-lab check-plans
+
+分页列表与子串搜索（LIKE '%...%'）本身就是顺序扫描，不在检查范围内。
+"""
+import asyncio
+import re
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# 被检查的接口：(名称, 方法, 路径, 请求体)
+CHECKED_ENDPOINTS: List[Tuple[str, str, str, Optional[dict]]] = [
+    ("plant_statistics", "GET", "/api/plants/statistics/", None),
+    ("material_statistics", "GET", "/api/materials/statistics/", None),
+    ("project_statistics", "GET", "/api/projects/statistics/", None),
+    ("get_plant", "GET", "/api/plants/1", None),
+    ("get_material", "GET", "/api/materials/1", None),
+    ("get_project", "GET", "/api/projects/1", None),
+    ("update_project", "PUT", "/api/projects/1", {"status": "in_progress"}),
+    ("bill_of_quantities", "GET", "/api/projects/1/bill-of-quantities", None),
+    ("create_version", "POST", "/api/projects/1/versions/?version=v1", None),
+    ("create_version_2", "POST", "/api/projects/1/versions/?version=v2", None),
+    ("list_versions", "GET", "/api/projects/1/versions/", None),
+    ("diff_versions", "GET", "/api/projects/1/versions/diff?base_version_id=1&target_version_id=2", None),
+    ("get_version", "GET", "/api/projects/1/versions/2", None),
+]
+
+# 不带 USING INDEX / USING COVERING INDEX / USING INTEGER PRIMARY KEY 的扫描
+FULL_SCAN_PATTERN = re.compile(r"^SCAN (?:TABLE )?(\w+)$")
+
+def _prepare_database(session_factory) -> Dict[str, str]:
+    """写入少量数据并签发管理员令牌"""
+    from ..models.material import Material, MaterialUsage
+    from ..models.plant import Plant, PlantLocation
+    from ..models.project import Project
+    from ..models.user import User
+    from ..utils.security import create_access_token
+
+    db = session_factory()
+    try:
+        admin = User(username="plans-admin", email="plans@example.com",
+                     hashed_password="!", is_admin=True)
+        db.add(admin)
+        db.flush()
+        plant = Plant(name="plans-plant", scientific_name="Plantae testii", category="tree",
+                      created_by=admin.id)
+        material = Material(name="plans-material", type="stone", unit="m2",
+                            unit_price=10.0, created_by=admin.id)
+        project = Project(name="plans-project", owner_id=admin.id)
+        db.add_all([plant, material, project])
+        db.flush()
+        db.add_all([
+            PlantLocation(project_id=project.id, plant_id=plant.id, quantity=2),
+            MaterialUsage(project_id=project.id, material_id=material.id,
+                          quantity=5, unit="m2"),
+        ])
+        db.commit()
+    finally:
+        db.close()
+    return {"Authorization": f"Bearer {create_access_token({'sub': 'plans-admin'})}"}
+
+def find_full_scans(connection, statement: str, parameters) -> List[str]:
+    """返回语句查询计划中的全表扫描"""
+    from ..models.base import Base
+
+    plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    scans = []
+    for row in plan:
+        detail = row[-1]
+        match = FULL_SCAN_PATTERN.match(detail)
+        # 只关心应用表，子查询产生的临时结果不计
+        if match and match.group(1) in Base.metadata.tables:
+            scans.append(detail)
+    return scans
+
+def check_query_plans() -> Dict[str, List[Tuple[str, List[str]]]]:
+    """调用各接口并检查执行的语句，返回 {接口: [(语句, 全表扫描)]}"""
+    import httpx
+    from sqlalchemy import event
+
+    from ..main import app
+    from .datagen import isolated_database
+
+    with tempfile.TemporaryDirectory() as workdir, \
+            isolated_database(str(Path(workdir) / "plans.db")) as (engine, session_factory):
+        headers = _prepare_database(session_factory)
+
+        statements: List[Tuple[str, object]] = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+                statements.append((statement, parameters))
+
+        async def call_endpoints():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://plans") as client:
+                captured = {}
+                for name, method, path, body in CHECKED_ENDPOINTS:
+                    statements.clear()
+                    response = await client.request(method, path, json=body, headers=headers)
+                    if response.status_code >= 400:
+                        raise RuntimeError(f"{name} returned {response.status_code}: {response.text}")
+                    captured[name] = list(statements)
+                return captured
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            captured = asyncio.run(call_endpoints())
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        violations = {}
+        with engine.connect() as connection:
+            for name, executed in captured.items():
+                for statement, parameters in executed:
+                    scans = find_full_scans(connection, statement, parameters)
+                    if scans:
+                        violations.setdefault(name, []).append((statement, scans))
+    return violations
+
+def main() -> int:
+    violations = check_query_plans()
+    if not violations:
+        print(f"No full table scans in {len(CHECKED_ENDPOINTS)} endpoints")
+        return 0
+    for name, items in violations.items():
+        for statement, scans in items:
+            print(f"{name}: {', '.join(scans)}")
+            print(f"    {' '.join(statement.split())}")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
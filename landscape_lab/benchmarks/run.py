@@ -0,0 +1,112 @@
+# landscape_lab/benchmarks/run.py
+"""基准测试入口
+
+通过命令行工具运行：
+
+    landscape-lab bench --suite all --scale 10k
+    landscape-lab bench --suite startup
+    landscape-lab bench --suite analysis --compare landscape_lab/benchmarks/results/<commit>-10k.json
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .datagen import SCALES
+
+RESULTS_DIR = Path(__file__).parent / "results"
+# 中位数变慢超过该比例视为性能回退
+DEFAULT_REGRESSION_THRESHOLD = 0.10
+
+def get_git_commit() -> str:
+    """获取当前提交号"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except Exception:
+        return "unknown"
+
+def run_suites(suite: str, scale: str, repeat: int, requests: int,
+               concurrency: int) -> Dict[str, Dict[str, Any]]:
+    """运行指定的基准套件"""
+    benchmarks = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        if suite in ("startup", "all"):
+            from .bench_startup import run_startup_benchmarks
+            for name, result in run_startup_benchmarks(repeat=repeat).items():
+                benchmarks[f"startup.{name}"] = result
+        if suite in ("analysis", "all"):
+            from .bench_analysis import run_analysis_benchmarks
+            for name, result in run_analysis_benchmarks(
+                workdir, plant_count=min(SCALES[scale], 100_000), repeat=repeat
+            ).items():
+                benchmarks[f"analysis.{name}"] = result
+        if suite in ("api", "all"):
+            from .bench_api import run_api_benchmarks
+            for name, result in run_api_benchmarks(
+                workdir, scale=scale, requests=requests, concurrency=concurrency
+            ).items():
+                benchmarks[f"api.{name}"] = result
+    return benchmarks
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any],
+                    threshold: float = DEFAULT_REGRESSION_THRESHOLD) -> bool:
+    """按中位数对比两次结果，存在性能回退时返回True"""
+    regressed = False
+    print(f"{'benchmark':<45}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name, result in sorted(current["benchmarks"].items()):
+        previous = baseline["benchmarks"].get(name)
+        if not previous:
+            continue
+        change = result["median"] / previous["median"] - 1 if previous["median"] else 0.0
+        flag = ""
+        if change > threshold:
+            regressed = True
+            flag = "  REGRESSION"
+        print(f"{name:<45}{previous['median'] * 1000:>10.2f}ms{result['median'] * 1000:>10.2f}ms"
+              f"{change:>+10.1%}{flag}")
+    return regressed
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Landscape Lab benchmarks")
+    parser.add_argument("--suite", choices=["startup", "analysis", "api", "all"], default="all")
+    parser.add_argument("--scale", choices=list(SCALES), default="10k")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR)
+    parser.add_argument("--compare", type=Path, help="baseline result file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    commit = get_git_commit()
+    results = {
+        "commit": commit,
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "suite": args.suite,
+        "scale": args.scale,
+        "benchmarks": run_suites(args.suite, args.scale, args.repeat,
+                                 args.requests, args.concurrency),
+    }
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    output_path = args.output / f"{commit}-{args.scale}.json"
+    output_path.write_text(json.dumps(results, indent=2))
+    print(f"Results written to {output_path}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        if compare_results(baseline, results, args.threshold):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
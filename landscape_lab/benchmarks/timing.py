@@ -0,0 +1,29 @@
+# landscape_lab/benchmarks/timing.py
+"""计时工具"""
+import statistics
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """汇总耗时样本（秒）"""
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "max": max(samples),
+        "p95": float(np.percentile(samples, 95)),
+        "count": len(samples),
+    }
+
+def measure(func: Callable, *args, repeat: int = 5, warmup: int = 1, **kwargs) -> Dict[str, float]:
+    """多次执行函数并统计耗时"""
+    for _ in range(warmup):
+        func(*args, **kwargs)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
@@ -0,0 +1,295 @@
+# landscape_lab/cli.py
+"""命令行入口：landscape-lab <command>"""
+import argparse
+import json
+import os
+import signal
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# 导入/导出支持的数据表
+DATA_TABLES = ("plants", "materials")
+# 每批写入的行数
+IMPORT_BATCH_SIZE = 1000
+# 由项目条目统计得出的列，导入时忽略
+DERIVED_COLUMNS = {"usage_count"}
+
+def _get_model(table: str):
+    from .models.material import Material
+    from .models.plant import Plant
+
+    return {"plants": Plant, "materials": Material}[table]
+
+def _read_table_file(path: Path):
+    """按扩展名读取CSV或Excel文件"""
+    import pandas as pd
+
+    if path.suffix.lower() in (".xlsx", ".xls"):
+        return pd.read_excel(path)
+    return pd.read_csv(path)
+
+def _clean_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """空单元格（NaN）转换为None"""
+    return {key: (None if value != value else value) for key, value in row.items()}
+
+def _run_gunicorn(args, settings, workers: int):
+    """gunicorn主进程管理uvicorn工作进程，收到HUP信号时平滑替换全部工作进程"""
+    from gunicorn.app.base import BaseApplication
+
+    options = {
+        "bind": f"{args.host or settings.HOST}:{args.port or settings.PORT}",
+        "workers": workers,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "backlog": settings.BACKLOG,
+        "keepalive": settings.KEEPALIVE_TIMEOUT,
+        "graceful_timeout": settings.GRACEFUL_TIMEOUT,
+        "timeout": settings.WORKER_TIMEOUT,
+        # 定期回收工作进程，抖动避免所有进程同时重启
+        "max_requests": settings.MAX_REQUESTS,
+        "max_requests_jitter": settings.MAX_REQUESTS_JITTER,
+        "forwarded_allow_ips": args.forwarded_allow_ips,
+        "accesslog": "-" if args.access_log or settings.ACCESS_LOG else None,
+        "pidfile": args.pidfile or settings.PID_FILE,
+        # 工作进程各自导入应用，重载时加载新代码
+        "preload_app": False,
+    }
+
+    class Server(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from .main import app
+            return app
+
+    Server().run()
+
+def serve(args) -> int:
+    """启动多进程API服务"""
+    from .config import settings
+
+    workers = args.workers if args.workers is not None else settings.WORKERS
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    if args.reload:
+        workers = 1
+    # 多个工作进程时缓存版本、任务状态和指标需放在共享后端
+    if workers > 1 and "STATE_BACKEND" not in os.environ:
+        os.environ["STATE_BACKEND"] = "sqlite"
+        settings.STATE_BACKEND = "sqlite"
+
+    server = args.server or settings.SERVER
+    if server == "gunicorn" and not args.reload:
+        if sys.platform == "win32":
+            print("gunicorn is not available on Windows, falling back to uvicorn")
+        else:
+            _run_gunicorn(args, settings, workers)
+            return 0
+
+    import uvicorn
+
+    # 多进程模式下每个工作进程各自导入应用，需传入导入路径而非应用对象
+    uvicorn.run(
+        "landscape_lab.main:app",
+        host=args.host or settings.HOST,
+        port=args.port or settings.PORT,
+        workers=workers,
+        reload=args.reload,
+        proxy_headers=True,
+        forwarded_allow_ips=args.forwarded_allow_ips,
+        backlog=settings.BACKLOG,
+        timeout_keep_alive=settings.KEEPALIVE_TIMEOUT,
+        access_log=args.access_log or settings.ACCESS_LOG,
+    )
+    return 0
+
+def reload_server(args) -> int:
+    """向gunicorn主进程发送HUP信号：先启动新工作进程，再平滑停止旧进程"""
+    from .config import settings
+
+    pidfile = Path(args.pidfile or settings.PID_FILE)
+    if not pidfile.exists():
+        print(f"PID file not found: {pidfile}")
+        return 1
+    os.kill(int(pidfile.read_text().strip()), signal.SIGHUP)
+    print("Reload signal sent")
+    return 0
+
+def init_db_command(args) -> int:
+    """创建数据库表"""
+    from .database import init_db
+
+    init_db()
+    print("Database initialized")
+    return 0
+
+def import_data(args) -> int:
+    """从CSV/Excel批量导入植物或材料数据
+
+    批量写入不触发ORM事件，导入植物后需显式使推荐与名称匹配索引失效。
+    共享状态后端为 memory 时服务进程感知不到失效，需重启服务。
+    """
+    from .database import SessionLocal
+    from .utils.recommend_utils import invalidate_plant_index
+
+    model = _get_model(args.table)
+    columns = {column.name for column in model.__table__.columns} - {"id"} - DERIVED_COLUMNS
+    frame = _read_table_file(args.path)
+    unknown = set(frame.columns) - columns
+    if unknown:
+        print(f"Ignoring unknown columns: {', '.join(sorted(unknown))}")
+    frame = frame[[column for column in frame.columns if column in columns]]
+
+    rows = [_clean_row(row) for row in frame.to_dict(orient="records")]
+    db = SessionLocal()
+    try:
+        for start in range(0, len(rows), args.batch_size):
+            db.bulk_insert_mappings(model, rows[start:start + args.batch_size])
+            db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Error importing {args.table}: {e}")
+        return 1
+    finally:
+        db.close()
+    if args.table == "plants":
+        invalidate_plant_index()
+    print(f"Imported {len(rows)} {args.table}")
+    return 0
+
+def rebuild_usage_counts(args) -> int:
+    """按项目条目重新统计植物与材料的引用计数"""
+    from .database import engine
+    from .models.material import rebuild_material_usage
+    from .models.plant import rebuild_plant_usage
+
+    try:
+        with engine.begin() as connection:
+            rebuild_plant_usage(connection)
+            rebuild_material_usage(connection)
+    except Exception as e:
+        print(f"Error rebuilding usage counts: {e}")
+        return 1
+    print("Usage counts rebuilt")
+    return 0
+
+def export_data(args) -> int:
+    """导出植物或材料数据为CSV/Excel"""
+    import pandas as pd
+
+    from .database import SessionLocal
+
+    model = _get_model(args.table)
+    db = SessionLocal()
+    try:
+        result = db.execute(model.__table__.select().order_by(model.id))
+        frame = pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+    finally:
+        db.close()
+    if args.path.suffix.lower() in (".xlsx", ".xls"):
+        frame.to_excel(args.path, index=False)
+    else:
+        frame.to_csv(args.path, index=False)
+    print(f"Exported {len(frame)} {args.table} to {args.path}")
+    return 0
+
+def analyze(args) -> int:
+    """分析DXF图纸或三维模型"""
+    from .utils.analysis_utils import (
+        analyze_plant_distribution,
+        generate_plant_report,
+        parse_dxf_file
+    )
+
+    if args.path.suffix.lower() == ".dxf":
+        result = parse_dxf_file(str(args.path))
+    else:
+        result = analyze_plant_distribution(str(args.path))
+    if not result:
+        return 1
+
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    if args.report:
+        if "plant_stats" not in result:
+            print("Reports are only available for 3D models")
+            return 1
+        if not generate_plant_report(result, str(args.report)):
+            return 1
+        print(f"Report written to {args.report}")
+    return 0
+
+def bench(args) -> int:
+    """运行性能基准测试"""
+    from .benchmarks.run import main as run_benchmarks
+
+    return run_benchmarks(args.bench_args)
+
+def check_plans(args) -> int:
+    """检查热点接口的查询计划中没有全表扫描"""
+    from .benchmarks.query_plans import main as run_check
+
+    return run_check()
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="landscape-lab", description="Landscape Lab")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="run the API server")
+    serve_parser.add_argument("--host")
+    serve_parser.add_argument("--port", type=int)
+    serve_parser.add_argument("--workers", type=int, help="worker processes (0 = one per CPU)")
+    serve_parser.add_argument("--forwarded-allow-ips", default="127.0.0.1",
+                              help="proxies trusted for X-Forwarded-* headers")
+    serve_parser.add_argument("--access-log", action="store_true")
+    serve_parser.add_argument("--server", choices=["gunicorn", "uvicorn"])
+    serve_parser.add_argument("--pidfile", help="gunicorn PID file (used by `reload`)")
+    serve_parser.add_argument("--reload", action="store_true", help="single worker with auto reload")
+    serve_parser.set_defaults(handler=serve)
+
+    reload_parser = subparsers.add_parser("reload", help="gracefully restart all workers")
+    reload_parser.add_argument("--pidfile")
+    reload_parser.set_defaults(handler=reload_server)
+
+    init_parser = subparsers.add_parser("init-db", help="create database tables")
+    init_parser.set_defaults(handler=init_db_command)
+
+    import_parser = subparsers.add_parser("import", help="import plants or materials")
+    import_parser.add_argument("table", choices=DATA_TABLES)
+    import_parser.add_argument("path", type=Path, help="CSV or Excel file")
+    import_parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    import_parser.set_defaults(handler=import_data)
+
+    usage_parser = subparsers.add_parser("rebuild-usage-counts",
+                                         help="recount plant and material usage from project line items")
+    usage_parser.set_defaults(handler=rebuild_usage_counts)
+
+    export_parser = subparsers.add_parser("export", help="export plants or materials")
+    export_parser.add_argument("table", choices=DATA_TABLES)
+    export_parser.add_argument("path", type=Path, help="CSV or Excel file")
+    export_parser.set_defaults(handler=export_data)
+
+    analyze_parser = subparsers.add_parser("analyze", help="analyze a DXF drawing or 3D model")
+    analyze_parser.add_argument("path", type=Path)
+    analyze_parser.add_argument("--report", type=Path, help="write an Excel plant report")
+    analyze_parser.set_defaults(handler=analyze)
+
+    # 其余参数原样传给基准测试入口（--suite/--scale/--compare 等）
+    bench_parser = subparsers.add_parser("bench", help="run benchmarks")
+    bench_parser.set_defaults(handler=bench)
+
+    plans_parser = subparsers.add_parser("check-plans", help="check hot queries for full table scans")
+    plans_parser.set_defaults(handler=check_plans)
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if extra and args.command != "bench":
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    args.bench_args = extra
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
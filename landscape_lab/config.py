@@ -1,10 +1,175 @@
+from typing import Dict, List
+
 from pydantic import BaseSettings
 
 class Settings(BaseSettings):
     SQLALCHEMY_DATABASE_URL: str = "sqlite:///./landscape_lab.db"
+    # SQLite写锁等待时间，多个工作进程共用同一数据库文件时避免 "database is locked"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
     SECRET_KEY: str = "your-secret-key-here"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+
+    # 令牌验证与当前用户缓存
+    TOKEN_CACHE_SIZE: int = 10000
+    USER_CACHE_SIZE: int = 1000
+    USER_CACHE_TTL_SECONDS: int = 30
+
+    # 密码哈希
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_SIZE: int = 64
+    PASSWORD_HASH_RETRY_AFTER: int = 2
+
+    # 请求性能分析
+    PROFILE_DIR: str = "profiles"
+    PROFILE_SAMPLE_INTERVAL_MS: float = 5.0
+    SLOW_REQUEST_PROFILING: bool = True
+    SLOW_REQUEST_THRESHOLD_MS: int = 1000
+
+    # 项目版本：每隔多少个版本保存一次完整快照
+    VERSION_CHECKPOINT_INTERVAL: int = 20
+
+    # 项目分析依赖图：上传文件后自动更新已有的分析结果
+    ANALYSIS_AUTO_UPDATE: bool = True
+
+    # 三维模型LOD瓦片
+    LOD_TILE_SIZE: float = 50.0
+    LOD_RATIOS: List[float] = [1.0, 0.25, 0.05, 0.01]
+
+    # 雨水径流模拟：栅格分辨率（米）与输出瓦片边长（单元数）
+    RUNOFF_RESOLUTION: float = 0.5
+    RUNOFF_TILE_SIZE: int = 256
+
+    # 日照时数栅格：分辨率（米）、太阳位置采样间隔（分钟）与采样日间隔（天）
+    # SUN_WORKERS 为0时按CPU核数启动进程，SUN_BATCH_SIZE 为每个任务的采样点数
+    SUN_RESOLUTION: float = 2.0
+    SUN_TIMESTEP_MINUTES: int = 30
+    SUN_DAY_STEP: int = 7
+    SUN_WORKERS: int = 0
+    SUN_BATCH_SIZE: int = 20000
+    SUN_TILE_SIZE: int = 256
+
+    # 植物推荐：各项条件的权重，以及日均日照时数对应的日照等级下限（小时）
+    RECOMMEND_WEIGHTS: Dict[str, float] = {"sunlight": 0.4, "water": 0.25, "soil": 0.2, "hardiness": 0.15}
+    RECOMMEND_FULL_SUN_HOURS: float = 6.0
+    RECOMMEND_PARTIAL_SUN_HOURS: float = 3.0
+
+    # 植物名称匹配：候选的最低得分（0~1），导入时自动采用最佳匹配所需的得分
+    # PLANT_NAME_SYNONYMS 为 {别名: 标准名}，规范化时替换
+    NAME_MATCH_MIN_SCORE: float = 0.3
+    NAME_MATCH_AUTO_SCORE: float = 0.75
+    PLANT_NAME_SYNONYMS: Dict[str, str] = {
+        "法桐": "悬铃木",
+        "法国梧桐": "悬铃木",
+        "japanese maple": "acer palmatum",
+        "london plane": "platanus acerifolia",
+        "maidenhair tree": "ginkgo biloba",
+    }
+
+    # 模型节点分类：规则按顺序匹配，先匹配者生效（规则格式见 utils/classify_utils.py）
+    # NODE_LAYER_SPECIES / NODE_MATERIAL_SPECIES 为 {图层（父节点）/ 材质名通配符: 物种名}，优先于规则
+    NODE_CLASSIFICATION_RULES: List[Dict[str, str]] = [
+        {"pattern": r"(?:plant|tree|shrub|植物|乔木|灌木)[\s_\-:.]+(?P<species>.+)"},
+        {"pattern": r"(?P<species>.+?)[\s_\-:.]+(?:plant|tree|shrub|植物|乔木|灌木)(?:[\s_\-:.#]*\d+)?"},
+        {"pattern": "*plant*", "match": "glob"},
+    ]
+    NODE_LAYER_SPECIES: Dict[str, str] = {}
+    NODE_MATERIAL_SPECIES: Dict[str, str] = {}
+
+    # GIS数据导入（GeoJSON / 压缩的Shapefile）：逐个要素读取，每批写入的植物配置条数
+    # 物种按字段列表中第一个有值的属性匹配植物的学名或名称（不区分大小写）
+    # 坐标系转换与Shapefile需安装 pyproj、pyshp（pip install landscape-lab[gis]）
+    GIS_IMPORT_BATCH_SIZE: int = 5000
+    GIS_READ_CHUNK_SIZE: int = 1024 * 1024
+    GIS_SPECIES_FIELDS: List[str] = ["scientific_name", "species", "botanical_name", "latin_name", "taxon"]
+    GIS_NAME_FIELDS: List[str] = ["name", "common_name", "common"]
+
+    # 服务进程（landscape-lab serve），WORKERS 为0时按CPU核数启动
+    # SERVER 为 gunicorn 时支持 `landscape-lab reload` 平滑重启
+    SERVER: str = "gunicorn"
+    HOST: str = "127.0.0.1"
+    PORT: int = 8000
+    WORKERS: int = 0
+    BACKLOG: int = 2048
+    KEEPALIVE_TIMEOUT: int = 5
+    ACCESS_LOG: bool = False
+    PID_FILE: str = "landscape_lab.pid"
+    GRACEFUL_TIMEOUT: int = 30
+    WORKER_TIMEOUT: int = 120
+    MAX_REQUESTS: int = 10000
+    MAX_REQUESTS_JITTER: int = 1000
+
+    # 操作日志：请求中只将事件放入内存队列，由后台线程每批最多 AUDIT_BATCH_SIZE 条、
+    # 每隔 AUDIT_FLUSH_INTERVAL 秒写入；BACKEND 为 database（audit_logs 表）或 file（JSON Lines）
+    # 队列已满时最多等待 AUDIT_ENQUEUE_TIMEOUT 秒，仍无空位则丢弃事件（计入 audit_events_total）
+    AUDIT_LOG_ENABLED: bool = True
+    AUDIT_LOG_BACKEND: str = "database"
+    AUDIT_LOG_FILE: str = "logs/audit.log"
+    AUDIT_QUEUE_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL: float = 1.0
+    AUDIT_ENQUEUE_TIMEOUT: float = 0.1
+
+    # 跨工作进程共享状态：memory（单进程）或 sqlite（多进程，默认位于 /dev/shm）
+    STATE_BACKEND: str = "memory"
+    STATE_DB_PATH: str = ""
+    METRICS_PUBLISH_INTERVAL: float = 5.0
+    JOB_STATUS_TTL_SECONDS: int = 86400
+    # 任务锁有效期：执行中每隔 1/3 有效期续期，进程被终止后锁在该时间内过期
+    JOB_LOCK_TTL_SECONDS: int = 60
+
+    # 限流（令牌桶）：格式为 "次数/second|minute|hour"，按用户计数，未登录时按客户端IP
+    # RATE_LIMITS 的键为 "方法 路由模板"，在 RATE_LIMIT_DEFAULT 之外另行限制
+    # RATE_LIMIT_BACKEND 为空时使用 STATE_BACKEND；设为 memory 时各工作进程分别计数
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = ""
+    RATE_LIMIT_DEFAULT: str = "600/minute"
+    RATE_LIMITS: Dict[str, str] = {
+        "POST /users/token": "10/minute",
+        "GET /api/plants/": "120/minute",
+        "GET /api/materials/": "120/minute",
+        "GET /api/projects/": "120/minute",
+        "GET /api/plants/statistics/": "30/minute",
+        "GET /api/plants/recommendations/": "120/minute",
+        "POST /api/plants/match/": "60/minute",
+        "GET /api/materials/statistics/": "30/minute",
+        "GET /api/projects/statistics/": "30/minute",
+        "GET /api/projects/within/": "120/minute",
+        "GET /api/projects/nearby/": "120/minute",
+        "GET /api/projects/nearest/": "120/minute",
+        "POST /api/plants/{plant_id}/images/": "20/minute",
+        "POST /api/materials/{material_id}/images/": "20/minute",
+        "POST /api/projects/{project_id}/files/": "10/minute",
+        "POST /api/projects/{project_id}/files/{file_id}/tiles/": "5/minute",
+        "GET /api/projects/{project_id}/growth": "10/minute",
+        "POST /api/projects/{project_id}/files/{file_id}/runoff/": "5/minute",
+        "POST /api/projects/{project_id}/files/{file_id}/sun-hours/": "20/minute",
+        "POST /api/projects/{project_id}/files/{file_id}/plants/import/": "5/minute",
+    }
+    # 并发上限（每个工作进程）：重型接口同时执行的请求数，超出返回503
+    CONCURRENCY_LIMITS: Dict[str, int] = {
+        "POST /api/projects/{project_id}/files/": 4,
+        "POST /api/projects/{project_id}/files/{file_id}/tiles/": 2,
+        "GET /api/plants/statistics/": 8,
+        "GET /api/materials/statistics/": 8,
+        "GET /api/projects/statistics/": 8,
+        "GET /api/projects/{project_id}/growth": 2,
+        "POST /api/projects/{project_id}/files/{file_id}/runoff/": 2,
+    }
+    # 单个用户在上述接口同时执行的请求数，超出返回429
+    CONCURRENCY_PER_USER: int = 2
+    CONCURRENCY_RETRY_AFTER: int = 1
+
+    # 响应压缩：在客户端接受的编码中按顺序选择，小于阈值（字节）的响应不压缩
+    # br、zstd 需安装 brotli、zstandard（pip install landscape-lab[compress]）
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_ENCODINGS: List[str] = ["zstd", "br", "gzip"]
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+    ZSTD_LEVEL: int = 3
 
     class Config:
         env_file = ".env"
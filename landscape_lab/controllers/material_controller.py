@@ -1,36 +1,43 @@
 # landscape_lab/controllers/material_controller.py
 from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import List, Optional
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from ..database import get_db
-from ..models.material import (
-    MaterialInDB,
+from ..models.material import Material, MaterialUsage
+from ..schemas.material import (
     MaterialCreate,
     MaterialUpdate,
     MaterialPublic,
     MaterialSearchResult,
     MaterialStatistics,
-    MaterialUsage
+    MaterialUsageCreate,
+    MaterialUsageOut
 )
-from ..models.user import UserInDB
+from ..models.project import Project
+from ..models.user import User
 from ..utils.security import get_current_user
+from ..utils.audit import record_audit
+from ..utils.responses import FastJSONResponse
 
 router = APIRouter(
     prefix="/api/materials",
     tags=["materials"],
     responses={404: {"description": "Not found"}},
+    default_response_class=FastJSONResponse,
 )
 
 @router.post("/", response_model=MaterialPublic)
 def create_material(
     material: MaterialCreate,
     db: Session = Depends(get_db),
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
-    db_material = MaterialInDB(**material.dict())
+    db_material = Material(**material.dict(), created_by=current_user.id)
     db.add(db_material)
     db.commit()
     db.refresh(db_material)
+    record_audit("create", "material", db_material.id, current_user, name=db_material.name)
     return db_material
 
 @router.get("/", response_model=List[MaterialSearchResult])
@@ -40,9 +47,9 @@ def read_materials(
     search: Optional[str] = Query(None, min_length=2, max_length=100),
     db: Session = Depends(get_db)
 ):
-    query = db.query(MaterialInDB)
+    query = db.query(Material)
     if search:
-        query = query.filter(MaterialInDB.name.ilike(f"%{search}%"))
+        query = query.filter(Material.name.ilike(f"%{search}%"))
     materials = query.offset(skip).limit(limit).all()
     return materials
 
@@ -51,7 +58,7 @@ def read_material(
     material_id: int,
     db: Session = Depends(get_db)
 ):
-    material = db.query(MaterialInDB).filter(MaterialInDB.id == material_id).first()
+    material = db.query(Material).filter(Material.id == material_id).first()
     if not material:
         raise HTTPException(status_code=404, detail="Material not found")
     return material
@@ -61,11 +68,13 @@ def update_material(
     material_id: int,
     material: MaterialUpdate,
     db: Session = Depends(get_db),
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
-    db_material = db.query(MaterialInDB).filter(MaterialInDB.id == material_id).first()
+    db_material = db.query(Material).filter(Material.id == material_id).first()
     if not db_material:
         raise HTTPException(status_code=404, detail="Material not found")
+    if db_material.created_by != current_user.id and not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Permission denied")
     
     update_data = material.dict(exclude_unset=True)
     for key, value in update_data.items():
@@ -73,60 +82,93 @@ def update_material(
     
     db.commit()
     db.refresh(db_material)
+    record_audit("update", "material", material_id, current_user, fields=sorted(update_data))
     return db_material
 
 @router.delete("/{material_id}")
 def delete_material(
     material_id: int,
     db: Session = Depends(get_db),
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Permission denied")
     
-    material = db.query(MaterialInDB).filter(MaterialInDB.id == material_id).first()
+    material = db.query(Material).filter(Material.id == material_id).first()
     if not material:
         raise HTTPException(status_code=404, detail="Material not found")
     
     db.delete(material)
     db.commit()
+    record_audit("delete", "material", material_id, current_user)
     return {"message": "Material deleted successfully"}
 
 @router.get("/statistics/", response_model=MaterialStatistics)
 def get_material_statistics(
     db: Session = Depends(get_db),
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Permission denied")
     
-    total_materials = db.query(MaterialInDB).count()
+    total_materials = db.query(Material).count()
     
-    # 获取材料类型统计
-    material_types = db.query(
-        MaterialInDB.category,
-        db.func.count(MaterialInDB.id).label("count")
-    ).group_by(MaterialInDB.category).all()
+    # 获取材料分类统计
+    material_categories = db.query(
+        Material.category,
+        func.count(Material.id).label("count")
+    ).group_by(Material.category).all()
     
     # 获取最近添加的材料
-    recent_materials = db.query(MaterialInDB).order_by(
-        MaterialInDB.created_at.desc()
+    recent_materials = db.query(Material).order_by(
+        Material.created_at.desc()
     ).limit(5).all()
     
     return MaterialStatistics(
         total_materials=total_materials,
-        material_types=[{"category": mt[0], "count": mt[1]} for mt in material_types],
+        material_categories=[{"category": mc[0], "count": mc[1]} for mc in material_categories],
         recent_additions=recent_materials
     )
 
-@router.post("/usages/", response_model=MaterialUsage)
+@router.post("/usages/", response_model=MaterialUsageOut)
 def create_material_usage(
-    usage: MaterialUsage,
+    usage: MaterialUsageCreate,
     db: Session = Depends(get_db),
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
+    material = db.query(Material).filter(Material.id == usage.material_id).first()
+    if not material:
+        raise HTTPException(status_code=404, detail="Material not found")
+    project = db.query(Project).filter(Project.id == usage.project_id).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if project.owner_id != current_user.id and not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Permission denied")
+
     db_usage = MaterialUsage(**usage.dict())
+    # 未指定单位时沿用材料的计价单位
+    if db_usage.unit is None:
+        db_usage.unit = material.unit
     db.add(db_usage)
     db.commit()
     db.refresh(db_usage)
+    record_audit("create", "material_usage", db_usage.id, current_user,
+                 project_id=db_usage.project_id, material_id=db_usage.material_id)
     return db_usage
+
+@router.delete("/usages/{usage_id}")
+def delete_material_usage(
+    usage_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    db_usage = db.query(MaterialUsage).filter(MaterialUsage.id == usage_id).first()
+    if not db_usage:
+        raise HTTPException(status_code=404, detail="Material usage not found")
+    project = db.query(Project).filter(Project.id == db_usage.project_id).first()
+    if project.owner_id != current_user.id and not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Permission denied")
+    db.delete(db_usage)
+    db.commit()
+    record_audit("delete", "material_usage", usage_id, current_user)
+    return {"message": "Material usage deleted successfully"}
@@ -1,36 +1,48 @@
 # landscape_lab/controllers/plant_controller.py
 from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import List, Optional
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from ..database import get_db
-from ..models.plant import (
-    PlantInDB,
+from ..models.plant import Plant, PlantLocation
+from ..schemas.plant import (
     PlantCreate,
     PlantUpdate,
+    PlantNameMatch,
+    PlantNameMatchRequest,
     PlantPublic,
+    PlantRecommendation,
     PlantSearchResult,
     PlantStatistics,
-    PlantLocation
+    PlantLocationCreate,
+    PlantLocationOut
 )
-from ..models.user import UserInDB
+from ..models.project import Project
+from ..models.user import User
 from ..utils.security import get_current_user
+from ..utils.audit import record_audit
+from ..utils.name_utils import get_name_index, match_names
+from ..utils.recommend_utils import get_plant_index, recommend_plants
+from ..utils.responses import FastJSONResponse
 
 router = APIRouter(
     prefix="/api/plants",
     tags=["plants"],
     responses={404: {"description": "Not found"}},
+    default_response_class=FastJSONResponse,
 )
 
 @router.post("/", response_model=PlantPublic)
 def create_plant(
     plant: PlantCreate,
     db: Session = Depends(get_db),
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
-    db_plant = PlantInDB(**plant.dict())
+    db_plant = Plant(**plant.dict(), created_by=current_user.id)
     db.add(db_plant)
     db.commit()
     db.refresh(db_plant)
+    record_audit("create", "plant", db_plant.id, current_user, name=db_plant.name)
     return db_plant
 
 @router.get("/", response_model=List[PlantSearchResult])
@@ -40,9 +52,9 @@ def read_plants(
     search: Optional[str] = Query(None, min_length=2, max_length=100),
     db: Session = Depends(get_db)
 ):
-    query = db.query(PlantInDB)
+    query = db.query(Plant)
     if search:
-        query = query.filter(PlantInDB.name.ilike(f"%{search}%"))
+        query = query.filter(Plant.name.ilike(f"%{search}%"))
     plants = query.offset(skip).limit(limit).all()
     return plants
 
@@ -51,7 +63,7 @@ def read_plant(
     plant_id: int,
     db: Session = Depends(get_db)
 ):
-    plant = db.query(PlantInDB).filter(PlantInDB.id == plant_id).first()
+    plant = db.query(Plant).filter(Plant.id == plant_id).first()
     if not plant:
         raise HTTPException(status_code=404, detail="Plant not found")
     return plant
@@ -61,11 +73,13 @@ def update_plant(
     plant_id: int,
     plant: PlantUpdate,
     db: Session = Depends(get_db),
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
-    db_plant = db.query(PlantInDB).filter(PlantInDB.id == plant_id).first()
+    db_plant = db.query(Plant).filter(Plant.id == plant_id).first()
     if not db_plant:
         raise HTTPException(status_code=404, detail="Plant not found")
+    if db_plant.created_by != current_user.id and not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Permission denied")
     
     update_data = plant.dict(exclude_unset=True)
     for key, value in update_data.items():
@@ -73,60 +87,122 @@ def update_plant(
     
     db.commit()
     db.refresh(db_plant)
+    record_audit("update", "plant", plant_id, current_user, fields=sorted(update_data))
     return db_plant
 
 @router.delete("/{plant_id}")
 def delete_plant(
     plant_id: int,
     db: Session = Depends(get_db),
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Permission denied")
     
-    plant = db.query(PlantInDB).filter(PlantInDB.id == plant_id).first()
+    plant = db.query(Plant).filter(Plant.id == plant_id).first()
     if not plant:
         raise HTTPException(status_code=404, detail="Plant not found")
     
     db.delete(plant)
     db.commit()
+    record_audit("delete", "plant", plant_id, current_user)
     return {"message": "Plant deleted successfully"}
 
 @router.get("/statistics/", response_model=PlantStatistics)
 def get_plant_statistics(
     db: Session = Depends(get_db),
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Permission denied")
     
-    total_plants = db.query(PlantInDB).count()
+    total_plants = db.query(Plant).count()
     
-    # 获取植物类型统计
-    plant_types = db.query(
-        PlantInDB.type,
-        db.func.count(PlantInDB.id).label("count")
-    ).group_by(PlantInDB.type).all()
+    # 获取植物分类统计
+    plant_categories = db.query(
+        Plant.category,
+        func.count(Plant.id).label("count")
+    ).group_by(Plant.category).all()
     
     # 获取最近添加的植物
-    recent_plants = db.query(PlantInDB).order_by(
-        PlantInDB.created_at.desc()
+    recent_plants = db.query(Plant).order_by(
+        Plant.created_at.desc()
     ).limit(5).all()
     
     return PlantStatistics(
         total_plants=total_plants,
-        plant_types=[{"type": pt[0], "count": pt[1]} for pt in plant_types],
+        plant_categories=[{"category": pc[0], "count": pc[1]} for pc in plant_categories],
         recent_additions=recent_plants
     )
 
-@router.post("/locations/", response_model=PlantLocation)
+@router.get("/recommendations/", response_model=List[PlantRecommendation])
+def read_plant_recommendations(
+    sun_hours: Optional[float] = Query(None, ge=0, le=24),
+    sunlight: Optional[str] = Query(None, max_length=100),
+    water: Optional[str] = Query(None, max_length=100),
+    soil: Optional[str] = Query(None, max_length=100),
+    hardiness_zone: Optional[str] = Query(None, max_length=20),
+    category: Optional[str] = None,
+    max_height: Optional[float] = Query(None, gt=0),
+    limit: int = Query(20, ge=1, le=200),
+    db: Session = Depends(get_db)
+):
+    """按场地条件推荐植物，按匹配得分从高到低排列
+
+    日照条件可给出日均日照时数（如日照分析结果）或文字描述（如 "半阴"）。
+    """
+    try:
+        results = recommend_plants(
+            get_plant_index(db), sun_hours=sun_hours, sunlight=sunlight, water=water, soil=soil,
+            hardiness_zone=hardiness_zone, category=category, max_height=max_height, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse(results)
+
+@router.post("/match/", response_model=List[PlantNameMatch])
+def match_plant_names(
+    request: PlantNameMatchRequest,
+    db: Session = Depends(get_db)
+):
+    """将不规范的植物名称（导入数据、模型节点名等）批量匹配到植物库，返回各名称的候选植物"""
+    return FastJSONResponse(match_names(get_name_index(db), request.names, request.limit, request.min_score))
+
+@router.post("/locations/", response_model=PlantLocationOut)
 def create_plant_location(
-    location: PlantLocation,
+    location: PlantLocationCreate,
     db: Session = Depends(get_db),
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
+    plant = db.query(Plant).filter(Plant.id == location.plant_id).first()
+    if not plant:
+        raise HTTPException(status_code=404, detail="Plant not found")
+    project = db.query(Project).filter(Project.id == location.project_id).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if project.owner_id != current_user.id and not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Permission denied")
     db_location = PlantLocation(**location.dict())
     db.add(db_location)
     db.commit()
     db.refresh(db_location)
+    record_audit("create", "plant_location", db_location.id, current_user,
+                 project_id=db_location.project_id, plant_id=db_location.plant_id)
     return db_location
+
+@router.delete("/locations/{location_id}")
+def delete_plant_location(
+    location_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    db_location = db.query(PlantLocation).filter(PlantLocation.id == location_id).first()
+    if not db_location:
+        raise HTTPException(status_code=404, detail="Plant location not found")
+    project = db.query(Project).filter(Project.id == db_location.project_id).first()
+    if project.owner_id != current_user.id and not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Permission denied")
+    db.delete(db_location)
+    db.commit()
+    record_audit("delete", "plant_location", location_id, current_user)
+    return {"message": "Plant location deleted successfully"}
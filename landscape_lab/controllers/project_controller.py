@@ -1,40 +1,75 @@
 # landscape_lab/controllers/project_controller.py
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, UploadFile, File
 from typing import List, Optional
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from ..database import get_db
-from ..models.project import (
-    ProjectInDB,
+from ..models.project import Project
+from ..schemas.project import (
+    BillOfQuantities,
+    MaterialQuantity,
+    PlantQuantity,
     ProjectCreate,
+    ProjectGeoResult,
     ProjectUpdate,
     ProjectPublic,
     ProjectSearchResult,
-    ProjectStatistics,
-    ProjectFile,
-    ProjectVersion
+    ProjectStatistics
 )
-from ..models.user import UserInDB
+from ..models.material import Material, MaterialUsage
+from ..models.plant import Plant, PlantLocation
+from ..models.project_file import ProjectFile
+from ..models.project_version import ProjectVersion
+from ..models.user import User
+from ..schemas.project import (
+    ProjectFileOut,
+    ProjectVersionOut,
+    ProjectVersionState,
+    ProjectVersionDiff
+)
+from ..config import settings
 from ..utils.security import get_current_user
-from ..utils.file_utils import save_uploaded_file
+from ..utils.audit import record_audit
+from ..utils.responses import FastJSONResponse
+from ..utils.analysis_graph import mark_file_changed, schedule_analysis_update
+from ..utils.file_utils import get_file_hash, get_file_size, save_uploaded_file
+from ..utils.geo_utils import (
+    NEAREST_INITIAL_RADIUS_KM,
+    bounds_intersect,
+    filter_by_bounds,
+    haversine_km,
+    project_bounds,
+    radius_bounds
+)
+from ..utils.version_utils import (
+    capture_project_state,
+    compute_delta,
+    count_changes,
+    diff_versions,
+    load_version_state
+)
 from datetime import datetime
+import json
 import os
 
 router = APIRouter(
     prefix="/api/projects",
     tags=["projects"],
     responses={404: {"description": "Not found"}},
+    default_response_class=FastJSONResponse,
 )
 
 @router.post("/", response_model=ProjectPublic)
 def create_project(
     project: ProjectCreate,
     db: Session = Depends(get_db),
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
-    db_project = ProjectInDB(**project.dict(), owner_id=current_user.id)
+    db_project = Project(**project.dict(), owner_id=current_user.id)
     db.add(db_project)
     db.commit()
     db.refresh(db_project)
+    record_audit("create", "project", db_project.id, current_user, name=db_project.name)
     return db_project
 
 @router.get("/", response_model=List[ProjectSearchResult])
@@ -44,9 +79,9 @@ def read_projects(
     search: Optional[str] = Query(None, min_length=2, max_length=100),
     db: Session = Depends(get_db)
 ):
-    query = db.query(ProjectInDB)
+    query = db.query(Project)
     if search:
-        query = query.filter(ProjectInDB.name.ilike(f"%{search}%"))
+        query = query.filter(Project.name.ilike(f"%{search}%"))
     projects = query.offset(skip).limit(limit).all()
     return projects
 
@@ -55,7 +90,7 @@ def read_project(
     project_id: int,
     db: Session = Depends(get_db)
 ):
-    project = db.query(ProjectInDB).filter(ProjectInDB.id == project_id).first()
+    project = db.query(Project).filter(Project.id == project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     return project
@@ -65,9 +100,9 @@ def update_project(
     project_id: int,
     project: ProjectUpdate,
     db: Session = Depends(get_db),
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
-    db_project = db.query(ProjectInDB).filter(ProjectInDB.id == project_id).first()
+    db_project = db.query(Project).filter(Project.id == project_id).first()
     if not db_project:
         raise HTTPException(status_code=404, detail="Project not found")
     if db_project.owner_id != current_user.id and not current_user.is_admin:
@@ -79,15 +114,16 @@ def update_project(
     
     db.commit()
     db.refresh(db_project)
+    record_audit("update", "project", project_id, current_user, fields=sorted(update_data))
     return db_project
 
 @router.delete("/{project_id}")
 def delete_project(
     project_id: int,
     db: Session = Depends(get_db),
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
-    project = db.query(ProjectInDB).filter(ProjectInDB.id == project_id).first()
+    project = db.query(Project).filter(Project.id == project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     if project.owner_id != current_user.id and not current_user.is_admin:
@@ -95,27 +131,28 @@ def delete_project(
     
     db.delete(project)
     db.commit()
+    record_audit("delete", "project", project_id, current_user)
     return {"message": "Project deleted successfully"}
 
 @router.get("/statistics/", response_model=ProjectStatistics)
 def get_project_statistics(
     db: Session = Depends(get_db),
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Permission denied")
     
-    total_projects = db.query(ProjectInDB).count()
+    total_projects = db.query(Project).count()
     
     # 获取项目状态统计
     project_statuses = db.query(
-        ProjectInDB.status,
-        db.func.count(ProjectInDB.id).label("count")
-    ).group_by(ProjectInDB.status).all()
+        Project.status,
+        func.count(Project.id).label("count")
+    ).group_by(Project.status).all()
     
     # 获取最近创建的项目
-    recent_projects = db.query(ProjectInDB).order_by(
-        ProjectInDB.created_at.desc()
+    recent_projects = db.query(Project).order_by(
+        Project.created_at.desc()
     ).limit(5).all()
     
     return ProjectStatistics(
@@ -124,14 +161,150 @@ def get_project_statistics(
         recent_additions=recent_projects
     )
 
-@router.post("/{project_id}/files/", response_model=ProjectFile)
+def query_project_locations(db: Session, bounds, include_footprint: bool):
+    """外包框与 bounds 相交的项目（只取位置相关字段）"""
+    columns = [Project.id, Project.name, Project.status, Project.owner_id, Project.latitude, Project.longitude]
+    if include_footprint:
+        columns.append(Project.footprint)
+    query = db.query(*columns).filter(Project.latitude.isnot(None), Project.longitude.isnot(None))
+    return filter_by_bounds(query, Project, db.connection(), bounds)
+
+def to_geo_result(row, distance_km: Optional[float] = None) -> dict:
+    result = dict(row._mapping)
+    if distance_km is not None:
+        result["distance_km"] = round(distance_km, 3)
+    return result
+
+@router.get("/within/", response_model=List[ProjectGeoResult])
+def read_projects_within(
+    min_lon: float = Query(..., ge=-180, le=180),
+    min_lat: float = Query(..., ge=-90, le=90),
+    max_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    limit: int = Query(1000, ge=1, le=10000),
+    include_footprint: bool = False,
+    db: Session = Depends(get_db)
+):
+    """框选：外包框（占地范围或坐标点）与给定范围相交的项目，用于地图视图"""
+    if min_lon > max_lon or min_lat > max_lat:
+        raise HTTPException(status_code=400, detail="Invalid bounding box")
+    bounds = (min_lon, min_lat, max_lon, max_lat)
+    rows = query_project_locations(db, bounds, True).limit(limit).all()
+    results = []
+    for row in rows:
+        # 空间索引的坐标为单精度，按原始坐标精确判断
+        if bounds_intersect(project_bounds(row.latitude, row.longitude, row.footprint), bounds):
+            result = to_geo_result(row)
+            if not include_footprint:
+                result.pop("footprint")
+            results.append(result)
+    return FastJSONResponse(results)
+
+@router.get("/nearby/", response_model=List[ProjectGeoResult])
+def read_projects_nearby(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(..., gt=0, le=20000),
+    limit: int = Query(1000, ge=1, le=10000),
+    include_footprint: bool = False,
+    db: Session = Depends(get_db)
+):
+    """半径查询：坐标在给定距离内的项目，按距离排序"""
+    rows = query_project_locations(db, radius_bounds(latitude, longitude, radius_km), include_footprint).all()
+    matches = []
+    for row in rows:
+        distance = haversine_km(latitude, longitude, row.latitude, row.longitude)
+        if distance <= radius_km:
+            matches.append((distance, row))
+    matches.sort(key=lambda match: match[0])
+    return FastJSONResponse([to_geo_result(row, distance) for distance, row in matches[:limit]])
+
+@router.get("/nearest/", response_model=List[ProjectGeoResult])
+def read_nearest_projects(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    k: int = Query(10, ge=1, le=100),
+    include_footprint: bool = False,
+    db: Session = Depends(get_db)
+):
+    """最近邻查询：距离最近的 k 个项目
+
+    搜索半径从 NEAREST_INITIAL_RADIUS_KM 起逐轮加倍，直到半径内已有 k 个项目
+    （半径内的项目一定比半径外的近）或已覆盖全球。
+    """
+    radius_km = NEAREST_INITIAL_RADIUS_KM
+    while True:
+        rows = query_project_locations(db, radius_bounds(latitude, longitude, radius_km), include_footprint).all()
+        matches = sorted(
+            ((haversine_km(latitude, longitude, row.latitude, row.longitude), row) for row in rows),
+            key=lambda match: match[0]
+        )
+        within = [match for match in matches if match[0] <= radius_km]
+        if len(within) >= k or radius_km >= 20000:
+            break
+        # 候选数已不少于 k 时，直接扩大到第 k 个候选的距离
+        radius_km = max(radius_km * 2, matches[k - 1][0] if len(matches) >= k else 0)
+    return FastJSONResponse([to_geo_result(row, distance) for distance, row in matches[:k]])
+
+@router.get("/{project_id}/bill-of-quantities", response_model=BillOfQuantities)
+def read_bill_of_quantities(
+    project_id: int,
+    db: Session = Depends(get_db)
+):
+    if db.query(Project.id).filter(Project.id == project_id).first() is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    # 数量与金额在SQL中按材料（及单位）汇总，只返回汇总行
+    material_unit = func.coalesce(MaterialUsage.unit, Material.unit)
+    material_rows = db.query(
+        Material.id,
+        Material.name,
+        material_unit,
+        Material.unit_price,
+        func.sum(MaterialUsage.quantity),
+        func.count(MaterialUsage.id),
+        func.sum(MaterialUsage.quantity * Material.unit_price)
+    ).join(Material, Material.id == MaterialUsage.material_id).filter(
+        MaterialUsage.project_id == project_id
+    ).group_by(Material.id, material_unit).order_by(Material.name).all()
+
+    plant_rows = db.query(
+        Plant.id,
+        Plant.name,
+        PlantLocation.unit,
+        func.sum(PlantLocation.quantity),
+        func.count(PlantLocation.id)
+    ).join(Plant, Plant.id == PlantLocation.plant_id).filter(
+        PlantLocation.project_id == project_id
+    ).group_by(Plant.id, PlantLocation.unit).order_by(Plant.name).all()
+
+    materials = [
+        MaterialQuantity(
+            material_id=row[0], name=row[1], unit=row[2], unit_price=row[3],
+            quantity=row[4], line_items=row[5], total_cost=row[6]
+        )
+        for row in material_rows
+    ]
+    plants = [
+        PlantQuantity(plant_id=row[0], name=row[1], unit=row[2], quantity=row[3], line_items=row[4])
+        for row in plant_rows
+    ]
+    return BillOfQuantities(
+        project_id=project_id,
+        materials=materials,
+        plants=plants,
+        total_cost=sum(item.total_cost for item in materials)
+    )
+
+@router.post("/{project_id}/files/", response_model=ProjectFileOut)
 def upload_project_file(
     project_id: int,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
-    project = db.query(ProjectInDB).filter(ProjectInDB.id == project_id).first()
+    project = db.query(Project).filter(Project.id == project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     if project.owner_id != current_user.id and not current_user.is_admin:
@@ -142,32 +315,106 @@ def upload_project_file(
         project_id=project_id,
         file_name=file.filename,
         file_path=file_path,
+        file_hash=get_file_hash(file_path),
+        file_size=get_file_size(file_path),
         uploaded_by=current_user.id
     )
     db.add(db_file)
     db.commit()
     db.refresh(db_file)
+
+    # 已有分析结果时只重新计算受该文件影响的产物
+    if mark_file_changed(db, project_id, db_file.file_name) and settings.ANALYSIS_AUTO_UPDATE:
+        schedule_analysis_update(background_tasks, project_id)
+    record_audit("create", "project_file", db_file.id, current_user,
+                 project_id=project_id, file_name=db_file.file_name, file_hash=db_file.file_hash)
     return db_file
 
-@router.post("/{project_id}/versions/", response_model=ProjectVersion)
+@router.post("/{project_id}/versions/", response_model=ProjectVersionOut)
 def create_project_version(
     project_id: int,
     version: str,
     db: Session = Depends(get_db),
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
-    project = db.query(ProjectInDB).filter(ProjectInDB.id == project_id).first()
+    project = db.query(Project).filter(Project.id == project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     if project.owner_id != current_user.id and not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Permission denied")
     
+    # 以上一版本为基准只保存增量，定期保存完整快照
+    latest = db.query(ProjectVersion).filter(
+        ProjectVersion.project_id == project_id
+    ).order_by(ProjectVersion.sequence.desc()).first()
+    previous_state = load_version_state(db, latest) if latest else {}
+    state = capture_project_state(db, project)
+    delta = compute_delta(previous_state, state)
+
+    sequence = latest.sequence + 1 if latest else 1
+    is_checkpoint = (sequence - 1) % settings.VERSION_CHECKPOINT_INTERVAL == 0
+
     db_version = ProjectVersion(
         project_id=project_id,
         version=version,
+        sequence=sequence,
+        delta=json.dumps(delta),
+        snapshot=json.dumps(state) if is_checkpoint else None,
+        change_count=count_changes(delta),
         created_by=current_user.id
     )
     db.add(db_version)
     db.commit()
     db.refresh(db_version)
+    record_audit("create", "project_version", db_version.id, current_user,
+                 project_id=project_id, version=version, sequence=sequence)
+    return db_version
+
+def get_project_version(project_id: int, version_id: int, db: Session) -> ProjectVersion:
+    """获取项目版本"""
+    db_version = db.query(ProjectVersion).filter(
+        ProjectVersion.id == version_id,
+        ProjectVersion.project_id == project_id
+    ).first()
+    if not db_version:
+        raise HTTPException(status_code=404, detail="Version not found")
     return db_version
+
+@router.get("/{project_id}/versions/", response_model=List[ProjectVersionOut])
+def read_project_versions(
+    project_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    versions = db.query(ProjectVersion).filter(
+        ProjectVersion.project_id == project_id
+    ).order_by(ProjectVersion.sequence.desc()).offset(skip).limit(limit).all()
+    return versions
+
+@router.get("/{project_id}/versions/diff", response_model=ProjectVersionDiff)
+def compare_project_versions(
+    project_id: int,
+    base_version_id: int,
+    target_version_id: int,
+    db: Session = Depends(get_db)
+):
+    base = get_project_version(project_id, base_version_id, db)
+    target = get_project_version(project_id, target_version_id, db)
+    return ProjectVersionDiff(
+        base_version_id=base.id,
+        target_version_id=target.id,
+        changes=diff_versions(db, base, target)
+    )
+
+@router.get("/{project_id}/versions/{version_id}", response_model=ProjectVersionState)
+def read_project_version(
+    project_id: int,
+    version_id: int,
+    db: Session = Depends(get_db)
+):
+    db_version = get_project_version(project_id, version_id, db)
+    return ProjectVersionState(
+        **ProjectVersionOut.from_orm(db_version).dict(),
+        state=load_version_state(db, db_version)
+    )
@@ -1,25 +1,35 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from database import get_db
-from models.user import User
-from schemas.user import UserCreate, UserInDB
-from utils.security import get_password_hash
+from fastapi.concurrency import run_in_threadpool
+from ..database import get_db
+from ..models.user import User
+from ..schemas.user import UserCreate, UserInDB
+from ..utils.security import get_password_hash_async
+from ..utils.audit import record_audit
 
 router = APIRouter()
 
+def get_user_by_email(db: Session, email: str):
+    return db.query(User).filter(User.email == email).first()
+
+def save_user(db: Session, db_user: User):
+    db.add(db_user)
+    db.commit()
+    db.refresh(db_user)
+    return db_user
+
 @router.post("/users/", response_model=UserInDB)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == user.email).first()
+async def create_user(user: UserCreate, db: Session = Depends(get_db)):
+    db_user = await run_in_threadpool(get_user_by_email, db, user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
         hashed_password=hashed_password
     )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    db_user = await run_in_threadpool(save_user, db, db_user)
+    record_audit("create", "user", db_user.id, db_user, username=db_user.username)
     return db_user
@@ -0,0 +1,2 @@
+from .db import SessionLocal, create_database_engine, engine, get_db, init_db
+from ..models.base import Base
@@ -1,16 +1,49 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
+import argparse
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
-from config import settings
+from ..config import settings
+from ..models.base import Base
+from ..utils.geo_utils import create_spatial_index, rebuild_spatial_index
+from ..utils.metrics import instrument_engine
 
 SQLALCHEMY_DATABASE_URL = settings.SQLALCHEMY_DATABASE_URL
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+def _configure_sqlite(dbapi_connection, connection_record):
+    """WAL模式允许读写并发，多个工作进程共用数据库文件"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+def create_database_engine(url: str):
+    """创建数据库引擎（记录查询指标，SQLite启用WAL与写锁等待）"""
+    db_engine = create_engine(url, connect_args={"check_same_thread": False})
+    instrument_engine(db_engine)
+    if db_engine.dialect.name == "sqlite":
+        event.listen(db_engine, "connect", _configure_sqlite)
+    return db_engine
+
+engine = create_database_engine(SQLALCHEMY_DATABASE_URL)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
+def init_db(bind=None):
+    """创建数据库表（部署时显式执行，不在应用导入时执行），bind 默认为应用数据库"""
+    # 导入全部模型，使其注册到 Base.metadata
+    from .. import models  # noqa: F401
+
+    bind = engine if bind is None else bind
+    Base.metadata.create_all(bind=bind)
+    # create_all 不会为已存在的表补建索引，这里逐个补齐
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+    # 项目位置的R*Tree空间索引（SQLite虚拟表），按现有项目重建
+    if bind.dialect.name == "sqlite":
+        with bind.begin() as connection:
+            if create_spatial_index(connection):
+                rebuild_spatial_index(connection)
 
 def get_db():
     db = SessionLocal()
@@ -18,3 +51,13 @@ def get_db():
         yield db
     finally:
         db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Landscape Lab database management")
+    parser.add_argument("--init", action="store_true", help="create database tables")
+    args = parser.parse_args()
+    if args.init:
+        init_db()
+        print("Database initialized")
+    else:
+        parser.print_help()
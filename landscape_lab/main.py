@@ -1,15 +1,64 @@
-from fastapi import FastAPI
-from database import Base, engine
-from routers import user
+from fastapi import FastAPI, Response
+from .config import settings
+from .controllers import material_controller, plant_controller, project_controller
+from .routers import user
+from .utils.audit import stop_audit_writer
+from .utils.compression import CompressionMiddleware
+from .utils.metrics import MetricsMiddleware, render_worker_metrics, start_metrics_publisher
+from .utils.profiling import ProfilingMiddleware
+from .utils.rate_limit import RateLimitMiddleware
+from .utils.state import get_state_backend
+from .views import (
+    analysis_view,
+    audit_view,
+    material_view,
+    plant_view,
+    profiling_view,
+    project_view,
+    user_view
+)
 
 app = FastAPI()
+# 压缩在最内层，耗时计入性能分析与指标
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(ProfilingMiddleware)
+# 被限流拒绝的请求同样计入指标
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(MetricsMiddleware)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# 数据库表由 `landscape-lab init-db` 显式创建，不在导入时执行DDL
 
 # Include routers
+# 控制器负责增删改查与统计接口，视图负责图片、模型瓦片、分析等文件相关接口，同一路径只由一处处理
+app.include_router(plant_controller.router)
+app.include_router(material_controller.router)
+app.include_router(project_controller.router)
+app.include_router(plant_view.router)
+app.include_router(material_view.router)
+app.include_router(project_view.router)
+app.include_router(analysis_view.router)
+app.include_router(user_view.router)
 app.include_router(user.router)
+app.include_router(profiling_view.router)
+app.include_router(audit_view.router)
+
+@app.on_event("startup")
+def start_worker_state():
+    """多进程模式下定期发布本进程指标，供任一进程的 /metrics 合并输出"""
+    if settings.STATE_BACKEND != "memory":
+        start_metrics_publisher(get_state_backend(), settings.METRICS_PUBLISH_INTERVAL)
+
+@app.on_event("shutdown")
+def flush_audit_log():
+    """写入队列中剩余的操作日志"""
+    stop_audit_writer()
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to Landscape Lab API"}
+
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    """Prometheus指标（所有工作进程合计）"""
+    body = render_worker_metrics(get_state_backend(), settings.METRICS_PUBLISH_INTERVAL * 3)
+    return Response(body, media_type="text/plain; version=0.0.4")
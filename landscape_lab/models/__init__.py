@@ -0,0 +1,13 @@
+# 导入全部模型，使其注册到 Base.metadata
+from .analysis_artifact import AnalysisArtifact
+from .audit_log import AuditLog
+from .base import Base
+from .material import Material, MaterialImage, MaterialUsage
+from .plant import Plant, PlantImage, PlantLocation
+from .project import Project
+from .project_file import ProjectFile
+from .project_materials import project_materials
+from .project_plants import project_plants
+from .project_version import ProjectVersion
+from .revoked_token import RevokedToken
+from .user import User
@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, String, Text
+
+from .base import Base
+
+class AnalysisArtifact(Base):
+    """项目分析产物（植物分布、覆盖面积、报告等派生结果）
+
+    记录计算时的输入指纹：输入文件哈希、上游产物的结果哈希与参数。
+    指纹不变时直接复用结果，只重新计算输入发生变化的产物。
+    """
+    __tablename__ = "analysis_artifacts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    name = Column(String, nullable=False)
+    kind = Column(String, nullable=False)
+    # {输入名: 哈希}，文件输入为 "file:<文件名>"，上游产物为产物名
+    inputs = Column(Text, nullable=False)
+    params = Column(Text, nullable=False)
+    fingerprint = Column(String(64), nullable=False)
+    result = Column(Text, nullable=True)
+    result_hash = Column(String(64), nullable=True)
+    # 上游输入变化后标记为脏，重新计算后清除
+    dirty = Column(Boolean, nullable=False, default=False)
+    duration_ms = Column(Float, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_analysis_artifacts_project_name", "project_id", "name", unique=True),
+    )
+
+    def __repr__(self):
+        return f"<AnalysisArtifact(id={self.id}, name={self.name})>"
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+
+from .base import Base
+
+class AuditLog(Base):
+    """操作日志（只追加，不修改、不删除）
+
+    由后台线程批量写入（见 utils/audit.py），occurred_at 为操作发生的时间而非写入时间。
+    """
+    __tablename__ = "audit_logs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    occurred_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    # 操作用户，后台任务等无用户的操作为空
+    user_id = Column(Integer, nullable=True, index=True)
+    # create / update / delete 等
+    action = Column(String, nullable=False)
+    resource_type = Column(String, nullable=False)
+    resource_id = Column(String, nullable=True)
+    # 附加信息（JSON），如修改的字段名
+    details = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index("ix_audit_logs_resource", "resource_type", "resource_id"),
+    )
+
+    def __repr__(self):
+        return f"<AuditLog(id={self.id}, action={self.action}, resource_type={self.resource_type})>"
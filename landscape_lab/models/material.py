@@ -1,10 +1,11 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Column, DateTime, Float, Integer, String, Text
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, Text, event, func, select
 from sqlalchemy.orm import relationship
 
 from .base import Base
+from .project_materials import project_materials
 
 class Material(Base):
     """材料模型"""
@@ -12,19 +13,75 @@ class Material(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
-    type = Column(String, nullable=False)
+    type = Column(String, nullable=False, index=True)
+    category = Column(String, nullable=True, index=True)
     description = Column(Text, nullable=True)
     unit = Column(String, nullable=False)
     unit_price = Column(Float, nullable=False)
     density = Column(Float, nullable=True)
     strength = Column(Float, nullable=True)
+    # 透水率（0-1），雨水径流模拟中按材料名称匹配模型表面
+    permeability = Column(Float, nullable=True)
     color = Column(String, nullable=True)
     texture_url = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_by = Column(Integer, ForeignKey("users.id"), index=True)
+    # 引用该材料的项目用量条目数（随用量增删维护）
+    # 只由ORM事件维护，绕过ORM的写入后用 `landscape-lab rebuild-usage-counts` 重新统计
+    usage_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    # 与项目的多对多关系
-    projects = relationship("Project", secondary="project_materials", back_populates="materials")
+    # 与项目的多对多关系（只读，用量条目通过 MaterialUsage 维护）
+    projects = relationship("Project", secondary="project_materials", back_populates="materials",
+                            viewonly=True)
 
     def __repr__(self):
         return f"<Material(id={self.id}, name={self.name})>"
+
+class MaterialImage(Base):
+    """材料图片模型"""
+    __tablename__ = "material_images"
+
+    id = Column(Integer, primary_key=True, index=True)
+    material_id = Column(Integer, ForeignKey("materials.id"), nullable=False, index=True)
+    file_name = Column(String, nullable=False)
+    file_path = Column(String, nullable=False)
+    uploaded_by = Column(Integer, ForeignKey("users.id"))
+    uploaded_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<MaterialImage(id={self.id}, file_name={self.file_name})>"
+
+class MaterialUsage(Base):
+    """项目中的材料用量（映射到 project_materials 关联表）"""
+    __table__ = project_materials
+
+    def __repr__(self):
+        return f"<MaterialUsage(id={self.id}, project_id={self.project_id}, material_id={self.material_id})>"
+
+def _update_material_usage(connection, material_id: int, amount: int):
+    connection.execute(
+        Material.__table__.update()
+        .where(Material.id == material_id)
+        # 保持 updated_at 不变，用量变化不算作材料信息修改
+        .values(usage_count=Material.usage_count + amount, updated_at=Material.updated_at)
+    )
+
+def rebuild_material_usage(connection):
+    """按用量条目重新统计全部材料的引用计数（批量导入、批量删除等绕过ORM事件的写入后调用）"""
+    count = (
+        select(func.count(project_materials.c.id))
+        .where(project_materials.c.material_id == Material.id)
+        .scalar_subquery()
+    )
+    connection.execute(
+        Material.__table__.update().values(usage_count=count, updated_at=Material.updated_at)
+    )
+
+@event.listens_for(MaterialUsage, "after_insert")
+def _increment_material_usage(mapper, connection, target):
+    _update_material_usage(connection, target.material_id, 1)
+
+@event.listens_for(MaterialUsage, "after_delete")
+def _decrement_material_usage(mapper, connection, target):
+    _update_material_usage(connection, target.material_id, -1)
@@ -1,10 +1,11 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, Text, event, func, select
 from sqlalchemy.orm import relationship
 
 from .base import Base
+from .project_plants import project_plants
 
 class Plant(Base):
     """植物模型"""
@@ -13,6 +14,7 @@ class Plant(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     scientific_name = Column(String, nullable=False)
+    category = Column(String, nullable=True, index=True)
     description = Column(Text, nullable=True)
     height = Column(Float, nullable=True)
     spread = Column(Float, nullable=True)
@@ -22,11 +24,65 @@ class Plant(Base):
     soil_type = Column(String, nullable=True)
     hardiness_zone = Column(String, nullable=True)
     image_url = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_by = Column(Integer, ForeignKey("users.id"), index=True)
+    # 引用该植物的项目配置条目数（随配置增删维护，避免统计时扫描关联表）
+    # 只由ORM事件维护，绕过ORM的写入后用 `landscape-lab rebuild-usage-counts` 重新统计
+    usage_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    # 与项目的多对多关系
-    projects = relationship("Project", secondary="project_plants", back_populates="plants")
+    # 与项目的多对多关系（只读，配置条目通过 PlantLocation 维护）
+    projects = relationship("Project", secondary="project_plants", back_populates="plants",
+                            viewonly=True)
 
     def __repr__(self):
         return f"<Plant(id={self.id}, name={self.name})>"
+
+class PlantImage(Base):
+    """植物图片模型"""
+    __tablename__ = "plant_images"
+
+    id = Column(Integer, primary_key=True, index=True)
+    plant_id = Column(Integer, ForeignKey("plants.id"), nullable=False, index=True)
+    file_name = Column(String, nullable=False)
+    file_path = Column(String, nullable=False)
+    uploaded_by = Column(Integer, ForeignKey("users.id"))
+    uploaded_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<PlantImage(id={self.id}, file_name={self.file_name})>"
+
+class PlantLocation(Base):
+    """项目中的植物配置（映射到 project_plants 关联表）"""
+    __table__ = project_plants
+
+    def __repr__(self):
+        return f"<PlantLocation(id={self.id}, project_id={self.project_id}, plant_id={self.plant_id})>"
+
+def update_plant_usage(connection, plant_id: int, amount: int):
+    """调整植物的引用计数（批量写入配置条目、绕过ORM事件时需手动调用）"""
+    connection.execute(
+        Plant.__table__.update()
+        .where(Plant.id == plant_id)
+        # 保持 updated_at 不变，用量变化不算作植物信息修改
+        .values(usage_count=Plant.usage_count + amount, updated_at=Plant.updated_at)
+    )
+
+def rebuild_plant_usage(connection):
+    """按配置条目重新统计全部植物的引用计数（批量导入、批量删除等绕过ORM事件的写入后调用）"""
+    count = (
+        select(func.count(project_plants.c.id))
+        .where(project_plants.c.plant_id == Plant.id)
+        .scalar_subquery()
+    )
+    connection.execute(
+        Plant.__table__.update().values(usage_count=count, updated_at=Plant.updated_at)
+    )
+
+@event.listens_for(PlantLocation, "after_insert")
+def _increment_plant_usage(mapper, connection, target):
+    update_plant_usage(connection, target.plant_id, 1)
+
+@event.listens_for(PlantLocation, "after_delete")
+def _decrement_plant_usage(mapper, connection, target):
+    update_plant_usage(connection, target.plant_id, -1)
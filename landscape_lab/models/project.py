@@ -1,9 +1,10 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, Float
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Index, Integer, String, Text, Float, event, inspect
 from sqlalchemy.orm import relationship
 
+from ..utils.geo_utils import footprint_centroid_and_area, project_bounds, update_spatial_index
 from .base import Base
 
 class Project(Base):
@@ -15,19 +16,75 @@ class Project(Base):
     description = Column(Text, nullable=True)
     location = Column(String, nullable=True)
     area = Column(Float, nullable=True)
-    status = Column(String, nullable=False, default="planning")
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # 位置：WGS84经纬度，占地范围为GeoJSON Polygon/MultiPolygon（经纬度坐标）
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    footprint = Column(JSON, nullable=True)
+    status = Column(String, nullable=False, default="planning", index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # 与用户的关系
     owner_id = Column(Integer, ForeignKey("users.id"))
     owner = relationship("User", back_populates="projects")
 
-    # 与植物的多对多关系
-    plants = relationship("Plant", secondary="project_plants", back_populates="projects")
+    # 与植物的多对多关系（只读）
+    plants = relationship("Plant", secondary="project_plants", back_populates="projects", viewonly=True)
 
-    # 与材料的多对多关系
-    materials = relationship("Material", secondary="project_materials", back_populates="projects")
+    # 与材料的多对多关系（只读）
+    materials = relationship("Material", secondary="project_materials", back_populates="projects",
+                             viewonly=True)
+
+    # 植物配置与材料用量条目，随项目一起删除
+    plant_locations = relationship("PlantLocation", cascade="all, delete-orphan")
+    material_usages = relationship("MaterialUsage", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # 按所有者筛选并按创建时间排序（“我的项目”列表）
+        Index("ix_projects_owner_created", "owner_id", "created_at"),
+        # 未启用R*Tree空间索引时按经纬度范围筛选
+        Index("ix_projects_lat_lon", "latitude", "longitude"),
+    )
 
     def __repr__(self):
         return f"<Project(id={self.id}, name={self.name})>"
+
+# 影响空间索引的字段
+LOCATION_FIELDS = ("latitude", "longitude", "footprint")
+
+@event.listens_for(Project, "before_insert")
+def _fill_location_from_footprint(mapper, connection, target):
+    """只给出占地范围时，以其形心作为坐标，并以其面积补全 area"""
+    if not target.footprint:
+        return
+    longitude, latitude, area = footprint_centroid_and_area(target.footprint)
+    if target.latitude is None or target.longitude is None:
+        target.latitude, target.longitude = latitude, longitude
+    if target.area is None:
+        target.area = round(area, 2)
+
+@event.listens_for(Project, "before_update")
+def _refresh_location_from_footprint(mapper, connection, target):
+    """占地范围改变时重新计算形心与面积，同一次修改中显式给出的坐标、面积保持不变"""
+    state = inspect(target)
+    if not target.footprint or not state.attrs.footprint.history.has_changes():
+        return
+    longitude, latitude, area = footprint_centroid_and_area(target.footprint)
+    if not (state.attrs.latitude.history.has_changes() or state.attrs.longitude.history.has_changes()):
+        target.latitude, target.longitude = latitude, longitude
+    if not state.attrs.area.history.has_changes():
+        target.area = round(area, 2)
+
+@event.listens_for(Project, "after_insert")
+def _index_project_location(mapper, connection, target):
+    update_spatial_index(connection, target.id, project_bounds(target.latitude, target.longitude, target.footprint))
+
+@event.listens_for(Project, "after_update")
+def _reindex_project_location(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in LOCATION_FIELDS):
+        _index_project_location(mapper, connection, target)
+
+@event.listens_for(Project, "after_delete")
+def _unindex_project_location(mapper, connection, target):
+    update_spatial_index(connection, target.id, None)
@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+
+from .base import Base
+
+class ProjectFile(Base):
+    """项目文件模型"""
+    __tablename__ = "project_files"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, index=True)
+    file_name = Column(String, nullable=False)
+    file_path = Column(String, nullable=False)
+    file_hash = Column(String(64), nullable=True)
+    file_size = Column(Integer, nullable=True)
+    uploaded_by = Column(Integer, ForeignKey("users.id"))
+    uploaded_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ProjectFile(id={self.id}, file_name={self.file_name})>"
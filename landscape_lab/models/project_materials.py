@@ -1,10 +1,20 @@
-from sqlalchemy import Column, ForeignKey, Integer, Table
+from sqlalchemy import Column, Float, ForeignKey, Index, Integer, String, Table
 
 from .base import Base
 
+# 项目材料用量：单价取自材料表，工程量清单在SQL中汇总
 project_materials = Table(
     "project_materials",
     Base.metadata,
-    Column("project_id", Integer, ForeignKey("projects.id"), primary_key=True),
-    Column("material_id", Integer, ForeignKey("materials.id"), primary_key=True)
+    Column("id", Integer, primary_key=True),
+    Column("project_id", Integer, ForeignKey("projects.id"), nullable=False),
+    Column("material_id", Integer, ForeignKey("materials.id"), nullable=False),
+    Column("quantity", Float, nullable=False, default=0),
+    Column("unit", String, nullable=True),
+    Column("position_x", Float, nullable=True),
+    Column("position_y", Float, nullable=True),
+    Column("position_z", Float, nullable=True),
+    # 覆盖索引：工程量清单按项目汇总时无需回表
+    Index("ix_project_materials_project_material", "project_id", "material_id", "unit", "quantity"),
+    Index("ix_project_materials_material", "material_id")
 )
@@ -1,10 +1,20 @@
-from sqlalchemy import Column, ForeignKey, Integer, Table
+from sqlalchemy import Column, Float, ForeignKey, Index, Integer, String, Table
 
 from .base import Base
 
+# 项目植物配置：同一植物可在项目中出现多次（不同位置、数量）
 project_plants = Table(
     "project_plants",
     Base.metadata,
-    Column("project_id", Integer, ForeignKey("projects.id"), primary_key=True),
-    Column("plant_id", Integer, ForeignKey("plants.id"), primary_key=True)
+    Column("id", Integer, primary_key=True),
+    Column("project_id", Integer, ForeignKey("projects.id"), nullable=False),
+    Column("plant_id", Integer, ForeignKey("plants.id"), nullable=False),
+    Column("quantity", Float, nullable=False, default=1),
+    Column("unit", String, nullable=True),
+    Column("position_x", Float, nullable=True),
+    Column("position_y", Float, nullable=True),
+    Column("position_z", Float, nullable=True),
+    # 覆盖索引：按项目汇总数量时无需回表
+    Index("ix_project_plants_project_plant", "project_id", "plant_id", "unit", "quantity"),
+    Index("ix_project_plants_plant", "plant_id")
 )
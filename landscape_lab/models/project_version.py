@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
+
+from .base import Base
+
+class ProjectVersion(Base):
+    """项目版本模型
+
+    每个版本保存相对上一版本的增量（delta），每隔若干版本额外保存一次
+    完整快照（snapshot），用于限制还原历史状态时需要回放的增量数量。
+    """
+    __tablename__ = "project_versions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    version = Column(String, nullable=False)
+    sequence = Column(Integer, nullable=False)
+    delta = Column(Text, nullable=False)
+    snapshot = Column(Text, nullable=True)
+    change_count = Column(Integer, nullable=False, default=0)
+    created_by = Column(Integer, ForeignKey("users.id"))
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_project_versions_project_sequence", "project_id", "sequence", unique=True),
+    )
+
+    def __repr__(self):
+        return f"<ProjectVersion(id={self.id}, version={self.version})>"
@@ -0,0 +1,17 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, String
+
+from .base import Base
+
+class RevokedToken(Base):
+    """已吊销的刷新令牌（jti）或令牌族"""
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String, primary_key=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    # 各工作进程按吊销时间增量加载
+    revoked_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f"<RevokedToken(jti={self.jti})>"
@@ -0,0 +1,84 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+class MaterialBase(BaseModel):
+    name: str
+    type: str
+    category: Optional[str] = None
+    description: Optional[str] = None
+    unit: str
+    unit_price: float
+    density: Optional[float] = None
+    strength: Optional[float] = None
+    permeability: Optional[float] = Field(None, ge=0, le=1)
+    color: Optional[str] = None
+    texture_url: Optional[str] = None
+
+class MaterialCreate(MaterialBase):
+    pass
+
+class MaterialUpdate(BaseModel):
+    name: Optional[str] = None
+    type: Optional[str] = None
+    category: Optional[str] = None
+    description: Optional[str] = None
+    unit: Optional[str] = None
+    unit_price: Optional[float] = None
+    density: Optional[float] = None
+    strength: Optional[float] = None
+    permeability: Optional[float] = Field(None, ge=0, le=1)
+    color: Optional[str] = None
+    texture_url: Optional[str] = None
+
+class MaterialPublic(MaterialBase):
+    id: int
+    created_by: Optional[int]
+    usage_count: int
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        orm_mode = True
+
+class MaterialSearchResult(BaseModel):
+    id: int
+    name: str
+    type: str
+    category: Optional[str]
+    unit: str
+    unit_price: float
+
+    class Config:
+        orm_mode = True
+
+class MaterialStatistics(BaseModel):
+    total_materials: int
+    material_categories: List[Dict[str, Any]]
+    recent_additions: List[MaterialSearchResult]
+
+class MaterialImageOut(BaseModel):
+    id: int
+    material_id: int
+    file_name: str
+    uploaded_by: Optional[int]
+    uploaded_at: datetime
+
+    class Config:
+        orm_mode = True
+
+class MaterialUsageCreate(BaseModel):
+    project_id: int
+    material_id: int
+    quantity: float
+    unit: Optional[str] = None
+    position_x: Optional[float] = None
+    position_y: Optional[float] = None
+    position_z: Optional[float] = None
+
+class MaterialUsageOut(MaterialUsageCreate):
+    id: int
+
+    class Config:
+        orm_mode = True
@@ -0,0 +1,113 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+class PlantBase(BaseModel):
+    name: str
+    scientific_name: str
+    category: Optional[str] = None
+    description: Optional[str] = None
+    height: Optional[float] = None
+    spread: Optional[float] = None
+    growth_rate: Optional[str] = None
+    sunlight: Optional[str] = None
+    water_requirements: Optional[str] = None
+    soil_type: Optional[str] = None
+    hardiness_zone: Optional[str] = None
+    image_url: Optional[str] = None
+
+class PlantCreate(PlantBase):
+    pass
+
+class PlantUpdate(BaseModel):
+    name: Optional[str] = None
+    scientific_name: Optional[str] = None
+    category: Optional[str] = None
+    description: Optional[str] = None
+    height: Optional[float] = None
+    spread: Optional[float] = None
+    growth_rate: Optional[str] = None
+    sunlight: Optional[str] = None
+    water_requirements: Optional[str] = None
+    soil_type: Optional[str] = None
+    hardiness_zone: Optional[str] = None
+    image_url: Optional[str] = None
+
+class PlantPublic(PlantBase):
+    id: int
+    created_by: Optional[int]
+    usage_count: int
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        orm_mode = True
+
+class PlantSearchResult(BaseModel):
+    id: int
+    name: str
+    scientific_name: str
+    category: Optional[str]
+    image_url: Optional[str]
+
+    class Config:
+        orm_mode = True
+
+class PlantRecommendation(BaseModel):
+    id: int
+    name: str
+    scientific_name: str
+    category: Optional[str]
+    height: Optional[float]
+    spread: Optional[float]
+    score: float
+    # 各项条件得分（0~1）
+    scores: Dict[str, float]
+
+class PlantNameMatchRequest(BaseModel):
+    names: List[str] = Field(..., max_items=10000)
+    limit: int = Field(5, ge=1, le=50)
+    min_score: Optional[float] = Field(None, ge=0, le=1)
+
+class PlantNameCandidate(BaseModel):
+    id: int
+    name: str
+    scientific_name: str
+    score: float
+    matched_field: str
+
+class PlantNameMatch(BaseModel):
+    query: str
+    normalized: str
+    candidates: List[PlantNameCandidate]
+
+class PlantStatistics(BaseModel):
+    total_plants: int
+    plant_categories: List[Dict[str, Any]]
+    recent_additions: List[PlantSearchResult]
+
+class PlantImageOut(BaseModel):
+    id: int
+    plant_id: int
+    file_name: str
+    uploaded_by: Optional[int]
+    uploaded_at: datetime
+
+    class Config:
+        orm_mode = True
+
+class PlantLocationCreate(BaseModel):
+    project_id: int
+    plant_id: int
+    quantity: float = 1
+    unit: Optional[str] = None
+    position_x: Optional[float] = None
+    position_y: Optional[float] = None
+    position_z: Optional[float] = None
+
+class PlantLocationOut(PlantLocationCreate):
+    id: int
+
+    class Config:
+        orm_mode = True
@@ -0,0 +1,124 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field, validator
+
+from ..utils.geo_utils import validate_footprint
+
+def _check_footprint(value: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    return validate_footprint(value) if value is not None else value
+
+class ProjectBase(BaseModel):
+    name: str
+    description: Optional[str] = None
+    location: Optional[str] = None
+    area: Optional[float] = None
+    status: str = "planning"
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    footprint: Optional[Dict[str, Any]] = None
+
+    _validate_footprint = validator("footprint", allow_reuse=True)(_check_footprint)
+
+class ProjectCreate(ProjectBase):
+    pass
+
+class ProjectUpdate(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    location: Optional[str] = None
+    area: Optional[float] = None
+    status: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    footprint: Optional[Dict[str, Any]] = None
+
+    _validate_footprint = validator("footprint", allow_reuse=True)(_check_footprint)
+
+class ProjectPublic(ProjectBase):
+    id: int
+    owner_id: Optional[int]
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        orm_mode = True
+
+class ProjectSearchResult(BaseModel):
+    id: int
+    name: str
+    location: Optional[str]
+    status: str
+    owner_id: Optional[int]
+
+    class Config:
+        orm_mode = True
+
+class ProjectGeoResult(BaseModel):
+    id: int
+    name: str
+    status: str
+    owner_id: Optional[int]
+    latitude: Optional[float]
+    longitude: Optional[float]
+    footprint: Optional[Dict[str, Any]] = None
+    distance_km: Optional[float] = None
+
+class ProjectStatistics(BaseModel):
+    total_projects: int
+    project_statuses: List[Dict[str, Any]]
+    recent_additions: List[ProjectSearchResult]
+
+class ProjectFileOut(BaseModel):
+    id: int
+    project_id: int
+    file_name: str
+    file_hash: Optional[str]
+    file_size: Optional[int]
+    uploaded_by: Optional[int]
+    uploaded_at: datetime
+
+    class Config:
+        orm_mode = True
+
+class ProjectVersionOut(BaseModel):
+    id: int
+    project_id: int
+    version: str
+    sequence: int
+    change_count: int
+    created_by: Optional[int]
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+
+class ProjectVersionState(ProjectVersionOut):
+    state: Dict[str, Dict[str, Any]]
+
+class ProjectVersionDiff(BaseModel):
+    base_version_id: int
+    target_version_id: int
+    changes: Dict[str, Dict[str, Any]]
+
+class MaterialQuantity(BaseModel):
+    material_id: int
+    name: str
+    unit: str
+    unit_price: float
+    quantity: float
+    line_items: int
+    total_cost: float
+
+class PlantQuantity(BaseModel):
+    plant_id: int
+    name: str
+    unit: Optional[str]
+    quantity: float
+    line_items: int
+
+class BillOfQuantities(BaseModel):
+    project_id: int
+    materials: List[MaterialQuantity]
+    plants: List[PlantQuantity]
+    total_cost: float
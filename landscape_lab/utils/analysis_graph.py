@@ -0,0 +1,287 @@
+# landscape_lab/utils/analysis_graph.py
+"""项目分析依赖图：文件变化后只重新计算受影响的产物
+
+节点（产物）：
+- distribution:<文件名>  单个模型文件的植物分布（analyze_plant_distribution）
+- drawing:<文件名>       单个DXF图纸的元素统计（parse_dxf_file）
+- plants                合并各模型文件的植物分布，并按名称匹配植物库ID
+- coverage              全项目植物覆盖面积（依赖 plants）
+- drawings              合并各图纸的元素统计
+- report                植物统计报告（依赖 plants、coverage）
+
+节点指纹由类型、参数及各输入的哈希组成：文件输入取文件哈希，上游节点取其结果哈希。
+指纹与上次计算时一致时直接复用结果；重新计算后结果哈希不变时，下游节点的指纹也不变，
+不会继续重算。同名文件重新上传视为替换，以最新上传的为准。
+distribution 节点的参数含节点分类规则指纹，plants 节点的参数含植物库指纹，
+规则或植物库变化后相应节点重新计算。
+"""
+import hashlib
+import json
+import time
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models.analysis_artifact import AnalysisArtifact
+from ..models.plant import Plant
+from ..models.project_file import ProjectFile
+from .analysis_utils import (
+    analyze_plant_distribution,
+    calculate_coverage_area,
+    generate_plant_report,
+    parse_dxf_file,
+    resolve_plant_ids
+)
+from .classify_utils import get_rules_fingerprint, group_species_labels
+from .file_utils import UPLOAD_ROOT
+from .state import finish_job, start_job
+
+# 按扩展名决定文件参与的分析
+DISTRIBUTION_EXTENSIONS = {".fbx", ".obj", ".glb", ".gltf", ".ply", ".stl"}
+DRAWING_EXTENSIONS = {".dxf"}
+# 文件输入在产物 inputs 中的前缀
+FILE_INPUT_PREFIX = "file:"
+REPORT_NAME = "plant_report.xlsx"
+
+def _hash_json(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+
+def get_current_files(db: Session, project_id: int) -> Dict[str, ProjectFile]:
+    """项目当前文件：同名文件取最新上传的一份"""
+    files = db.query(ProjectFile).filter(
+        ProjectFile.project_id == project_id
+    ).order_by(ProjectFile.id).all()
+    return {db_file.file_name: db_file for db_file in files}
+
+def get_report_path(project_id: int) -> Path:
+    """项目植物统计报告路径"""
+    return UPLOAD_ROOT / str(project_id) / "analysis" / REPORT_NAME
+
+def get_catalogue_fingerprint(db: Session) -> str:
+    """植物库指纹（植物数、最大ID与最近更新时间），植物增删改后变化"""
+    return _hash_json(list(db.query(func.count(Plant.id), func.max(Plant.id), func.max(Plant.updated_at)).one()))
+
+def build_analysis_graph(files: Dict[str, ProjectFile],
+                         catalogue: Optional[str] = None) -> "OrderedDict[str, Dict[str, Any]]":
+    """按当前文件构建依赖图，返回 {节点名: {kind, inputs, params}}，已按依赖顺序排列
+
+    inputs 为输入名列表：文件输入为 "file:<文件名>"，其余为上游节点名。
+    catalogue 为植物库指纹，为None时 plants 节点不匹配植物库ID。
+    """
+    rules = get_rules_fingerprint()
+    graph = OrderedDict()
+    distributions, drawings = [], []
+    for file_name in sorted(files):
+        suffix = Path(file_name).suffix.lower()
+        if suffix in DISTRIBUTION_EXTENSIONS:
+            name = f"distribution:{file_name}"
+            distributions.append(name)
+        elif suffix in DRAWING_EXTENSIONS:
+            name = f"drawing:{file_name}"
+            drawings.append(name)
+        else:
+            continue
+        kind = name.split(":", 1)[0]
+        params = {"rules": rules} if kind == "distribution" else {}
+        graph[name] = {"kind": kind, "inputs": [FILE_INPUT_PREFIX + file_name], "params": params}
+
+    graph["plants"] = {"kind": "plants", "inputs": distributions,
+                       "params": {"catalogue": catalogue} if catalogue else {}}
+    graph["coverage"] = {"kind": "coverage", "inputs": ["plants"], "params": {}}
+    graph["drawings"] = {"kind": "drawings", "inputs": drawings, "params": {}}
+    graph["report"] = {"kind": "report", "inputs": ["plants", "coverage"], "params": {"file": REPORT_NAME}}
+    return graph
+
+def _merge_distributions(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """合并多个模型文件的植物分布"""
+    # 不同文件中同一物种的写法可能不同，规范化后归为一组
+    groups = group_species_labels([name for result in results for name in result.get("plant_stats", {})])
+    plant_stats = defaultdict(lambda: {"count": 0, "positions": []})
+    for result in results:
+        for name, info in result.get("plant_stats", {}).items():
+            plant_stats[groups[name]]["count"] += info["count"]
+            plant_stats[groups[name]]["positions"].extend(info["positions"])
+    return {
+        "plant_stats": dict(plant_stats),
+        "plant_count": sum(info["count"] for info in plant_stats.values())
+    }
+
+def _merge_drawings(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """合并多个图纸的元素统计"""
+    element_stats = defaultdict(int)
+    for result in results:
+        for element, count in result.get("element_stats", {}).items():
+            element_stats[element] += count
+    return {"element_stats": dict(element_stats), "drawing_count": len(results)}
+
+def _compute_node(project_id: int, node: Dict[str, Any], files: Dict[str, ProjectFile],
+                  upstream: List[Dict[str, Any]], db: Optional[Session] = None) -> Optional[Dict[str, Any]]:
+    """计算单个节点，失败时返回None"""
+    kind = node["kind"]
+    if kind in ("distribution", "drawing"):
+        file_path = files[node["inputs"][0][len(FILE_INPUT_PREFIX):]].file_path
+        analyze = analyze_plant_distribution if kind == "distribution" else parse_dxf_file
+        return analyze(file_path) or None
+    if kind == "plants":
+        merged = _merge_distributions(upstream)
+        if db is not None and node["params"].get("catalogue"):
+            from .name_utils import get_name_index
+
+            resolve_plant_ids(get_name_index(db), merged["plant_stats"])
+        return merged
+    if kind == "drawings":
+        return _merge_drawings(upstream)
+    if kind == "coverage":
+        return {"total_area": calculate_coverage_area(upstream[0]["plant_stats"])}
+    if kind == "report":
+        report_path = get_report_path(project_id)
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        plants, coverage = upstream
+        if not generate_plant_report({**plants, **coverage}, str(report_path)):
+            return None
+        return {"path": str(report_path), "rows": len(plants["plant_stats"]) + 1}
+    raise ValueError(f"Unknown analysis kind: {kind}")
+
+def mark_file_changed(db: Session, project_id: int, file_name: str) -> List[str]:
+    """文件新增或替换后，将依赖该文件的产物及其下游标记为脏，返回被标记的产物名
+
+    新文件还没有对应产物，合并节点的输入集合随之变化，同样需要标记。
+    """
+    artifacts = db.query(AnalysisArtifact).filter(AnalysisArtifact.project_id == project_id).all()
+    if not artifacts:
+        return []
+    dependents = defaultdict(list)
+    for artifact in artifacts:
+        for input_name in json.loads(artifact.inputs):
+            dependents[input_name].append(artifact)
+
+    by_name = {artifact.name: artifact for artifact in artifacts}
+    suffix = Path(file_name).suffix.lower()
+    stack = list(dependents[FILE_INPUT_PREFIX + file_name])
+    # 新文件会加入的合并节点
+    if suffix in DISTRIBUTION_EXTENSIONS and "plants" in by_name:
+        stack.append(by_name["plants"])
+    elif suffix in DRAWING_EXTENSIONS and "drawings" in by_name:
+        stack.append(by_name["drawings"])
+
+    marked = set()
+    while stack:
+        artifact = stack.pop()
+        if artifact.name in marked:
+            continue
+        marked.add(artifact.name)
+        artifact.dirty = True
+        stack.extend(dependents[artifact.name])
+    db.commit()
+    return sorted(marked)
+
+def update_project_analysis(db: Session, project_id: int, force: bool = False) -> Dict[str, Any]:
+    """按依赖顺序更新项目分析产物，只重新计算指纹变化的节点，force 为True时全部重算"""
+    started = time.perf_counter()
+    files = get_current_files(db, project_id)
+    graph = build_analysis_graph(files, get_catalogue_fingerprint(db))
+    artifacts = {
+        artifact.name: artifact
+        for artifact in db.query(AnalysisArtifact).filter(AnalysisArtifact.project_id == project_id)
+    }
+
+    result_hashes, results = {}, {}
+    recomputed, reused, failed = [], [], []
+    for name, node in graph.items():
+        inputs = {}
+        for input_name in node["inputs"]:
+            if input_name.startswith(FILE_INPUT_PREFIX):
+                db_file = files[input_name[len(FILE_INPUT_PREFIX):]]
+                inputs[input_name] = db_file.file_hash or db_file.file_path
+            else:
+                inputs[input_name] = result_hashes.get(input_name)
+        fingerprint = _hash_json({"kind": node["kind"], "inputs": inputs, "params": node["params"]})
+
+        artifact = artifacts.get(name)
+        # 脏标记只表示结果待更新，是否重算以指纹为准（重新上传相同内容时不必重算）
+        if not force and artifact is not None and artifact.fingerprint == fingerprint and artifact.result_hash:
+            artifact.dirty = False
+            result_hashes[name] = artifact.result_hash
+            reused.append(name)
+            continue
+
+        # 上游失败时不计算下游，已有结果保留但标记为脏
+        if any(value is None for value in inputs.values()):
+            if artifact is not None:
+                artifact.dirty = True
+            failed.append(name)
+            continue
+
+        node_started = time.perf_counter()
+        try:
+            upstream = [results[i] if i in results else json.loads(artifacts[i].result)
+                        for i in node["inputs"] if not i.startswith(FILE_INPUT_PREFIX)]
+            result = _compute_node(project_id, node, files, upstream, db)
+        except Exception as e:
+            print(f"Error computing analysis {name}: {e}")
+            result = None
+        if result is None:
+            if artifact is not None:
+                artifact.dirty = True
+            failed.append(name)
+            continue
+
+        encoded = json.dumps(result, sort_keys=True, default=str)
+        if artifact is None:
+            artifact = AnalysisArtifact(project_id=project_id, name=name, kind=node["kind"])
+            db.add(artifact)
+            artifacts[name] = artifact
+        artifact.inputs = json.dumps(inputs, sort_keys=True)
+        artifact.params = json.dumps(node["params"], sort_keys=True)
+        artifact.fingerprint = fingerprint
+        artifact.result = encoded
+        artifact.result_hash = hashlib.sha256(encoded.encode()).hexdigest()
+        artifact.dirty = False
+        artifact.duration_ms = (time.perf_counter() - node_started) * 1000
+        results[name] = result
+        result_hashes[name] = artifact.result_hash
+        recomputed.append(name)
+
+    # 已删除或改名的文件对应的产物
+    removed = [name for name in artifacts if name not in graph]
+    for name in removed:
+        db.delete(artifacts[name])
+    db.commit()
+    return {
+        "recomputed": recomputed,
+        "reused": reused,
+        "failed": failed,
+        "removed": removed,
+        "duration_ms": (time.perf_counter() - started) * 1000
+    }
+
+def get_analysis_job_id(project_id: int) -> str:
+    """项目分析更新任务ID"""
+    return f"analysis:{project_id}"
+
+def run_analysis_job(job_id: str, project_id: int, force: bool = False):
+    """在独立的数据库会话中更新项目分析并记录任务结果"""
+    summary = {}
+    db = SessionLocal()
+    try:
+        summary = update_project_analysis(db, project_id, force)
+    except Exception as e:
+        print(f"Error updating project analysis: {e}")
+    finally:
+        db.close()
+        finish_job(job_id, bool(summary) and not summary["failed"], **summary)
+
+def schedule_analysis_update(background_tasks, project_id: int, force: bool = False) -> Optional[str]:
+    """登记并在后台执行分析更新，已有更新在执行时返回None
+
+    执行中的更新不会看到之后上传的文件，这些文件的产物保持为脏，下次更新时计算。
+    """
+    job_id = get_analysis_job_id(project_id)
+    if not start_job(job_id):
+        return None
+    background_tasks.add_task(run_analysis_job, job_id, project_id, force)
+    return job_id
@@ -1,50 +1,125 @@
 # landscape_lab/utils/analysis_utils.py
-import pandas as pd
-from typing import List, Dict, Any
+# pandas、numpy、trimesh、ezdxf 导入耗时较长，均在首次使用时于函数内导入，
+# 以免拖慢工作进程启动
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
 from datetime import datetime
-import numpy as np
 from pathlib import Path
 import json
-import trimesh
-import ezdxf
 from collections import defaultdict
+from .metrics import timed
 
-def analyze_plant_distribution(fbx_path: str) -> Dict[str, Any]:
-    """分析FBX文件中的植物分布"""
+if TYPE_CHECKING:
+    import numpy as np
+    from .name_utils import NameIndex
+
+def _scene_node_names(scene) -> Tuple[List[str], List[Tuple[Optional[str], ...]], "np.ndarray"]:
+    """场景中带几何体的节点、各节点用于分类的名称（节点/几何体/材质/父节点）及其世界坐标位置
+
+    按父子关系逐级组合变换并缓存中间节点的世界矩阵，避免对每个节点单独查询变换。
+    """
+    import numpy as np
+
+    graph = scene.graph
+    parents = graph.transforms.parents
+    edge_data = graph.transforms.edge_data
+    base_frame = graph.base_frame
+    identity = np.eye(4)
+    world_matrices = {base_frame: identity}
+
+    def world_matrix(node: str) -> "np.ndarray":
+        matrix = world_matrices.get(node)
+        if matrix is None:
+            parent = parents.get(node)
+            local = edge_data.get((parent, node), {}).get("matrix") if parent is not None else None
+            local = identity if local is None else np.asarray(local, dtype=np.float64)
+            matrix = local if parent is None or parent == base_frame else world_matrix(parent) @ local
+            world_matrices[node] = matrix
+        return matrix
+
+    materials = {}
+    for geometry_name, geometry in scene.geometry.items():
+        material = getattr(getattr(getattr(geometry, "visual", None), "material", None), "name", None)
+        materials[geometry_name] = material if isinstance(material, str) else None
+
+    nodes = list(graph.nodes_geometry)
+    names = []
+    positions = np.empty((len(nodes), 3))
+    for i, node in enumerate(nodes):
+        parent = parents.get(node)
+        geometry_name = edge_data.get((parent, node), {}).get("geometry")
+        layer = parent if parent is not None and parent != base_frame else None
+        names.append((node, geometry_name, materials.get(geometry_name), layer))
+        # 只需位置：父节点世界矩阵作用于本节点局部平移
+        local = edge_data.get((parent, node), {}).get("matrix")
+        translation = identity[:3, 3] if local is None else np.asarray(local, dtype=np.float64)[:3, 3]
+        if layer is None:
+            positions[i] = translation
+        else:
+            parent_matrix = world_matrix(parent)
+            positions[i] = parent_matrix[:3, :3] @ translation + parent_matrix[:3, 3]
+    return nodes, names, positions
+
+@timed("analyze_plant_distribution")
+def analyze_plant_distribution(fbx_path: str, name_index: Optional["NameIndex"] = None) -> Dict[str, Any]:
+    """分析模型文件中的植物分布
+
+    节点按配置的分类规则（见 classify_utils）识别为植物并取得物种名，同一物种的实例合并统计；
+    给出 name_index 时按名称匹配植物库，为各物种加上 plant_id（未匹配到为None）。
+    """
     try:
-        # 加载FBX文件
-        scene = trimesh.load(fbx_path)
-        
-        # 统计植物信息
+        import trimesh
+        from .classify_utils import classify_nodes, get_node_classifier, group_species_labels
+
+        # 加载模型文件（单个网格也作为场景处理）
+        scene = trimesh.load(fbx_path, force="scene")
+        nodes, names, positions = _scene_node_names(scene)
+
+        # 批量分类，同一物种的不同写法归为一组
+        labels = classify_nodes(get_node_classifier(), names)
+        groups = group_species_labels(labels)
+
         plant_stats = defaultdict(lambda: {"count": 0, "positions": []})
-        
-        # 遍历场景中的节点
-        for node in scene.graph.nodes_geometry:
-            name = node[1]
-            if "plant" in name.lower():
-                # 获取植物位置
-                transform = scene.graph.get(node)[0]
-                position = transform[:3, 3]
-                
-                # 更新统计信息
-                plant_stats[name]["count"] += 1
-                plant_stats[name]["positions"].append(position.tolist())
-        
+        for label, position in zip(labels, positions.tolist()):
+            if label is None:
+                continue
+            info = plant_stats[groups[label]]
+            info["count"] += 1
+            info["positions"].append(position)
+
+        if name_index is not None:
+            resolve_plant_ids(name_index, plant_stats)
+
         # 计算覆盖面积
         total_area = calculate_coverage_area(plant_stats)
-        
+
         return {
             "plant_stats": dict(plant_stats),
             "total_area": total_area,
-            "plant_count": sum(info["count"] for info in plant_stats.values())
+            "plant_count": sum(info["count"] for info in plant_stats.values()),
+            "node_count": len(nodes)
         }
     except Exception as e:
         print(f"Error analyzing FBX file: {e}")
         return {}
 
+def resolve_plant_ids(name_index: "NameIndex", plant_stats: Dict[str, Any]):
+    """按物种名匹配植物库，为 plant_stats 中各物种加上 plant_id（未匹配到为None）"""
+    from .name_utils import match_names
+    from ..config import settings
+
+    species = list(plant_stats)
+    matches = match_names(name_index, species, limit=1, min_score=settings.NAME_MATCH_AUTO_SCORE)
+    for name, match in zip(species, matches):
+        candidates = match["candidates"]
+        plant_stats[name]["plant_id"] = candidates[0]["id"] if candidates else None
+
+@timed("calculate_coverage_area")
 def calculate_coverage_area(plant_stats: Dict[str, Any]) -> float:
     """计算植物覆盖面积"""
     try:
+        import numpy as np
+        import trimesh
+
         # 将所有植物位置合并
         all_positions = []
         for info in plant_stats.values():
@@ -61,9 +136,12 @@ def calculate_coverage_area(plant_stats: Dict[str, Any]) -> float:
         print(f"Error calculating coverage area: {e}")
         return 0.0
 
+@timed("generate_plant_report")
 def generate_plant_report(analysis_result: Dict[str, Any], output_path: str) -> bool:
     """生成植物统计报告"""
     try:
+        import pandas as pd
+
         # 创建DataFrame
         data = []
         for plant_name, info in analysis_result["plant_stats"].items():
@@ -91,9 +169,12 @@ def generate_plant_report(analysis_result: Dict[str, Any], output_path: str) ->
         print(f"Error generating report: {e}")
         return False
 
+@timed("parse_dxf_file")
 def parse_dxf_file(dxf_path: str) -> Dict[str, Any]:
     """解析DXF文件"""
     try:
+        import ezdxf
+
         doc = ezdxf.readfile(dxf_path)
         msp = doc.modelspace()
         
@@ -118,6 +199,7 @@ def parse_dxf_file(dxf_path: str) -> Dict[str, Any]:
         print(f"Error parsing DXF file: {e}")
         return {}
 
+@timed("calculate_sunlight_exposure")
 def calculate_sunlight_exposure(positions: List[List[float]], 
                               date: datetime,
                               latitude: float,
@@ -0,0 +1,210 @@
+# landscape_lab/utils/audit.py
+"""操作日志：请求中只将事件放入内存队列，由后台线程批量写入
+
+- 写入目标（AUDIT_LOG_BACKEND）：database 为 audit_logs 表（每批一次事务），
+  file 为追加写入 AUDIT_LOG_FILE（JSON Lines，每批一次写入）
+- 积压控制：队列已满时调用方最多等待 AUDIT_ENQUEUE_TIMEOUT 秒，仍无空位则丢弃事件并计入指标
+- 应用关闭或进程退出时写入队列中剩余的事件
+"""
+import atexit
+import json
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..config import settings
+from .metrics import REGISTRY, Counter, Gauge
+from .responses import dumps
+
+AUDIT_EVENTS = REGISTRY.register(Counter(
+    "audit_events_total", "Audit events by outcome.", ("outcome",)))
+AUDIT_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "audit_queue_depth", "Audit events waiting to be written."))
+
+# 通知后台线程写完剩余事件后退出
+_STOP = object()
+
+class AuditLogWriter:
+    """操作日志的后台批量写入线程"""
+
+    def __init__(self, backend: str = "database", file_path: Optional[str] = None,
+                 queue_size: int = 10000, batch_size: int = 500, flush_interval: float = 1.0,
+                 bind: Any = None):
+        if backend not in ("database", "file"):
+            raise ValueError(f"Unknown audit log backend: {backend}")
+        self.backend = backend
+        self.file_path = file_path
+        # database 后端写入的数据库引擎，默认为应用数据库
+        self.bind = bind
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def put(self, event: Dict[str, Any], timeout: float) -> bool:
+        """放入事件，队列已满且等待超时时返回False"""
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            try:
+                self._queue.put(event, timeout=timeout)
+            except queue.Full:
+                AUDIT_EVENTS.inc("dropped")
+                return False
+        return True
+
+    def stop(self, timeout: float = 10.0):
+        """写入剩余事件后停止线程"""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def _next_batch(self) -> List[Any]:
+        """等待首个事件，之后收集到批量上限或距首个事件超过写入间隔为止"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while batch[-1] is not _STOP and len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            stopping = batch[-1] is _STOP
+            events = batch[:-1] if stopping else batch
+            if stopping:
+                # 停止前写完队列中剩余的事件
+                while True:
+                    try:
+                        event = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if event is not _STOP:
+                        events.append(event)
+            for start in range(0, len(events), self.batch_size):
+                self.write(events[start:start + self.batch_size])
+            AUDIT_QUEUE_DEPTH.set(value=self._queue.qsize())
+            if stopping:
+                return
+
+    def write(self, events: List[Dict[str, Any]]):
+        """写入一批事件，失败时打印错误并计入指标（不重试）"""
+        if not events:
+            return
+        try:
+            if self.backend == "database":
+                self._write_database(events)
+            else:
+                self._write_file(events)
+            AUDIT_EVENTS.inc("written", amount=len(events))
+        except Exception as e:
+            print(f"Error writing audit log: {e}")
+            AUDIT_EVENTS.inc("failed", amount=len(events))
+
+    def _write_database(self, events: List[Dict[str, Any]]):
+        from ..database import engine
+        from ..models.audit_log import AuditLog
+
+        bind = engine if self.bind is None else self.bind
+
+        rows = [
+            {**event, "details": dumps(event["details"]).decode() if event["details"] else None}
+            for event in events
+        ]
+        with bind.begin() as connection:
+            connection.execute(AuditLog.__table__.insert(), rows)
+
+    def _write_file(self, events: List[Dict[str, Any]]):
+        lines = b"".join(
+            dumps({**event, "occurred_at": event["occurred_at"].isoformat()}) + b"\n"
+            for event in events
+        )
+        path = Path(self.file_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 追加模式单次写入，多个工作进程写同一文件时各批次不会交错
+        with open(path, "ab") as f:
+            f.write(lines)
+
+_writer: Optional[AuditLogWriter] = None
+_writer_lock = threading.Lock()
+
+def _create_writer(bind: Any = None) -> AuditLogWriter:
+    writer = AuditLogWriter(
+        backend=settings.AUDIT_LOG_BACKEND,
+        file_path=settings.AUDIT_LOG_FILE,
+        queue_size=settings.AUDIT_QUEUE_SIZE,
+        batch_size=settings.AUDIT_BATCH_SIZE,
+        flush_interval=settings.AUDIT_FLUSH_INTERVAL,
+        bind=bind,
+    )
+    writer.start()
+    atexit.register(writer.stop)
+    return writer
+
+def get_audit_writer() -> AuditLogWriter:
+    """当前进程的写入线程（首次使用时启动，进程退出时写入剩余事件）"""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = _create_writer()
+    return _writer
+
+def start_audit_writer(bind: Any = None) -> AuditLogWriter:
+    """写完当前线程的剩余事件后，启动写入 bind 数据库的写入线程（基准测试等使用独立数据库时）"""
+    global _writer
+    with _writer_lock:
+        previous, _writer = _writer, _create_writer(bind)
+    if previous is not None:
+        previous.stop()
+    return _writer
+
+def stop_audit_writer():
+    """写入剩余事件并停止写入线程（应用关闭时调用）"""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.stop()
+
+def record_audit(action: str, resource_type: str, resource_id: Any = None,
+                 user: Any = None, **details: Any) -> bool:
+    """记录一条操作日志（只放入队列），user 为当前用户对象或用户ID
+
+    details 为附加信息，需可JSON序列化；未启用操作日志或事件被丢弃时返回False。
+    通常只是一次入队操作；队列已满时会阻塞调用线程（异步处理函数中即事件循环）至多
+    AUDIT_ENQUEUE_TIMEOUT 秒。
+    """
+    if not settings.AUDIT_LOG_ENABLED:
+        return False
+    event = {
+        "occurred_at": datetime.utcnow(),
+        "user_id": getattr(user, "id", user),
+        "action": action,
+        "resource_type": resource_type,
+        "resource_id": None if resource_id is None else str(resource_id),
+        "details": details or None,
+    }
+    return get_audit_writer().put(event, settings.AUDIT_ENQUEUE_TIMEOUT)
+
+def parse_audit_details(details: Optional[str]) -> Optional[Dict[str, Any]]:
+    """读取数据库中保存的附加信息"""
+    return json.loads(details) if details else None
@@ -0,0 +1,177 @@
+# landscape_lab/utils/classify_utils.py
+"""模型节点分类：按配置的规则判断节点是否为植物并取得物种名
+
+规则（NODE_CLASSIFICATION_RULES）按顺序匹配，先匹配者生效，每条规则为：
+- pattern: 正则表达式（匹配整个名称，无需 ^ $，不区分大小写）；match 为 glob 时为通配符模式
+- source:  匹配的名称，node（节点名，默认）/ geometry（几何体名）/ material（材质名）/
+           layer（父节点名，即图层或分组）
+- species: 固定的物种名；未给出时取正则中的 species 命名组，没有该组时取所匹配的名称
+- category: plant（默认）或 ignore（不计入统计）
+NODE_LAYER_SPECIES、NODE_MATERIAL_SPECIES 为 {图层 / 材质名通配符: 物种名}，排在规则之前。
+
+同一来源的规则编译为一个正则（各规则为一个分支，分支顺序即规则顺序），每个名称只需一次
+整体匹配；几何体、材质、图层名称去重后再匹配。
+"""
+import fnmatch
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Pattern, Sequence, Tuple
+
+from ..config import settings
+from .name_utils import normalize_name
+
+NODE_SOURCES = ("node", "geometry", "material", "layer")
+RULE_CATEGORIES = ("plant", "ignore")
+# 物种名末尾的实例编号（如 _012、.003、#4）
+_TRAILING_NUMBER_CHARS = "0123456789 _.-#:"
+_SEPARATORS = re.compile(r"[\s_]+")
+
+@dataclass
+class NodeClassifier:
+    """编译后的分类规则"""
+    rules: List[Dict[str, Any]]
+    # {名称来源: 合并后的正则（整体匹配单个名称）}
+    matchers: Dict[str, Pattern]
+
+def _rule_regex(rule: Dict[str, Any], index: int) -> str:
+    if rule.get("match", "regex") == "glob":
+        pattern = fnmatch.translate(rule["pattern"])
+    else:
+        # 各分支的 species 组改名，避免合并后组名重复
+        pattern = rule["pattern"].replace("(?P<species>", f"(?P<r{index}_species>")
+    return f"(?P<r{index}>{pattern})"
+
+def get_classification_rules() -> List[Dict[str, Any]]:
+    """配置中的全部规则（图层、材质映射在前）"""
+    rules = [
+        {"source": "layer", "match": "glob", "pattern": pattern, "species": species}
+        for pattern, species in settings.NODE_LAYER_SPECIES.items()
+    ]
+    rules += [
+        {"source": "material", "match": "glob", "pattern": pattern, "species": species}
+        for pattern, species in settings.NODE_MATERIAL_SPECIES.items()
+    ]
+    return rules + list(settings.NODE_CLASSIFICATION_RULES)
+
+def compile_node_rules(rules: Sequence[Dict[str, Any]]) -> NodeClassifier:
+    """校验并编译规则，规则不合法时抛出ValueError"""
+    branches = {source: [] for source in NODE_SOURCES}
+    for index, rule in enumerate(rules):
+        source = rule.get("source", "node")
+        if source not in NODE_SOURCES:
+            raise ValueError(f"Unknown node rule source: {source}")
+        if rule.get("category", "plant") not in RULE_CATEGORIES:
+            raise ValueError(f"Unknown node rule category: {rule.get('category')}")
+        branch = _rule_regex(rule, index)
+        try:
+            re.compile(branch)
+        except re.error as e:
+            raise ValueError(f"Invalid node rule pattern {rule['pattern']!r}: {e}")
+        branches[source].append(branch)
+    return NodeClassifier(
+        rules=list(rules),
+        matchers={
+            source: re.compile("|".join(parts), re.IGNORECASE)
+            for source, parts in branches.items() if parts
+        },
+    )
+
+_classifier: Optional[NodeClassifier] = None
+
+def get_node_classifier() -> NodeClassifier:
+    """按配置编译的分类规则（每个进程编译一次）"""
+    global _classifier
+    if _classifier is None:
+        _classifier = compile_node_rules(get_classification_rules())
+    return _classifier
+
+def get_rules_fingerprint() -> str:
+    """分类规则的指纹，规则变化后模型的分析结果需要重新计算"""
+    encoded = json.dumps(get_classification_rules(), sort_keys=True, ensure_ascii=False).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+def clean_species_label(text: str) -> str:
+    """去掉实例编号并将下划线转为空格，如 "Ginkgo_biloba_012" -> "Ginkgo biloba" """
+    return _SEPARATORS.sub(" ", text.rstrip(_TRAILING_NUMBER_CHARS)).strip(" -.:")
+
+def _match_source(classifier: NodeClassifier, source: str,
+                  names: List[str]) -> List[Optional[Tuple[int, str]]]:
+    """用来源的合并正则逐个整体匹配名称，返回各名称匹配的 (规则序号, 物种原文)，未匹配为None
+
+    各名称分别匹配，规则中的 \\s、[^...] 等不会跨到相邻名称，结果与名称的批次无关。
+    """
+    matcher = classifier.matchers[source]
+    # {分支组名: (规则序号, 固定物种名, species 组名)}
+    branches = {}
+    for index, rule in enumerate(classifier.rules):
+        group = f"r{index}_species"
+        branches[f"r{index}"] = (index, rule.get("species"), group if group in matcher.groupindex else None)
+
+    results: List[Optional[Tuple[int, str]]] = [None] * len(names)
+    for position, found in enumerate(map(matcher.fullmatch, names)):
+        if found is None:
+            continue
+        index, species, group = branches[found.lastgroup]
+        if not species and group:
+            species = found.group(group)
+        results[position] = (index, species or names[position])
+    return results
+
+def classify_nodes(classifier: NodeClassifier,
+                   names: Sequence[Tuple[Optional[str], ...]]) -> List[Optional[str]]:
+    """批量分类节点，names 为各节点按 NODE_SOURCES 顺序的名称（无则为None）
+
+    返回各节点的物种名（已去除实例编号），不是植物或被忽略的节点为None。
+    同一节点的多个名称都匹配时，取序号最小的规则。
+    """
+    columns = []
+    for position, source in enumerate(NODE_SOURCES):
+        if source not in classifier.matchers:
+            continue
+        column = [node_names[position] if position < len(node_names) else None for node_names in names]
+        if source == "node":
+            # 场景图中节点名唯一，无需去重
+            columns.append(_match_source(classifier, source, [name or "" for name in column]))
+            continue
+        distinct = list(dict.fromkeys(name for name in column if name))
+        matched = dict(zip(distinct, _match_source(classifier, source, distinct)))
+        matched[None] = matched[""] = None
+        columns.append([matched[name] for name in column])
+
+    if not columns:
+        return [None] * len(names)
+    # 只有一个来源有规则时（默认配置）无需比较各来源的规则序号
+    best = columns[0] if len(columns) == 1 else [
+        min((result for result in results if result is not None), default=None)
+        for results in zip(*columns)
+    ]
+
+    ignored = {
+        index for index, rule in enumerate(classifier.rules)
+        if rule.get("category", "plant") != "plant"
+    }
+    cleaned: Dict[str, Optional[str]] = {}
+    labels: List[Optional[str]] = []
+    for result in best:
+        if result is None or result[0] in ignored:
+            labels.append(None)
+            continue
+        species = result[1]
+        label = cleaned.get(species, False)
+        if label is False:
+            label = cleaned[species] = clean_species_label(species) or None
+        labels.append(label)
+    return labels
+
+def group_species_labels(labels: Sequence[Optional[str]]) -> Dict[str, str]:
+    """规范化后相同的物种名归为一组，返回 {物种名: 组名（组内首次出现的写法）}"""
+    groups: Dict[str, str] = {}
+    by_key: Dict[str, str] = {}
+    for label in labels:
+        if label is None or label in groups:
+            continue
+        key = normalize_name(label) or label.lower()
+        groups[label] = by_key.setdefault(key, label)
+    return groups
@@ -0,0 +1,175 @@
+# landscape_lab/utils/compression.py
+"""响应压缩：按 Accept-Encoding 协商 zstd / br / gzip
+
+br 与 zstd 依赖可选的 brotli、zstandard 包，未安装时不参与协商。
+"""
+import zlib
+from typing import Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from ..config import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# 已经压缩过的内容类型，再压缩只会浪费CPU
+INCOMPRESSIBLE_TYPES = ("image/", "video/", "audio/", "application/zip",
+                        "application/gzip", "text/event-stream")
+
+class _GzipCompressor:
+    def __init__(self):
+        self._compressor = zlib.compressobj(settings.GZIP_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+class _BrotliCompressor:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=settings.BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+class _ZstdCompressor:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=settings.ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+def get_available_encodings() -> Dict[str, type]:
+    """按配置顺序列出可用的编码"""
+    compressors = {"gzip": _GzipCompressor}
+    if brotli is not None:
+        compressors["br"] = _BrotliCompressor
+    if zstandard is not None:
+        compressors["zstd"] = _ZstdCompressor
+    return {name: compressors[name] for name in settings.COMPRESSION_ENCODINGS if name in compressors}
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """解析 Accept-Encoding，返回 {编码: q值}"""
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    return accepted
+
+def choose_encoding(header: str, available: List[str]) -> Optional[str]:
+    """在客户端接受的编码中选择服务端优先级最高的"""
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    for name in available:
+        if accepted.get(name, wildcard) > 0:
+            return name
+    return None
+
+class CompressionMiddleware:
+    """ASGI中间件：压缩超过阈值的响应，流式响应逐块压缩"""
+
+    def __init__(self, app):
+        self.app = app
+        self.encodings = get_available_encodings()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), list(self.encodings)
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressedResponder(self.app, encoding, self.encodings[encoding])(scope, receive, send)
+
+class _CompressedResponder:
+    """缓存响应头直到拿到第一块响应体，再决定是否压缩"""
+
+    def __init__(self, app, encoding: str, compressor_class: type):
+        self.app = app
+        self.encoding = encoding
+        self.compressor_class = compressor_class
+        self.start_message = None
+        self.compressor = None
+        self.passthrough = False
+
+    async def __call__(self, scope, receive, send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    def _should_compress(self, headers: Headers) -> bool:
+        if "content-encoding" in headers or "content-range" in headers:
+            return False
+        return not headers.get("content-type", "").startswith(INCOMPRESSIBLE_TYPES)
+
+    async def _send_start(self):
+        if self.start_message is not None:
+            await self.send(self.start_message)
+            self.start_message = None
+
+    async def send_compressed(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            self.passthrough = not self._should_compress(Headers(raw=message["headers"]))
+            return
+        if message_type != "http.response.body" or self.passthrough:
+            await self._send_start()
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is None:
+            if not more_body and len(body) < settings.COMPRESSION_MIN_SIZE:
+                # 小响应不压缩，原样发出
+                self.passthrough = True
+                await self._send_start()
+                await self.send(message)
+                return
+
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            self.compressor = self.compressor_class()
+            if not more_body:
+                compressed = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(compressed))
+                await self._send_start()
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+            # 流式响应长度未知
+            del headers["Content-Length"]
+            await self._send_start()
+
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.finish()
+        if chunk or not more_body:
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
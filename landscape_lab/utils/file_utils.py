@@ -1,10 +1,10 @@
 # landscape_lab/utils/file_utils.py
+import hashlib
 import os
 from datetime import datetime
 from fastapi import UploadFile
 from pathlib import Path
 from typing import Optional
-from PIL import Image
 from io import BytesIO
 import shutil
 
@@ -38,6 +38,8 @@ def save_uploaded_file(file: UploadFile, entity_id: int) -> str:
 def generate_thumbnail(image_path: str, size: tuple = (200, 200)) -> Optional[str]:
     """生成缩略图并返回路径"""
     try:
+        from PIL import Image
+
         with Image.open(image_path) as img:
             img.thumbnail(size)
             
@@ -72,6 +74,17 @@ def get_file_size(file_path: str) -> Optional[int]:
         print(f"Error getting file size: {e}")
         return None
 
+def get_file_hash(file_path: str) -> Optional[str]:
+    """计算文件SHA-256哈希"""
+    try:
+        digest = hashlib.sha256()
+        for chunk in read_file_chunks(file_path):
+            digest.update(chunk)
+        return digest.hexdigest()
+    except Exception as e:
+        print(f"Error hashing file: {e}")
+        return None
+
 def get_file_mime_type(file_path: str) -> Optional[str]:
     """获取文件MIME类型"""
     try:
@@ -0,0 +1,214 @@
+# landscape_lab/utils/geo_utils.py
+"""项目地理位置：坐标（WGS84经纬度）、占地范围（GeoJSON）与空间索引
+
+空间索引为SQLite R*Tree虚拟表，保存每个项目的外包框（占地范围或坐标点）。
+框选、半径与最近邻查询先用R*Tree取候选项目，再按球面距离精确筛选。
+未创建R*Tree（如SQLite未编译该模块）时退化为按经纬度列筛选。
+"""
+import json
+import math
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Sequence, Tuple
+
+from sqlalchemy import Column, Float, Integer, MetaData, Table, and_, text
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# 地球平均半径（千米）
+EARTH_RADIUS_KM = 6371.0088
+# 每纬度对应的距离（千米）
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+SPATIAL_INDEX_TABLE = "project_rtree"
+# 最近邻查询的初始搜索半径（千米），每轮加倍
+NEAREST_INITIAL_RADIUS_KM = 1.0
+FOOTPRINT_TYPES = ("Polygon", "MultiPolygon")
+
+# 各数据库是否已创建空间索引（按连接URL缓存）
+_spatial_index_available: Dict[str, bool] = {}
+
+# R*Tree虚拟表，用于在查询中联结；不属于 Base.metadata，由 create_spatial_index 创建
+project_rtree = Table(
+    SPATIAL_INDEX_TABLE, MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("min_lon", Float),
+    Column("max_lon", Float),
+    Column("min_lat", Float),
+    Column("max_lat", Float),
+)
+
+def _iter_polygons(footprint: Dict[str, Any]) -> Iterable[Sequence[Sequence[Sequence[float]]]]:
+    if footprint["type"] == "MultiPolygon":
+        return footprint["coordinates"]
+    return [footprint["coordinates"]]
+
+def _iter_rings(footprint: Dict[str, Any]) -> Iterable[Sequence[Sequence[float]]]:
+    for polygon in _iter_polygons(footprint):
+        for ring in polygon:
+            yield ring
+
+def validate_footprint(footprint: Dict[str, Any]) -> Dict[str, Any]:
+    """校验GeoJSON占地范围（Polygon/MultiPolygon，经纬度坐标），不合法时抛出ValueError"""
+    if footprint.get("type") not in FOOTPRINT_TYPES:
+        raise ValueError(f"footprint must be a GeoJSON {' or '.join(FOOTPRINT_TYPES)}")
+    try:
+        rings = list(_iter_rings(footprint))
+        for ring in rings:
+            if len(ring) < 4:
+                raise ValueError("footprint rings need at least 4 positions")
+            for longitude, latitude, *_ in ring:
+                if not (-180 <= longitude <= 180 and -90 <= latitude <= 90):
+                    raise ValueError("footprint coordinates must be longitude/latitude")
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"invalid footprint coordinates: {e}")
+    if not rings:
+        raise ValueError("footprint has no coordinates")
+    return footprint
+
+def footprint_bounds(footprint: Dict[str, Any]) -> Tuple[float, float, float, float]:
+    """占地范围外包框 (最小经度, 最小纬度, 最大经度, 最大纬度)"""
+    longitudes, latitudes = [], []
+    for ring in _iter_rings(footprint):
+        for position in ring:
+            longitudes.append(position[0])
+            latitudes.append(position[1])
+    return min(longitudes), min(latitudes), max(longitudes), max(latitudes)
+
+def footprint_centroid_and_area(footprint: Dict[str, Any]) -> Tuple[float, float, float]:
+    """占地范围的形心 (经度, 纬度) 与面积（平方米）
+
+    以外包框中心为原点做等距投影后按多边形面积公式计算，适用于场地尺度的范围。
+    """
+    min_lon, min_lat, max_lon, max_lat = footprint_bounds(footprint)
+    lon0, lat0 = (min_lon + max_lon) / 2, (min_lat + max_lat) / 2
+    x_scale = KM_PER_DEGREE * 1000 * math.cos(math.radians(lat0))
+    y_scale = KM_PER_DEGREE * 1000
+
+    area = moment_x = moment_y = 0.0
+    for polygon in _iter_polygons(footprint):
+        for ring_index, ring in enumerate(polygon):
+            points = [((lon - lon0) * x_scale, (lat - lat0) * y_scale) for lon, lat, *_ in ring]
+            ring_area = ring_x = ring_y = 0.0
+            for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1]):
+                cross = x1 * y2 - x2 * y1
+                ring_area += cross / 2
+                ring_x += (x1 + x2) * cross / 6
+                ring_y += (y1 + y2) * cross / 6
+            # 与环的方向无关：外环计为正，内环（洞）计为负
+            weight = math.copysign(1.0, ring_area) * (-1 if ring_index else 1)
+            area += ring_area * weight
+            moment_x += ring_x * weight
+            moment_y += ring_y * weight
+    if area <= 0:
+        return lon0, lat0, 0.0
+    return lon0 + moment_x / area / x_scale, lat0 + moment_y / area / y_scale, area
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """两点间的球面距离（千米）"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi, dlambda = phi2 - phi1, math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+def radius_bounds(latitude: float, longitude: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """包含以某点为圆心、给定半径的圆的经纬度外包框"""
+    dlat = radius_km / KM_PER_DEGREE
+    cos_lat = math.cos(math.radians(latitude))
+    # 靠近极点或半径很大时经度范围覆盖全部
+    if cos_lat < 1e-6 or latitude + dlat >= 90 or latitude - dlat <= -90:
+        dlon = 180.0
+    else:
+        dlon = min(180.0, dlat / cos_lat)
+    return (max(-180.0, longitude - dlon), max(-90.0, latitude - dlat),
+            min(180.0, longitude + dlon), min(90.0, latitude + dlat))
+
+def lonlat_to_local(longitudes: "np.ndarray", latitudes: "np.ndarray",
+                    origin_latitude: float, origin_longitude: float) -> Tuple["np.ndarray", "np.ndarray"]:
+    """经纬度转换为以项目坐标为原点的平面坐标（米，X向东、Y向北），适用于场地尺度"""
+    import numpy as np
+
+    x_scale = KM_PER_DEGREE * 1000 * math.cos(math.radians(origin_latitude))
+    y_scale = KM_PER_DEGREE * 1000
+    return ((np.asarray(longitudes) - origin_longitude) * x_scale,
+            (np.asarray(latitudes) - origin_latitude) * y_scale)
+
+def project_bounds(latitude: Optional[float], longitude: Optional[float],
+                   footprint: Optional[Dict[str, Any]]) -> Optional[Tuple[float, float, float, float]]:
+    """项目在空间索引中的外包框：有占地范围时取其外包框，否则为坐标点"""
+    if footprint:
+        return footprint_bounds(footprint)
+    if latitude is None or longitude is None:
+        return None
+    return longitude, latitude, longitude, latitude
+
+def create_spatial_index(connection) -> bool:
+    """创建R*Tree空间索引表，SQLite不支持时返回False"""
+    try:
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SPATIAL_INDEX_TABLE} "
+            "USING rtree(id, min_lon, max_lon, min_lat, max_lat)"
+        ))
+    except Exception as e:
+        print(f"Error creating spatial index: {e}")
+        return False
+    _spatial_index_available[str(connection.engine.url)] = True
+    return True
+
+def has_spatial_index(connection) -> bool:
+    """数据库中是否已有空间索引表"""
+    key = str(connection.engine.url)
+    if key not in _spatial_index_available:
+        if connection.engine.dialect.name != "sqlite":
+            _spatial_index_available[key] = False
+        else:
+            _spatial_index_available[key] = connection.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"
+            ), {"name": SPATIAL_INDEX_TABLE}).first() is not None
+    return _spatial_index_available[key]
+
+def update_spatial_index(connection, project_id: int,
+                         bounds: Optional[Tuple[float, float, float, float]]):
+    """写入或删除项目在空间索引中的外包框"""
+    if not has_spatial_index(connection):
+        return
+    connection.execute(text(f"DELETE FROM {SPATIAL_INDEX_TABLE} WHERE id = :id"), {"id": project_id})
+    if bounds is not None:
+        min_lon, min_lat, max_lon, max_lat = bounds
+        connection.execute(text(
+            f"INSERT INTO {SPATIAL_INDEX_TABLE} (id, min_lon, max_lon, min_lat, max_lat) "
+            "VALUES (:id, :min_lon, :max_lon, :min_lat, :max_lat)"
+        ), {"id": project_id, "min_lon": min_lon, "max_lon": max_lon, "min_lat": min_lat, "max_lat": max_lat})
+
+def rebuild_spatial_index(connection) -> int:
+    """按项目表重建空间索引（部署时执行），返回写入的项目数"""
+    connection.execute(text(f"DELETE FROM {SPATIAL_INDEX_TABLE}"))
+    rows = connection.execute(text(
+        "SELECT id, latitude, longitude, footprint FROM projects "
+        "WHERE footprint IS NOT NULL OR (latitude IS NOT NULL AND longitude IS NOT NULL)"
+    )).fetchall()
+    for project_id, latitude, longitude, footprint in rows:
+        if isinstance(footprint, str):
+            footprint = json.loads(footprint)
+        update_spatial_index(connection, project_id, project_bounds(latitude, longitude, footprint))
+    return len(rows)
+
+def bounds_intersect(a: Tuple[float, float, float, float], b: Tuple[float, float, float, float]) -> bool:
+    """两个外包框是否相交"""
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+def filter_by_bounds(query, model, connection, bounds: Tuple[float, float, float, float]):
+    """为项目查询加上外包框条件：有空间索引时联结R*Tree，否则按经纬度列筛选
+
+    R*Tree以单精度保存坐标（向外取整），结果可能多出紧贴边界的项目，需再精确筛选。
+    """
+    min_lon, min_lat, max_lon, max_lat = bounds
+    if has_spatial_index(connection):
+        return query.join(project_rtree, project_rtree.c.id == model.id).filter(and_(
+            project_rtree.c.max_lon >= min_lon,
+            project_rtree.c.min_lon <= max_lon,
+            project_rtree.c.max_lat >= min_lat,
+            project_rtree.c.min_lat <= max_lat,
+        ))
+    return query.filter(
+        model.latitude.between(min_lat, max_lat),
+        model.longitude.between(min_lon, max_lon),
+    )
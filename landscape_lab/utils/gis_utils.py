@@ -0,0 +1,367 @@
+# landscape_lab/utils/gis_utils.py
+"""GIS数据导入：GeoJSON / Shapefile 中的树木点位导入为项目植物配置
+
+文件逐个要素读取，不整体载入内存：
+- GeoJSON 只解析外层结构，features 数组中的要素逐个解码；也支持每行一个要素的
+  GeoJSONSeq（.geojsonl / .geojsons）
+- Shapefile 以zip上传，解压到临时目录后用 pyshp 逐条读取
+
+坐标先转换为WGS84经纬度（源坐标系不是WGS84时需 pyproj），再投影为以项目坐标为原点的
+平面坐标（与模型坐标一致），高程原样保存。植物配置条目按批写入并提交。
+"""
+import codecs
+import json
+import re
+import shutil
+import tempfile
+import zipfile
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..models.plant import Plant, update_plant_usage
+from ..models.project_plants import project_plants
+from .geo_utils import lonlat_to_local
+from .metrics import timed
+from .name_utils import get_name_index, match_plant_id
+
+# 支持导入的文件格式（Shapefile 需打包为zip）
+GIS_EXTENSIONS = {".geojson", ".json", ".geojsonl", ".geojsons", ".zip"}
+SHAPEFILE_PARTS = {".shp", ".shx", ".dbf", ".prj", ".cpg"}
+# 视为WGS84经纬度、无需转换的坐标系名称
+WGS84_NAMES = {
+    "EPSG:4326", "CRS84", "OGC:CRS84",
+    "URN:OGC:DEF:CRS:EPSG::4326", "URN:OGC:DEF:CRS:OGC:1.3:CRS84", "URN:OGC:DEF:CRS:OGC::CRS84",
+}
+
+# 空白及GeoJSONSeq的记录分隔符（RFC 8142）
+_WHITESPACE = re.compile(r"[ \t\n\r\x1e]*")
+_decoder = json.JSONDecoder()
+
+class _JSONStream:
+    """分块读取的JSON文本，按需解码其中的单个值"""
+
+    def __init__(self, file, chunk_size: int):
+        self._file = file
+        self._chunk_size = chunk_size
+        self._text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _read(self, size: int) -> bool:
+        """追加读取，并丢弃已解析的部分；已读完时返回False"""
+        if self._eof:
+            return False
+        data = self._file.read(size)
+        self._eof = not data
+        self._buffer = self._buffer[self._pos:] + self._text_decoder.decode(data, final=self._eof)
+        self._pos = 0
+        return not self._eof
+
+    def peek(self) -> str:
+        """跳过空白，返回下一个字符，读完时返回空字符串"""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read(self._chunk_size):
+                return ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Invalid GeoJSON: expected '{char}', found '{found or 'end of file'}'")
+        self._pos += 1
+
+    def decode(self) -> Any:
+        """解码下一个完整的值；值跨越块边界时继续读取后重试"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # 按已缓冲的大小加倍读取，超大的值不会被反复解析太多次
+                if not self._read(max(self._chunk_size, len(self._buffer) - self._pos)):
+                    raise
+                continue
+            # 数字恰好在块末尾结束时可能被截断
+            if end == len(self._buffer) and self._read(self._chunk_size):
+                continue
+            self._pos = end
+            return value
+
+    def iter_array(self) -> Iterator[Any]:
+        """逐个解码数组元素"""
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.decode()
+            char = self.peek()
+            if char not in (",", "]"):
+                raise ValueError(f"Invalid GeoJSON: expected ',' or ']', found '{char or 'end of file'}'")
+            self._pos += 1
+            if char == "]":
+                return
+
+def _crs_name(crs: Any) -> Optional[str]:
+    """GeoJSON（2008版）crs 成员中的坐标系名称"""
+    if isinstance(crs, dict):
+        return (crs.get("properties") or {}).get("name")
+    return None
+
+def iter_geojson_features(file_path: str, chunk_size: int = 1024 * 1024) -> Iterator[Tuple[Dict[str, Any], Optional[str]]]:
+    """逐个读取GeoJSON要素，返回 (要素, 坐标系名称)
+
+    坐标系取自 FeatureCollection 的 crs 成员，位于 features 之后的 crs 不生效。
+    """
+    with open(file_path, "rb") as f:
+        stream = _JSONStream(f, chunk_size)
+        # 文件中可能有多个顶层对象（GeoJSONSeq）
+        while stream.peek():
+            stream.expect("{")
+            members = {}
+            while stream.peek() != "}":
+                if members:
+                    stream.expect(",")
+                key = stream.decode()
+                stream.expect(":")
+                if key == "features":
+                    crs = _crs_name(members.get("crs"))
+                    for feature in stream.iter_array():
+                        yield feature, crs
+                    members[key] = None
+                else:
+                    members[key] = stream.decode()
+            stream.expect("}")
+            if members.get("type") == "Feature":
+                yield members, None
+
+def _extract_shapefile(zip_path: str, output_dir: Path) -> Path:
+    """解压zip中的第一个Shapefile（.shp 及同名组成文件），返回 .shp 路径"""
+    with zipfile.ZipFile(zip_path) as archive:
+        members = [
+            info for info in archive.infolist()
+            if not info.is_dir() and "__MACOSX" not in info.filename
+        ]
+        shp_members = [info for info in members if info.filename.lower().endswith(".shp")]
+        if not shp_members:
+            raise ValueError("No .shp file found in archive")
+        stem = shp_members[0].filename[:-len(".shp")]
+        for info in members:
+            suffix = Path(info.filename).suffix.lower()
+            if info.filename[:-len(suffix)] == stem and suffix in SHAPEFILE_PARTS:
+                # 使用固定文件名解压，避免压缩包中的路径穿越
+                with archive.open(info) as source, open(output_dir / f"layer{suffix}", "wb") as target:
+                    shutil.copyfileobj(source, target)
+    return output_dir / "layer.shp"
+
+def _shape_geometry(shape) -> Optional[Dict[str, Any]]:
+    """pyshp 图形转换为GeoJSON几何，空图形返回None"""
+    if not shape.points:
+        return None
+    geometry = shape.__geo_interface__
+    z = getattr(shape, "z", None)
+    if geometry["type"] == "Point" and z and len(geometry["coordinates"]) == 2:
+        geometry = {"type": "Point", "coordinates": [*geometry["coordinates"], z[0]]}
+    return geometry
+
+def iter_shapefile_features(file_path: str) -> Iterator[Tuple[Dict[str, Any], Optional[str]]]:
+    """逐条读取zip压缩的Shapefile要素，返回 (要素, 坐标系WKT)"""
+    try:
+        import shapefile
+    except ImportError:
+        raise ValueError("pyshp is required to import Shapefiles")
+
+    # 解压到上传文件所在目录，大文件不占用系统临时目录（可能是内存文件系统）
+    with tempfile.TemporaryDirectory(dir=Path(file_path).parent) as temp_dir:
+        shp_path = _extract_shapefile(file_path, Path(temp_dir))
+        prj_path = shp_path.with_suffix(".prj")
+        crs = prj_path.read_text(errors="ignore") if prj_path.exists() else None
+        with shapefile.Reader(str(shp_path)) as reader:
+            for shape_record in reader.iterShapeRecords():
+                yield {
+                    "type": "Feature",
+                    "geometry": _shape_geometry(shape_record.shape),
+                    "properties": shape_record.record.as_dict(),
+                }, crs
+
+def iter_gis_features(file_path: str, chunk_size: int = 1024 * 1024) -> Iterator[Tuple[Dict[str, Any], Optional[str]]]:
+    """按扩展名逐个读取GIS文件要素，返回 (要素, 坐标系)"""
+    if Path(file_path).suffix.lower() == ".zip":
+        return iter_shapefile_features(file_path)
+    return iter_geojson_features(file_path, chunk_size)
+
+def _is_wgs84(crs: str) -> bool:
+    name = crs.strip().upper()
+    if name in WGS84_NAMES:
+        return True
+    # Shapefile .prj 中的WGS84地理坐标系（无需 pyproj 即可识别）
+    return name.startswith("GEOGCS[") and ("WGS_1984" in name or "WGS 84" in name)
+
+def get_lonlat_transformer(crs: Optional[str]) -> Optional[Callable]:
+    """源坐标系到WGS84经纬度的转换函数 f(x数组, y数组) -> (经度, 纬度)
+
+    源坐标系为空或已是WGS84时返回None。
+    """
+    if not crs or _is_wgs84(crs):
+        return None
+    try:
+        from pyproj import CRS, Transformer
+    except ImportError:
+        raise ValueError(f"pyproj is required to transform coordinates from {crs}")
+    try:
+        source = CRS.from_user_input(crs)
+    except Exception as e:
+        raise ValueError(f"Unknown coordinate reference system {crs}: {e}")
+    if source.equals(CRS.from_epsg(4326), ignore_axis_order=True):
+        return None
+    return Transformer.from_crs(source, "EPSG:4326", always_xy=True).transform
+
+def _first_property(properties: Dict[str, Any], fields: Sequence[str]) -> Optional[str]:
+    """字段列表中第一个有值的属性（properties 的键已转为小写）"""
+    for field in fields:
+        value = properties.get(field)
+        if value is not None and str(value).strip():
+            return str(value).strip()
+    return None
+
+def _find_plant_id(db: Session, species: str) -> Optional[int]:
+    """按学名、再按名称匹配植物（不区分大小写）"""
+    key = species.lower()
+    for column in (Plant.scientific_name, Plant.name):
+        row = db.query(Plant.id).filter(func.lower(column) == key).order_by(Plant.id).first()
+        if row:
+            return row[0]
+    return None
+
+def _iter_points(geometry: Optional[Dict[str, Any]]) -> List[Sequence[float]]:
+    """点或多点几何中的各点坐标，其他几何返回空列表"""
+    if not geometry:
+        return []
+    if geometry.get("type") == "Point":
+        return [geometry["coordinates"]]
+    if geometry.get("type") == "MultiPoint":
+        return geometry["coordinates"]
+    return []
+
+@timed("import_plant_features")
+def import_plant_features(db: Session,
+                          project_id: int,
+                          file_path: str,
+                          origin: Tuple[float, float],
+                          source_crs: Optional[str] = None,
+                          species_fields: Sequence[str] = ("species",),
+                          name_fields: Sequence[str] = ("name",),
+                          create_missing: bool = False,
+                          created_by: Optional[int] = None,
+                          batch_size: int = 5000,
+                          chunk_size: int = 1024 * 1024,
+                          progress: Optional[Callable[[Dict[str, int]], None]] = None) -> Dict[str, int]:
+    """将GIS文件中的树木点位导入为项目植物配置，返回导入统计
+
+    origin 为项目坐标 (纬度, 经度)。每个点（多点中的每个点）为一个配置条目，数量为1。
+    物种按 species_fields 中第一个有值的属性匹配已有植物，未匹配时按 name_fields 匹配，
+    仍未匹配时取名称模糊匹配得分不低于 NAME_MATCH_AUTO_SCORE 的植物；
+    create_missing 为True时为未匹配的物种新建植物，否则跳过。非点几何（如面）跳过。
+    每批写入后提交，失败时已提交的批次保留。
+    """
+    import numpy as np
+
+    species_fields = [field.lower() for field in species_fields]
+    name_fields = [field.lower() for field in name_fields]
+    summary = Counter(features=0, imported=0, fuzzy_matched=0, created_plants=0,
+                      skipped_geometry=0, skipped_species=0, skipped_invalid=0)
+    plant_ids: Dict[str, Optional[int]] = {}
+    # 导入开始时的名称索引快照（首次需要模糊匹配时建立），导入中新建的植物已记录在 plant_ids
+    name_index = None
+    transform = None
+    transform_ready = False
+    batch_plants, batch_x, batch_y, batch_z = [], [], [], []
+
+    def flush():
+        if not batch_plants:
+            return
+        xs, ys = np.asarray(batch_x, dtype=np.float64), np.asarray(batch_y, dtype=np.float64)
+        if transform is not None:
+            xs, ys = transform(xs, ys)
+        xs, ys = lonlat_to_local(xs, ys, *origin)
+        # 批量插入绕过ORM事件，植物引用计数按批汇总更新
+        db.execute(project_plants.insert(), [
+            {"project_id": project_id, "plant_id": plant_id, "quantity": 1,
+             "position_x": x, "position_y": y, "position_z": z}
+            for plant_id, x, y, z in zip(batch_plants, xs.tolist(), ys.tolist(), batch_z)
+        ])
+        connection = db.connection()
+        for plant_id, count in Counter(batch_plants).items():
+            update_plant_usage(connection, plant_id, count)
+        db.commit()
+        summary["imported"] += len(batch_plants)
+        for batch in (batch_plants, batch_x, batch_y, batch_z):
+            batch.clear()
+        if progress is not None:
+            progress(dict(summary))
+
+    for feature, crs in iter_gis_features(file_path, chunk_size):
+        summary["features"] += 1
+        if not transform_ready:
+            transform = get_lonlat_transformer(source_crs or crs)
+            transform_ready = True
+        try:
+            points = _iter_points(feature.get("geometry"))
+            if not points:
+                summary["skipped_geometry"] += 1
+                continue
+            properties = {str(key).lower(): value for key, value in (feature.get("properties") or {}).items()}
+            name = _first_property(properties, name_fields)
+            species = _first_property(properties, species_fields) or name
+            if not species:
+                summary["skipped_species"] += 1
+                continue
+
+            key = species.lower()
+            if key not in plant_ids:
+                plant_id = _find_plant_id(db, species)
+                if plant_id is None and name and name != species:
+                    plant_id = _find_plant_id(db, name)
+                if plant_id is None:
+                    name_index = name_index or get_name_index(db)
+                    plant_id = match_plant_id(name_index, species)
+                    if plant_id is None and name and name != species:
+                        plant_id = match_plant_id(name_index, name)
+                    summary["fuzzy_matched"] += plant_id is not None
+                if plant_id is None and create_missing:
+                    db_plant = Plant(name=name or species, scientific_name=species, created_by=created_by)
+                    db.add(db_plant)
+                    db.flush()
+                    plant_id = db_plant.id
+                    summary["created_plants"] += 1
+                plant_ids[key] = plant_id
+            if plant_ids[key] is None:
+                summary["skipped_species"] += 1
+                continue
+
+            coordinates = [
+                (float(point[0]), float(point[1]),
+                 float(point[2]) if len(point) > 2 and point[2] is not None else None)
+                for point in points
+            ]
+            for x, y, z in coordinates:
+                batch_plants.append(plant_ids[key])
+                batch_x.append(x)
+                batch_y.append(y)
+                batch_z.append(z)
+        except (TypeError, ValueError, IndexError, AttributeError):
+            summary["skipped_invalid"] += 1
+            continue
+        if len(batch_plants) >= batch_size:
+            flush()
+    flush()
+    # 新建的植物在没有可导入点位时也需要提交
+    db.commit()
+    return dict(summary)
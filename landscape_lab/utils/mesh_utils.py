@@ -0,0 +1,123 @@
+# landscape_lab/utils/mesh_utils.py
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Sequence, Tuple
+
+# trimesh/numpy 在首次生成瓦片时才导入，不影响应用启动
+if TYPE_CHECKING:
+    import trimesh
+
+# 默认LOD简化比例（相对原始面数，0级为原始精度）
+DEFAULT_LOD_RATIOS = (1.0, 0.25, 0.05, 0.01)
+# 默认瓦片边长（米）
+DEFAULT_TILE_SIZE = 50.0
+# 简化后每个瓦片保留的最少面数
+MIN_TILE_FACES = 64
+# 瓦片划分所用的平面坐标轴（X, Y）
+TILE_AXES = (0, 1)
+# 瓦片索引文件名
+MANIFEST_NAME = "tileset.json"
+
+def load_scene_mesh(model_path: str) -> "trimesh.Trimesh":
+    """加载模型并合并为单一网格（已应用场景变换）"""
+    import trimesh
+
+    scene = trimesh.load(model_path, force="scene")
+    if hasattr(scene, "to_mesh"):
+        return scene.to_mesh()
+    return scene.dump(concatenate=True)
+
+def simplify_mesh(mesh: "trimesh.Trimesh", ratio: float) -> "trimesh.Trimesh":
+    """按比例对网格进行二次误差简化"""
+    face_count = len(mesh.faces)
+    target = max(MIN_TILE_FACES, int(face_count * ratio))
+    if ratio >= 1.0 or target >= face_count:
+        return mesh
+
+    # trimesh 4.x 使用 simplify_quadric_decimation，旧版本为 simplify_quadratic_decimation
+    if hasattr(mesh, "simplify_quadric_decimation"):
+        return mesh.simplify_quadric_decimation(face_count=target)
+    return mesh.simplify_quadratic_decimation(target)
+
+def split_mesh_into_tiles(mesh: "trimesh.Trimesh",
+                          tile_size: float) -> Dict[Tuple[int, int], "trimesh.Trimesh"]:
+    """按面中心所在的平面网格将网格切分为瓦片"""
+    import numpy as np
+
+    if len(mesh.faces) == 0:
+        return {}
+
+    centers = mesh.triangles_center[:, TILE_AXES]
+    keys = np.floor(centers / tile_size).astype(np.int64)
+
+    # 一次排序完成分组，避免对每个瓦片扫描全部面
+    tile_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    order = np.argsort(inverse, kind="stable")
+    bounds = np.searchsorted(inverse[order], np.arange(len(tile_keys) + 1))
+
+    tiles = {}
+    for i, (tile_x, tile_y) in enumerate(tile_keys):
+        faces = order[bounds[i]:bounds[i + 1]]
+        tiles[(int(tile_x), int(tile_y))] = mesh.submesh([faces], append=True)
+    return tiles
+
+def get_tile_path(output_dir: str, level: int, tile_x: int, tile_y: int) -> Path:
+    """获取瓦片文件路径"""
+    return Path(output_dir) / f"lod{level}" / f"{tile_x}_{tile_y}.glb"
+
+def build_lod_tiles(model_path: str,
+                    output_dir: str,
+                    tile_size: float = DEFAULT_TILE_SIZE,
+                    lod_ratios: Sequence[float] = DEFAULT_LOD_RATIOS) -> Dict[str, Any]:
+    """生成多级LOD瓦片（GLB）及瓦片索引
+
+    每降低一级精度，瓦片边长加倍，最粗一级只需少量请求即可显示整个场地。
+    """
+    try:
+        mesh = load_scene_mesh(model_path)
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+
+        levels = []
+        for level, ratio in enumerate(lod_ratios):
+            level_tile_size = tile_size * (2 ** level)
+            tiles = []
+            for (tile_x, tile_y), tile_mesh in split_mesh_into_tiles(mesh, level_tile_size).items():
+                simplified = simplify_mesh(tile_mesh, ratio)
+                tile_path = get_tile_path(output_dir, level, tile_x, tile_y)
+                tile_path.parent.mkdir(parents=True, exist_ok=True)
+                tile_path.write_bytes(simplified.export(file_type="glb"))
+                tiles.append({
+                    "x": tile_x,
+                    "y": tile_y,
+                    "faces": len(simplified.faces),
+                    "bounds": simplified.bounds.tolist(),
+                    "size": tile_path.stat().st_size
+                })
+            levels.append({
+                "level": level,
+                "ratio": ratio,
+                "tile_size": level_tile_size,
+                "tiles": tiles
+            })
+
+        manifest = {
+            "source": Path(model_path).name,
+            "face_count": len(mesh.faces),
+            "bounds": mesh.bounds.tolist(),
+            "tile_axes": list(TILE_AXES),
+            "levels": levels
+        }
+        (output_path / MANIFEST_NAME).write_text(json.dumps(manifest))
+        return manifest
+    except Exception as e:
+        print(f"Error building LOD tiles: {e}")
+        return {}
+
+def load_tile_manifest(output_dir: str) -> Dict[str, Any]:
+    """读取瓦片索引"""
+    manifest_path = Path(output_dir) / MANIFEST_NAME
+    if not manifest_path.exists():
+        return {}
+    return json.loads(manifest_path.read_text())
@@ -0,0 +1,295 @@
+# landscape_lab/utils/metrics.py
+import contextvars
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from starlette.routing import Match
+
+# 默认延迟分桶（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# 每请求查询次数分桶
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+# 未匹配路由统一归为一类，避免标签基数膨胀
+UNMATCHED_ROUTE = "<unmatched>"
+# 共享状态中各工作进程指标快照的键前缀
+METRICS_KEY_PREFIX = "metrics:"
+
+# 当前请求的数据库统计：[查询次数, 查询总耗时]
+_request_db_stats: contextvars.ContextVar = contextvars.ContextVar("request_db_stats", default=None)
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+def _merge_value(total: Any, value: Any) -> Any:
+    """合并两个工作进程的样本值（直方图为逐桶相加）"""
+    if total is None:
+        return list(value) if isinstance(value, list) else value
+    if isinstance(total, list):
+        return [a + b for a, b in zip(total, value)]
+    return total + value
+
+class Metric:
+    """指标基类，标签值按labelnames顺序以位置参数传入"""
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], Any] = {}
+
+    def snapshot(self) -> List[list]:
+        """导出可JSON序列化的样本：[[标签值...], 值]"""
+        with self._lock:
+            return [
+                [list(labels), list(value) if isinstance(value, list) else value]
+                for labels, value in self._values.items()
+            ]
+
+    def render(self, snapshots: Optional[List[List[list]]] = None) -> List[str]:
+        """输出本进程的样本，或合并多个进程快照后输出"""
+        if snapshots is None:
+            snapshots = [self.snapshot()]
+        merged: Dict[Tuple[str, ...], Any] = {}
+        for samples in snapshots:
+            for labels, value in samples:
+                key = tuple(labels)
+                merged[key] = _merge_value(merged.get(key), value)
+
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._render_samples(list(merged.items())))
+        return lines
+
+    def _render_samples(self, items: List[Tuple[Tuple[str, ...], Any]]) -> List[str]:
+        raise NotImplementedError
+
+class Counter(Metric):
+    """单调递增计数器"""
+    type_name = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def _render_samples(self, items: List[Tuple[Tuple[str, ...], Any]]) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in items
+        ]
+
+class Gauge(Counter):
+    """可增可减的瞬时值"""
+    type_name = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float):
+        with self._lock:
+            self._values[labels] = value
+
+class Histogram(Metric):
+    """分桶直方图"""
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 标签 -> [各桶计数(非累积)..., +Inf桶计数, 总和]
+
+    def observe(self, value: float, *labels: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def time(self, *labels: str):
+        """装饰器：记录函数执行耗时"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(time.perf_counter() - start, *labels)
+            return wrapper
+        return decorator
+
+    def _render_samples(self, items: List[Tuple[Tuple[str, ...], Any]]) -> List[str]:
+        lines = []
+        for labels, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                le_label = f'le="{le}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, labels, le_label)} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {series[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    """指标注册表"""
+
+    def __init__(self):
+        self._metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def snapshot(self) -> Dict[str, List[list]]:
+        """导出本进程全部指标的快照"""
+        return {metric.name: metric.snapshot() for metric in self._metrics}
+
+    def render(self, snapshots: Optional[List[Dict[str, List[list]]]] = None) -> str:
+        """输出Prometheus文本格式，传入多个进程的快照时输出合并结果"""
+        lines = []
+        for metric in self._metrics:
+            if snapshots is None:
+                lines.extend(metric.render())
+            else:
+                lines.extend(metric.render([snapshot.get(metric.name, []) for snapshot in snapshots]))
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "Total HTTP requests.", ("method", "route", "status")))
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ("method", "route")))
+HTTP_REQUESTS_IN_PROGRESS = REGISTRY.register(Gauge(
+    "http_requests_in_progress", "HTTP requests currently being handled.", ("method", "route")))
+DB_QUERY_DURATION = REGISTRY.register(Histogram(
+    "db_query_duration_seconds", "Duration of individual SQL statements."))
+DB_QUERIES_PER_REQUEST = REGISTRY.register(Histogram(
+    "db_queries_per_request", "SQL statements executed per HTTP request.", ("route",),
+    buckets=QUERY_COUNT_BUCKETS))
+DB_TIME_PER_REQUEST = REGISTRY.register(Histogram(
+    "db_time_per_request_seconds", "Total SQL time per HTTP request.", ("route",)))
+ANALYSIS_DURATION = REGISTRY.register(Histogram(
+    "analysis_duration_seconds", "Duration of analysis functions.", ("function",)))
+
+def publish_metrics(backend, ttl: float):
+    """将本进程的指标快照写入共享状态"""
+    backend.set(f"{METRICS_KEY_PREFIX}{os.getpid()}", REGISTRY.snapshot(), ttl=ttl)
+
+def render_worker_metrics(backend, ttl: float) -> str:
+    """合并所有工作进程的指标快照输出
+
+    已退出的进程快照在ttl后过期，其计数随之消失，Prometheus会按计数器重置处理。
+    """
+    publish_metrics(backend, ttl)
+    return REGISTRY.render(list(backend.items(METRICS_KEY_PREFIX).values()))
+
+def start_metrics_publisher(backend, interval: float) -> threading.Thread:
+    """启动后台线程定期发布本进程的指标快照"""
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                publish_metrics(backend, interval * 3)
+            except Exception as e:
+                print(f"Error publishing metrics: {e}")
+
+    thread = threading.Thread(target=run, name="metrics-publisher", daemon=True)
+    thread.start()
+    return thread
+
+def timed(function_name: str):
+    """装饰器：记录分析函数耗时"""
+    return ANALYSIS_DURATION.time(function_name)
+
+def resolve_route_path(scope) -> str:
+    """获取请求匹配的路由模板（如 /api/projects/{project_id}）"""
+    app = scope.get("app")
+    router = getattr(app, "router", None)
+    for route in getattr(router, "routes", []):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return UNMATCHED_ROUTE
+
+class MetricsMiddleware:
+    """ASGI中间件：记录各路由延迟、并发数及每请求数据库查询统计"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = resolve_route_path(scope)
+        status_code = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_code[0] = message["status"]
+            await send(message)
+
+        db_stats = [0, 0.0]
+        token = _request_db_stats.set(db_stats)
+        HTTP_REQUESTS_IN_PROGRESS.inc(method, route)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_REQUESTS_IN_PROGRESS.dec(method, route)
+            HTTP_REQUESTS.inc(method, route, str(status_code[0]))
+            HTTP_REQUEST_DURATION.observe(elapsed, method, route)
+            DB_QUERIES_PER_REQUEST.observe(db_stats[0], route)
+            DB_TIME_PER_REQUEST.observe(db_stats[1], route)
+            _request_db_stats.reset(token)
+
+def instrument_engine(engine):
+    """为SQLAlchemy引擎注册查询计时钩子"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start_times: Optional[list] = conn.info.get("query_start_times")
+        if not start_times:
+            return
+        elapsed = time.perf_counter() - start_times.pop()
+        DB_QUERY_DURATION.observe(elapsed)
+        db_stats = _request_db_stats.get()
+        if db_stats is not None:
+            db_stats[0] += 1
+            db_stats[1] += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(context):
+        # 出错的语句不会触发after_cursor_execute，需丢弃其开始时间
+        conn = context.connection
+        start_times = conn.info.get("query_start_times") if conn is not None else None
+        if start_times:
+            start_times.pop()
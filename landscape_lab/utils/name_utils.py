@@ -0,0 +1,219 @@
+# landscape_lab/utils/name_utils.py
+"""植物名称模糊匹配：将导入数据、模型节点中的不规范名称对应到植物库
+
+名称先规范化（全角转半角、转小写、去除规格尺寸与编号、同义词替换、去除停用词），
+再按词切分为带首尾填充的三元组（与 PostgreSQL pg_trgm 相同）。索引为三元组到名称条目的
+倒排表，查询时合并各三元组的条目列表、统计共有三元组数，按 Dice 系数打分。
+索引与植物推荐索引共用植物库版本号，植物库变更后在下次查询时重建。
+"""
+import re
+import threading
+import unicodedata
+from array import array
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Pattern, Sequence, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.plant import Plant
+from .recommend_utils import get_plant_catalogue_version
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# 规格尺寸：数字后的单位、数字前的标记（如 H3m、Φ8cm、高3米）
+MEASURE_UNITS = {"m", "cm", "mm", "米", "厘米", "公分", "毫米"}
+MEASURE_PREFIXES = {"h", "d", "p", "w", "dbh", "φ", "ø", "高", "高度", "胸径", "地径", "冠幅"}
+# 不参与匹配的词：种下等级、杂交符号、模型节点常见前后缀
+STOPWORDS = {
+    "cv", "var", "subsp", "ssp", "spp", "sp", "f", "x",
+    "plant", "plants", "tree", "shrub", "mesh", "geo", "node", "group", "instance", "copy", "lod",
+    "植物", "苗木",
+}
+_TOKEN_SEPARATOR = re.compile(r"[\W_]+")
+_LETTER_DIGIT = re.compile(r"(?<=\D)(?=\d)|(?<=\d)(?=\D)")
+
+_synonym_pattern: Optional[Tuple[Pattern, Dict[str, str]]] = None
+
+def _tokenize(text: str) -> List[str]:
+    """切分为词并去除规格尺寸与编号"""
+    text = unicodedata.normalize("NFKC", text).lower().replace("×", " ")
+    parts = [
+        part
+        for token in _TOKEN_SEPARATOR.split(text) if token
+        for part in _LETTER_DIGIT.split(token) if part
+    ]
+    tokens = []
+    for i, part in enumerate(parts):
+        if part.isdigit():
+            continue
+        if part in MEASURE_UNITS and i > 0 and parts[i - 1].isdigit():
+            continue
+        if part in MEASURE_PREFIXES and i + 1 < len(parts) and parts[i + 1].isdigit():
+            continue
+        tokens.append(part)
+    return tokens
+
+def _get_synonym_pattern() -> Tuple[Pattern, Dict[str, str]]:
+    """按 PLANT_NAME_SYNONYMS 编译同义词替换（别名与标准名均先规范化，长别名优先）"""
+    global _synonym_pattern
+    if _synonym_pattern is None:
+        synonyms = {
+            " ".join(_tokenize(alias)): " ".join(_tokenize(canonical))
+            for alias, canonical in settings.PLANT_NAME_SYNONYMS.items()
+        }
+        synonyms = {alias: canonical for alias, canonical in synonyms.items() if alias}
+        aliases = sorted(synonyms, key=len, reverse=True)
+        pattern = re.compile(
+            "(?<![a-z0-9])(" + "|".join(re.escape(alias) for alias in aliases) + ")(?![a-z0-9])"
+        ) if aliases else re.compile(r"(?!x)x")
+        _synonym_pattern = (pattern, synonyms)
+    return _synonym_pattern
+
+def normalize_name(text: Optional[str]) -> str:
+    """规范化植物名称，如 "Acer palm. 'Bloodgood' 3m" -> "acer palm bloodgood" """
+    if not text:
+        return ""
+    pattern, synonyms = _get_synonym_pattern()
+    joined = pattern.sub(lambda match: synonyms[match.group(1)], " ".join(_tokenize(text)))
+    return " ".join(token for token in joined.split() if token not in STOPWORDS)
+
+def name_trigrams(normalized: str) -> Set[str]:
+    """规范化名称的三元组（每个词前补两个空格、后补一个空格）"""
+    grams = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+@dataclass
+class NameIndex:
+    """名称三元组倒排索引
+
+    条目为去重后的规范化名称，postings[offsets[g]:offsets[g + 1]] 为含三元组 g 的条目。
+    """
+    version: int
+    vocabulary: Dict[str, int]
+    offsets: "np.ndarray"
+    postings: "np.ndarray"
+    entry_names: List[str]
+    entry_sizes: "np.ndarray"
+    # 条目对应的 [(植物ID, 字段)]
+    entry_plants: List[List[Tuple[int, str]]]
+    plants: Dict[int, Tuple[str, str]]
+
+    def __len__(self) -> int:
+        return len(self.entry_names)
+
+def build_name_index(db: Session, version: int) -> NameIndex:
+    """读取植物库的名称与学名建立索引"""
+    import numpy as np
+
+    rows = db.query(Plant.id, Plant.name, Plant.scientific_name).order_by(Plant.id).all()
+    entries: Dict[str, int] = {}
+    entry_plants: List[List[Tuple[int, str]]] = []
+    vocabulary: Dict[str, int] = {}
+    # (三元组, 条目) 对，用紧凑数组保存，避免大量 Python 整数对象
+    pair_grams, pair_entries = array("i"), array("i")
+    entry_sizes = array("i")
+    for plant_id, name, scientific_name in rows:
+        for field, value in (("scientific_name", scientific_name), ("name", name)):
+            normalized = normalize_name(value)
+            if not normalized:
+                continue
+            entry = entries.get(normalized)
+            if entry is None:
+                entry = entries[normalized] = len(entry_plants)
+                entry_plants.append([])
+                grams = name_trigrams(normalized)
+                entry_sizes.append(len(grams))
+                for gram in grams:
+                    pair_grams.append(vocabulary.setdefault(gram, len(vocabulary)))
+                    pair_entries.append(entry)
+            if all(existing != plant_id for existing, _ in entry_plants[entry]):
+                entry_plants[entry].append((plant_id, field))
+
+    grams = np.frombuffer(pair_grams, dtype=np.int32) if pair_grams else np.zeros(0, dtype=np.int32)
+    order = np.argsort(grams, kind="stable")
+    postings = (np.frombuffer(pair_entries, dtype=np.int32) if pair_entries else np.zeros(0, dtype=np.int32))[order]
+    offsets = np.searchsorted(grams[order], np.arange(len(vocabulary) + 1))
+    return NameIndex(
+        version=version,
+        vocabulary=vocabulary,
+        offsets=offsets,
+        postings=postings,
+        entry_names=list(entries),
+        entry_sizes=np.array(entry_sizes, dtype=np.int32),
+        entry_plants=entry_plants,
+        plants={plant_id: (name, scientific_name) for plant_id, name, scientific_name in rows},
+    )
+
+_name_index: Optional[NameIndex] = None
+_name_index_lock = threading.Lock()
+
+def get_name_index(db: Session) -> NameIndex:
+    """获取当前进程的名称索引，植物库版本变化后重建"""
+    global _name_index
+    version = get_plant_catalogue_version()
+    index = _name_index
+    if index is not None and index.version == version:
+        return index
+    with _name_index_lock:
+        if _name_index is None or _name_index.version != version:
+            _name_index = build_name_index(db, version)
+        return _name_index
+
+def _match_normalized(index: NameIndex, normalized: str, limit: int, min_score: float) -> List[Dict[str, Any]]:
+    import numpy as np
+
+    grams = name_trigrams(normalized)
+    gram_ids = [index.vocabulary[gram] for gram in grams if gram in index.vocabulary]
+    if not gram_ids:
+        return []
+    hits = np.concatenate([index.postings[index.offsets[g]:index.offsets[g + 1]] for g in gram_ids])
+    shared = np.bincount(hits, minlength=len(index))
+    # Dice = 2c / (q + e) 且 e >= c，得分达到 min_score 至少需要 c >= s * q / (2 - s) 个共有三元组
+    candidates = np.flatnonzero(shared >= max(1.0, min_score * len(grams) / (2 - min_score)))
+    scores = 2 * shared[candidates] / (len(grams) + index.entry_sizes[candidates])
+    keep = scores >= min_score
+    candidates, scores = candidates[keep], scores[keep]
+    if len(candidates) > limit:
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        candidates, scores = candidates[top], scores[top]
+
+    results = {}
+    for entry, score in zip(candidates.tolist(), scores.tolist()):
+        for plant_id, field in index.entry_plants[entry]:
+            if plant_id not in results or results[plant_id]["score"] < score:
+                name, scientific_name = index.plants[plant_id]
+                results[plant_id] = {
+                    "id": plant_id,
+                    "name": name,
+                    "scientific_name": scientific_name,
+                    "score": round(score, 4),
+                    "matched_field": field,
+                }
+    return sorted(results.values(), key=lambda result: (-result["score"], result["id"]))[:limit]
+
+def match_names(index: NameIndex, names: Sequence[str], limit: int = 5,
+                min_score: Optional[float] = None) -> List[Dict[str, Any]]:
+    """批量匹配名称，返回每个名称的 {query, normalized, candidates}（候选按得分从高到低）
+
+    规范化后相同的名称只匹配一次（模型节点名常只有编号不同）。
+    """
+    min_score = settings.NAME_MATCH_MIN_SCORE if min_score is None else min_score
+    matched: Dict[str, List[Dict[str, Any]]] = {}
+    results = []
+    for name in names:
+        normalized = normalize_name(name)
+        if normalized not in matched:
+            matched[normalized] = _match_normalized(index, normalized, limit, min_score) if normalized else []
+        results.append({"query": name, "normalized": normalized, "candidates": matched[normalized]})
+    return results
+
+def match_plant_id(index: NameIndex, name: str, min_score: Optional[float] = None) -> Optional[int]:
+    """名称的最佳匹配植物ID，得分低于 min_score（默认 NAME_MATCH_AUTO_SCORE）时返回None"""
+    min_score = settings.NAME_MATCH_AUTO_SCORE if min_score is None else min_score
+    candidates = match_names(index, [name], limit=1, min_score=min_score)[0]["candidates"]
+    return candidates[0]["id"] if candidates else None
@@ -0,0 +1,232 @@
+# landscape_lab/utils/profiling.py
+import asyncio
+import json
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+from ..config import settings
+from ..database import SessionLocal
+from .security import get_user_from_token
+
+PROFILE_ROOT = Path(settings.PROFILE_DIR)
+SLOW_LOG_NAME = "slow_requests.jsonl"
+PROFILE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+# 空闲线程的栈顶函数（等待锁、队列或IO），不计入采样
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+}
+# 同时运行的采样器上限，避免慢请求集中出现时放大开销
+_sampler_slots = threading.BoundedSemaphore(2)
+
+class StackSampler:
+    """采样分析器：周期性采集所有线程的调用栈
+
+    同步处理函数在线程池中执行，只分析当前线程的分析器看不到它们，
+    因此这里对全部线程采样，并发请求的调用栈会出现在同一份结果中。
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._frame_index: Dict[Tuple[str, str, int], int] = {}
+        self._frames: List[Dict[str, Any]] = []
+        self._samples: Dict[int, List[List[int]]] = defaultdict(list)
+        self._thread_names: Dict[int, str] = {}
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.duration = 0.0
+
+    def start(self):
+        self._start_time = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self._start_time
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = self._collect_stack(frame)
+                if stack:
+                    self._samples[thread_id].append(stack)
+
+    def _collect_stack(self, frame) -> List[int]:
+        code = frame.f_code
+        if (Path(code.co_filename).name, code.co_name) in IDLE_FRAMES:
+            return []
+
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            key = (code.co_name, code.co_filename, code.co_firstlineno)
+            index = self._frame_index.get(key)
+            if index is None:
+                index = self._frame_index[key] = len(self._frames)
+                self._frames.append({"name": key[0], "file": key[1], "line": key[2]})
+            stack.append(index)
+            frame = frame.f_back
+        stack.reverse()
+        return stack
+
+    def to_speedscope(self, name: str) -> Dict[str, Any]:
+        """导出为speedscope格式"""
+        threads = {thread.ident: thread.name for thread in threading.enumerate()}
+        profiles = []
+        for thread_id, samples in self._samples.items():
+            profiles.append({
+                "type": "sampled",
+                "name": threads.get(thread_id, str(thread_id)),
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": len(samples) * self.interval,
+                "samples": samples,
+                "weights": [self.interval] * len(samples)
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "landscape_lab",
+            "shared": {"frames": self._frames},
+            "profiles": profiles
+        }
+
+def get_profile_path(profile_id: str) -> Path:
+    """获取分析结果文件路径"""
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PROFILE_ROOT / f"{profile_id}.speedscope.json"
+
+def save_profile(profile_id: str, sampler: StackSampler, name: str):
+    """保存分析结果"""
+    PROFILE_ROOT.mkdir(parents=True, exist_ok=True)
+    get_profile_path(profile_id).write_text(json.dumps(sampler.to_speedscope(name)))
+
+def append_slow_request(entry: Dict[str, Any]):
+    """追加慢请求日志"""
+    PROFILE_ROOT.mkdir(parents=True, exist_ok=True)
+    with open(PROFILE_ROOT / SLOW_LOG_NAME, "a") as f:
+        f.write(json.dumps(entry) + "\n")
+
+def read_slow_requests(limit: int = 50) -> List[Dict[str, Any]]:
+    """读取最近的慢请求日志"""
+    log_path = PROFILE_ROOT / SLOW_LOG_NAME
+    if not log_path.exists():
+        return []
+    lines = log_path.read_text().splitlines()[-limit:]
+    return [json.loads(line) for line in reversed(lines)]
+
+def _profile_requested(scope) -> bool:
+    """请求头 X-Profile 或查询参数 profile 为真时启用分析"""
+    for name, value in scope.get("headers", []):
+        if name == b"x-profile":
+            return value.decode().lower() in ("1", "true")
+    query = parse_qs(scope.get("query_string", b"").decode())
+    return query.get("profile", [""])[0].lower() in ("1", "true")
+
+def _is_admin_token(token: str) -> bool:
+    db = SessionLocal()
+    try:
+        return bool(get_user_from_token(db, token).is_admin)
+    except HTTPException:
+        return False
+    finally:
+        db.close()
+
+async def _is_admin_request(scope) -> bool:
+    for name, value in scope.get("headers", []):
+        if name == b"authorization":
+            scheme, _, token = value.decode().partition(" ")
+            if scheme.lower() == "bearer" and token:
+                return await run_in_threadpool(_is_admin_token, token)
+    return False
+
+class ProfilingMiddleware:
+    """ASGI中间件：管理员按需分析单个请求，并自动采样超过阈值的慢请求"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if _profile_requested(scope) and await _is_admin_request(scope):
+            await self._profile_request(scope, receive, send)
+        elif settings.SLOW_REQUEST_PROFILING:
+            await self._watch_slow_request(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+    async def _profile_request(self, scope, receive, send):
+        profile_id = uuid.uuid4().hex
+        name = f"{scope['method']} {scope['path']}"
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile_id.encode())
+                ]
+            await send(message)
+
+        sampler = StackSampler(settings.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            await run_in_threadpool(save_profile, profile_id, sampler, name)
+
+    async def _watch_slow_request(self, scope, receive, send):
+        threshold = settings.SLOW_REQUEST_THRESHOLD_MS / 1000
+        active = {}
+
+        def start_sampler():
+            # 请求超过阈值仍未结束时才开始采样，正常请求没有额外开销
+            if _sampler_slots.acquire(blocking=False):
+                sampler = StackSampler(settings.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+                sampler.start()
+                active["sampler"] = sampler
+
+        handle = asyncio.get_running_loop().call_later(threshold, start_sampler)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            handle.cancel()
+            duration = time.perf_counter() - start
+            sampler = active.get("sampler")
+            if sampler is not None or duration >= threshold:
+                profile_id = None
+                if sampler is not None:
+                    sampler.stop()
+                    _sampler_slots.release()
+                    profile_id = uuid.uuid4().hex
+                    await run_in_threadpool(
+                        save_profile, profile_id, sampler, f"{scope['method']} {scope['path']}"
+                    )
+                await run_in_threadpool(append_slow_request, {
+                    "profile_id": profile_id,
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "duration_ms": round(duration * 1000, 1),
+                    "timestamp": datetime.utcnow().isoformat()
+                })
@@ -0,0 +1,136 @@
+# landscape_lab/utils/raster_utils.py
+"""栅格分析结果的保存与瓦片读取
+
+每个图层保存为一个 .npy 文件，另有一个JSON索引记录栅格范围与各图层取值范围。
+读取瓦片时以内存映射打开图层，只读取所需窗口。行号沿Y轴增大（自南向北）。
+"""
+import io
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# 瓦片格式
+TILE_MEDIA_TYPES = {"png": "image/png", "npy": "application/octet-stream"}
+# 单色图层配色（RGB），数值越大越不透明
+LAYER_COLORS = {
+    "accumulation": (30, 90, 200),
+    "ponding": (0, 60, 255),
+    "permeability": (40, 160, 60),
+}
+# 渐变图层配色：(最小值颜色, 最大值颜色)，不透明
+LAYER_RAMPS = {
+    "sun_hours": ((40, 40, 110), (255, 210, 0)),
+}
+
+def save_raster_result(result: Dict[str, Any], output_dir: str, tile_size: int,
+                       manifest_name: str) -> Dict[str, Any]:
+    """保存 result["layers"] 中的各图层及索引，返回索引"""
+    import numpy as np
+
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    layers = {}
+    for name, array in result["layers"].items():
+        np.save(output_path / f"{name}.npy", array)
+        finite = array[np.isfinite(array)] if array.dtype.kind == "f" else array[array >= 0]
+        layers[name] = {
+            "dtype": str(array.dtype),
+            "min": float(finite.min()) if len(finite) else 0.0,
+            "max": float(finite.max()) if len(finite) else 0.0,
+        }
+    rows, cols = result["shape"]
+    manifest = {
+        "origin": result["origin"],
+        "resolution": result["resolution"],
+        "shape": result["shape"],
+        "tile_size": tile_size,
+        "tiles": [-(-cols // tile_size), -(-rows // tile_size)],
+        "layers": layers,
+        "summary": result["summary"],
+    }
+    (output_path / manifest_name).write_text(json.dumps(manifest))
+    return manifest
+
+def load_raster_manifest(output_dir: str, manifest_name: str) -> Dict[str, Any]:
+    """读取栅格结果索引，不存在时返回空dict"""
+    manifest_path = Path(output_dir) / manifest_name
+    if not manifest_path.exists():
+        return {}
+    return json.loads(manifest_path.read_text())
+
+def read_raster_tile(output_dir: str, layer: str, tile_x: int, tile_y: int,
+                     tile_size: int) -> Optional["np.ndarray"]:
+    """按瓦片读取图层窗口（tile_y 自南向北计数），瓦片不存在时返回None"""
+    import numpy as np
+
+    layer_path = Path(output_dir) / f"{layer}.npy"
+    if not layer_path.exists():
+        return None
+    array = np.load(layer_path, mmap_mode="r")
+    rows, cols = array.shape
+    row_start, col_start = tile_y * tile_size, tile_x * tile_size
+    if tile_x < 0 or tile_y < 0 or row_start >= rows or col_start >= cols:
+        return None
+    return np.array(array[row_start:row_start + tile_size, col_start:col_start + tile_size])
+
+def sample_raster(output_dir: str, layer: str, manifest: Dict[str, Any],
+                  points: Sequence[Sequence[float]]) -> "np.ndarray":
+    """取各平面坐标所在单元的图层值，超出范围或无数据时为NaN"""
+    import numpy as np
+
+    array = np.load(Path(output_dir) / f"{layer}.npy", mmap_mode="r")
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    cells = np.floor((points - manifest["origin"]) / manifest["resolution"]).astype(np.int64)
+    rows, cols = array.shape
+    inside = (cells[:, 0] >= 0) & (cells[:, 0] < cols) & (cells[:, 1] >= 0) & (cells[:, 1] < rows)
+    values = np.full(len(points), np.nan)
+    values[inside] = array[cells[inside, 1], cells[inside, 0]]
+    return values
+
+def encode_tile_png(tile: "np.ndarray", layer: str, value_range: Tuple[float, float]) -> bytes:
+    """将瓦片渲染为PNG（北向朝上），无数据单元透明"""
+    import numpy as np
+    from PIL import Image
+
+    tile = np.flipud(tile)
+    if layer == "flow_direction":
+        # 方向编号映射为色相
+        hue = np.where(tile >= 0, tile.astype(np.int64) * 32, 0).astype(np.uint8)
+        hsv = np.stack([hue, np.full_like(hue, 200), np.where(tile >= 0, 220, 0).astype(np.uint8)], axis=-1)
+        rgba = np.asarray(Image.fromarray(hsv, "HSV").convert("RGBA")).copy()
+        rgba[..., 3] = np.where(tile >= 0, 255, 0)
+    else:
+        low, high = value_range
+        values = tile.astype(np.float64)
+        if layer == "accumulation":
+            # 汇流量跨越多个数量级，按对数显示
+            values, low, high = np.log1p(np.maximum(values, 0)), np.log1p(max(low, 0)), np.log1p(max(high, 0))
+        nodata = ~np.isfinite(values)
+        scaled = np.clip((np.nan_to_num(values) - low) / ((high - low) or 1.0), 0, 1)
+        rgba = np.zeros(tile.shape + (4,), dtype=np.uint8)
+        if layer in LAYER_RAMPS:
+            low_color, high_color = (np.array(color, dtype=np.float64) for color in LAYER_RAMPS[layer])
+            rgba[..., :3] = (low_color + scaled[..., None] * (high_color - low_color)).astype(np.uint8)
+            rgba[..., 3] = 255
+        elif layer in LAYER_COLORS:
+            rgba[..., :3] = LAYER_COLORS[layer]
+            rgba[..., 3] = (scaled * 255).astype(np.uint8)
+        else:
+            rgba[..., :3] = (scaled * 255).astype(np.uint8)[..., None]
+            rgba[..., 3] = 255
+        rgba[nodata] = 0
+
+    buffer = io.BytesIO()
+    Image.fromarray(rgba, "RGBA").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def encode_tile_npy(tile: "np.ndarray") -> bytes:
+    """将瓦片编码为 .npy（原始数值）"""
+    import numpy as np
+
+    buffer = io.BytesIO()
+    np.save(buffer, tile)
+    return buffer.getvalue()
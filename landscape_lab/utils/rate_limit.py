@@ -0,0 +1,147 @@
+# landscape_lab/utils/rate_limit.py
+"""限流与准入控制
+
+- 令牌桶限流：每个用户（未登录时按IP）一个全局桶，RATE_LIMITS 中的路由另有独立的桶，
+  超出返回429。令牌桶保存在共享状态后端中，多个工作进程共用同一份额度。
+- 并发上限：重型接口在每个工作进程内同时执行的请求数受限，超出返回503；
+  单个用户同时占用的名额也受限（返回429），避免一个用户占满全部名额。
+"""
+import math
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+
+from ..config import settings
+from .metrics import resolve_route_path
+from .security import decode_access_token
+from .state import MemoryStateBackend, StateBackend, create_state_backend, get_state_backend
+
+RATE_LIMIT_PREFIX = "ratelimit:"
+# 全局桶使用的路由键
+DEFAULT_ROUTE_KEY = "*"
+PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+
+def parse_rate(limit: str) -> Tuple[float, float]:
+    """解析 "次数/周期"，返回 (每秒补充的令牌数, 桶容量)"""
+    count, _, period = limit.partition("/")
+    period = period.strip()
+    if period not in PERIODS:
+        raise ValueError(f"Invalid rate limit: {limit}")
+    capacity = float(count)
+    return capacity / PERIODS[period], capacity
+
+def get_client_identity(scope) -> str:
+    """限流对象：携带有效访问令牌时为用户名，否则为客户端IP"""
+    for name, value in scope.get("headers", []):
+        if name == b"authorization":
+            scheme, _, token = value.decode().partition(" ")
+            if scheme.lower() == "bearer" and token:
+                try:
+                    username = decode_access_token(token).get("sub")
+                except HTTPException:
+                    username = None
+                if username:
+                    return f"user:{username}"
+            break
+    client = scope.get("client")
+    return f"ip:{client[0]}" if client else "ip:unknown"
+
+class RateLimiter:
+    """按路由与用户计数的令牌桶"""
+
+    def __init__(self, backend: StateBackend, default: Optional[str], limits: Dict[str, str]):
+        self.backend = backend
+        self.default = parse_rate(default) if default else None
+        self.limits = {route: parse_rate(limit) for route, limit in limits.items()}
+
+    def check(self, route_key: str, identity: str) -> float:
+        """取出全局桶与路由桶的令牌，允许时返回0，否则返回需等待的秒数"""
+        buckets = []
+        if self.default:
+            buckets.append((DEFAULT_ROUTE_KEY, self.default))
+        if route_key in self.limits:
+            buckets.append((route_key, self.limits[route_key]))
+        for key, (rate, capacity) in buckets:
+            wait = self.backend.take_token(f"{RATE_LIMIT_PREFIX}{key}:{identity}", rate, capacity)
+            if wait > 0:
+                return wait
+        return 0.0
+
+async def _reject(scope, receive, send, status_code: int, detail: str, retry_after: float):
+    response = JSONResponse(
+        {"detail": detail},
+        status_code=status_code,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
+    await response(scope, receive, send)
+
+class RateLimitMiddleware:
+    """ASGI中间件：限流与重型接口的并发控制"""
+
+    def __init__(self, app):
+        self.app = app
+        self._limiter: Optional[RateLimiter] = None
+        self._concurrency_limits = dict(settings.CONCURRENCY_LIMITS)
+        # 本进程各路由及各用户正在执行的重型请求数（只在事件循环线程中修改）
+        self._active_routes: Dict[str, int] = defaultdict(int)
+        self._active_users: Dict[str, int] = defaultdict(int)
+
+    def _get_limiter(self) -> RateLimiter:
+        if self._limiter is None:
+            backend_name = settings.RATE_LIMIT_BACKEND or settings.STATE_BACKEND
+            if backend_name == settings.STATE_BACKEND:
+                backend = get_state_backend()
+            else:
+                backend = create_state_backend(backend_name)
+            self._limiter = RateLimiter(backend, settings.RATE_LIMIT_DEFAULT, settings.RATE_LIMITS)
+        return self._limiter
+
+    async def _check_rate(self, route_key: str, identity: str) -> float:
+        limiter = self._get_limiter()
+        try:
+            if isinstance(limiter.backend, MemoryStateBackend):
+                return limiter.check(route_key, identity)
+            # 共享后端可能等待写锁，不阻塞事件循环
+            return await run_in_threadpool(limiter.check, route_key, identity)
+        except Exception as e:
+            # 状态后端故障时放行请求
+            print(f"Error checking rate limit: {e}")
+            return 0.0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        route_key = f"{scope['method']} {resolve_route_path(scope)}"
+        identity = get_client_identity(scope)
+        wait = await self._check_rate(route_key, identity)
+        if wait > 0:
+            await _reject(scope, receive, send, 429, "Rate limit exceeded", wait)
+            return
+
+        limit = self._concurrency_limits.get(route_key)
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+        if self._active_users[identity] >= settings.CONCURRENCY_PER_USER:
+            await _reject(scope, receive, send, 429, "Too many concurrent requests",
+                          settings.CONCURRENCY_RETRY_AFTER)
+            return
+        if self._active_routes[route_key] >= limit:
+            await _reject(scope, receive, send, 503, "Server busy, please retry",
+                          settings.CONCURRENCY_RETRY_AFTER)
+            return
+
+        self._active_routes[route_key] += 1
+        self._active_users[identity] += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self._active_routes[route_key] -= 1
+            self._active_users[identity] -= 1
+            if not self._active_users[identity]:
+                del self._active_users[identity]
@@ -0,0 +1,312 @@
+# landscape_lab/utils/recommend_utils.py
+"""植物推荐：按场地条件对整个植物库打分排序
+
+植物的日照、水分、土壤要求与耐寒区为自由文本，建索引时按关键词编码为：
+- 日照 / 水分：等级位集（全日照、半阴、全阴 / 少、中、多）
+- 土壤：土壤性质位集（黏土、壤土、砂土、酸性、碱性等）
+- 耐寒区：USDA分区范围（7a 记为 7.0，7b 记为 7.5）
+
+索引在内存中保存为 numpy 数组，一次请求对全部植物做一次向量化计算。
+植物库有变更并提交后，共享状态中的版本号加一，各工作进程在下次请求时重建索引。
+"""
+import re
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from ..config import settings
+from ..models.plant import Plant
+from .state import get_state_backend
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# 关键词按长度从长到短匹配，匹配后从文本中移除（"part shade" 不再匹配 "shade"）
+SUNLIGHT_LEVELS = ("full_sun", "partial_shade", "full_shade")
+SUNLIGHT_KEYWORDS = {
+    "full_sun": ("full sun", "sun", "全日照", "全光照", "喜光", "阳性", "强光"),
+    "partial_shade": ("partial shade", "part shade", "part sun", "partial", "semi-shade",
+                      "半阴", "半日照", "散射光"),
+    "full_shade": ("full shade", "shade", "全阴", "耐阴", "喜阴", "阴性"),
+}
+WATER_LEVELS = ("low", "medium", "high")
+WATER_KEYWORDS = {
+    "low": ("low", "drought", "dry", "耐旱", "干旱", "少", "低"),
+    "medium": ("medium", "moderate", "average", "中等", "适中", "中"),
+    "high": ("high", "wet", "moist", "aquatic", "耐水湿", "喜湿", "水生", "湿润", "多", "高"),
+}
+SOIL_TYPES = ("clay", "loam", "sand", "chalk", "acidic", "alkaline", "neutral", "well_drained")
+SOIL_KEYWORDS = {
+    "clay": ("clay", "黏土", "粘土", "黏", "粘"),
+    "loam": ("loam", "壤土", "壤"),
+    "sand": ("sandy", "sand", "砂土", "沙土", "砂", "沙"),
+    "chalk": ("chalk", "石灰"),
+    "acidic": ("acidic", "acid", "酸性", "酸"),
+    "alkaline": ("alkaline", "碱性", "碱"),
+    "neutral": ("neutral", "中性"),
+    "well_drained": ("well-drained", "well drained", "排水良好", "排水"),
+}
+ZONE_PATTERN = re.compile(r"(\d{1,2})\s*([ab])?", re.IGNORECASE)
+
+# 共享状态中的植物库版本号
+PLANT_CATALOGUE_VERSION_KEY = "plant-catalogue-version"
+# 会话中有未提交的植物变更
+CATALOGUE_CHANGED_FLAG = "plant_catalogue_changed"
+
+def _keyword_table(keywords: Dict[str, Sequence[str]], levels: Sequence[str]) -> List[Tuple[str, int]]:
+    table = [(keyword, 1 << levels.index(level)) for level, words in keywords.items() for keyword in words]
+    return sorted(table, key=lambda item: len(item[0]), reverse=True)
+
+_SUNLIGHT_TABLE = _keyword_table(SUNLIGHT_KEYWORDS, SUNLIGHT_LEVELS)
+_WATER_TABLE = _keyword_table(WATER_KEYWORDS, WATER_LEVELS)
+_SOIL_TABLE = _keyword_table(SOIL_KEYWORDS, SOIL_TYPES)
+
+def encode_keywords(text: Optional[str], table: List[Tuple[str, int]]) -> int:
+    """按关键词表将文本编码为位集，无法识别时为0"""
+    if not text:
+        return 0
+    text = text.lower()
+    bits = 0
+    for keyword, bit in table:
+        if keyword in text:
+            bits |= bit
+            text = text.replace(keyword, " ")
+    return bits
+
+def encode_sunlight(text: Optional[str]) -> int:
+    return encode_keywords(text, _SUNLIGHT_TABLE)
+
+def encode_water(text: Optional[str]) -> int:
+    return encode_keywords(text, _WATER_TABLE)
+
+def encode_soil(text: Optional[str]) -> int:
+    return encode_keywords(text, _SOIL_TABLE)
+
+def parse_hardiness_zone(text: Optional[str]) -> Tuple[float, float]:
+    """解析耐寒区文本（如 "5-9"、"USDA 7b"），返回 (最低, 最高) 分区，无法识别时为 (nan, nan)"""
+    zones = []
+    for number, half in ZONE_PATTERN.findall(text or ""):
+        if 1 <= int(number) <= 13:
+            zones.append((int(number), half.lower()))
+    if not zones:
+        return float("nan"), float("nan")
+    low = min(number + (0.5 if half == "b" else 0.0) for number, half in zones)
+    # 未注明 a/b 的上限包含整个分区
+    high = max(number + (0.0 if half == "a" else 0.5) for number, half in zones)
+    return low, high
+
+def sun_hours_to_level(sun_hours: float) -> int:
+    """日均日照时数对应的日照等级位"""
+    if sun_hours >= settings.RECOMMEND_FULL_SUN_HOURS:
+        return 1 << SUNLIGHT_LEVELS.index("full_sun")
+    if sun_hours >= settings.RECOMMEND_PARTIAL_SUN_HOURS:
+        return 1 << SUNLIGHT_LEVELS.index("partial_shade")
+    return 1 << SUNLIGHT_LEVELS.index("full_shade")
+
+@dataclass
+class PlantIndex:
+    """植物库的向量化索引，各数组按 ids 顺序对齐"""
+    version: int
+    ids: "np.ndarray"
+    names: List[str]
+    scientific_names: List[str]
+    categories: List[Optional[str]]
+    # 类别（小写）编号
+    category_lookup: Dict[str, int]
+    category_codes: "np.ndarray"
+    heights: "np.ndarray"
+    spreads: "np.ndarray"
+    sunlight: "np.ndarray"
+    water: "np.ndarray"
+    soil: "np.ndarray"
+    zone_min: "np.ndarray"
+    zone_max: "np.ndarray"
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+def build_plant_index(db: Session, version: int) -> PlantIndex:
+    """读取植物库并编码为索引（相同文本只编码一次）"""
+    import numpy as np
+
+    rows = db.query(
+        Plant.id, Plant.name, Plant.scientific_name, Plant.category, Plant.height, Plant.spread,
+        Plant.sunlight, Plant.water_requirements, Plant.soil_type, Plant.hardiness_zone
+    ).order_by(Plant.id).all()
+    columns = list(zip(*rows)) if rows else [()] * 10
+    ids, names, scientific_names, categories, heights, spreads, sunlight, water, soil, zones = columns
+
+    def encode_column(values, encode, dtype):
+        cache = {}
+        encoded = [cache[value] if value in cache else cache.setdefault(value, encode(value)) for value in values]
+        return np.array(encoded, dtype=dtype)
+
+    category_lookup = {}
+    category_codes = np.array(
+        [category_lookup.setdefault((category or "").lower(), len(category_lookup)) for category in categories],
+        dtype=np.int32
+    )
+    zone_ranges = encode_column(zones, parse_hardiness_zone, np.float32).reshape(-1, 2)
+    return PlantIndex(
+        version=version,
+        ids=np.array(ids, dtype=np.int64),
+        names=list(names),
+        scientific_names=list(scientific_names),
+        categories=list(categories),
+        category_lookup=category_lookup,
+        category_codes=category_codes,
+        heights=np.array([np.nan if h is None else h for h in heights], dtype=np.float64),
+        spreads=np.array([np.nan if s is None else s for s in spreads], dtype=np.float64),
+        sunlight=encode_column(sunlight, encode_sunlight, np.uint8),
+        water=encode_column(water, encode_water, np.uint8),
+        soil=encode_column(soil, encode_soil, np.uint8),
+        zone_min=zone_ranges[:, 0],
+        zone_max=zone_ranges[:, 1],
+    )
+
+_plant_index: Optional[PlantIndex] = None
+_plant_index_lock = threading.Lock()
+
+def get_plant_catalogue_version() -> int:
+    return int(get_state_backend().get(PLANT_CATALOGUE_VERSION_KEY) or 0)
+
+def get_plant_index(db: Session) -> PlantIndex:
+    """获取当前进程的植物索引，植物库版本变化后重建"""
+    global _plant_index
+    version = get_plant_catalogue_version()
+    index = _plant_index
+    if index is not None and index.version == version:
+        return index
+    with _plant_index_lock:
+        if _plant_index is None or _plant_index.version != version:
+            _plant_index = build_plant_index(db, version)
+        return _plant_index
+
+def invalidate_plant_index():
+    """使所有工作进程的植物索引失效"""
+    get_state_backend().incr(PLANT_CATALOGUE_VERSION_KEY)
+
+@event.listens_for(Plant, "after_insert")
+@event.listens_for(Plant, "after_update")
+@event.listens_for(Plant, "after_delete")
+def _mark_catalogue_changed(mapper, connection, target):
+    # 提交后再使索引失效，避免其他请求在提交前用旧数据重建
+    session = object_session(target)
+    if session is not None:
+        session.info[CATALOGUE_CHANGED_FLAG] = True
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    if session.info.pop(CATALOGUE_CHANGED_FLAG, False):
+        invalidate_plant_index()
+
+@event.listens_for(Session, "after_rollback")
+def _discard_catalogue_change(session):
+    session.info.pop(CATALOGUE_CHANGED_FLAG, None)
+
+def _level_scores(plant_bits: "np.ndarray", site_bits: int) -> "np.ndarray":
+    """等级匹配得分：同级1、相邻等级0.5、未知0.5、其余0"""
+    import numpy as np
+
+    adjacent = ((site_bits << 1) | (site_bits >> 1)) & ~site_bits & 0xFF
+    return np.where(
+        (plant_bits & site_bits) != 0, 1.0,
+        np.where(((plant_bits & adjacent) != 0) | (plant_bits == 0), 0.5, 0.0)
+    )
+
+_POPCOUNT = None
+
+def _popcount(bits: "np.ndarray") -> "np.ndarray":
+    import numpy as np
+
+    global _POPCOUNT
+    if _POPCOUNT is None:
+        _POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.float32)
+    return _POPCOUNT[bits]
+
+def recommend_plants(index: PlantIndex,
+                     sun_hours: Optional[float] = None,
+                     sunlight: Optional[str] = None,
+                     water: Optional[str] = None,
+                     soil: Optional[str] = None,
+                     hardiness_zone: Optional[str] = None,
+                     category: Optional[str] = None,
+                     max_height: Optional[float] = None,
+                     limit: int = 20) -> List[Dict[str, Any]]:
+    """按场地条件为植物打分并返回得分最高的植物
+
+    各项条件得分按 RECOMMEND_WEIGHTS 加权平均（只计已给出的条件），植物对应要求未知时
+    计0.5分。不在场地耐寒区内的植物以及不符合类别、最大株高的植物不参与排序。
+    """
+    import numpy as np
+
+    site = {}
+    if sun_hours is not None:
+        site["sunlight"] = sun_hours_to_level(sun_hours)
+    elif sunlight:
+        site["sunlight"] = encode_sunlight(sunlight)
+    if water:
+        site["water"] = encode_water(water)
+    if soil:
+        site["soil"] = encode_soil(soil)
+    if hardiness_zone:
+        low, high = parse_hardiness_zone(hardiness_zone)
+        if not np.isnan(low):
+            site["hardiness"] = (low, high)
+    unknown = [name for name in ("sunlight", "water", "soil") if name in site and not site[name]]
+    if unknown:
+        raise ValueError(f"Unrecognized site conditions: {', '.join(unknown)}")
+    if not site:
+        raise ValueError("At least one site condition is required")
+
+    scores = {}
+    if "sunlight" in site:
+        scores["sunlight"] = _level_scores(index.sunlight, site["sunlight"])
+    if "water" in site:
+        scores["water"] = _level_scores(index.water, site["water"])
+    if "soil" in site:
+        # 满足的场地土壤性质所占比例
+        scores["soil"] = np.where(
+            index.soil == 0, 0.5, _popcount(index.soil & site["soil"]) / _popcount(np.uint8(site["soil"]))
+        )
+
+    eligible = np.ones(len(index), dtype=bool)
+    if "hardiness" in site:
+        # 场地分区（取较冷的一端）在植物耐寒范围内
+        zone = site["hardiness"][0]
+        known = ~np.isnan(index.zone_min)
+        inside = (index.zone_min <= zone) & (zone <= index.zone_max)
+        scores["hardiness"] = np.where(known, 1.0, 0.5)
+        eligible &= inside | ~known
+    if category:
+        eligible &= index.category_codes == index.category_lookup.get(category.lower(), -1)
+    if max_height is not None:
+        eligible &= ~(index.heights > max_height)
+
+    weights = {name: settings.RECOMMEND_WEIGHTS.get(name, 1.0) for name in scores}
+    total = sum(weights.values()) or 1.0
+    score = sum(weights[name] * values for name, values in scores.items()) / total
+    score = np.where(eligible, score, -1.0)
+
+    count = min(limit, int(eligible.sum()))
+    if count == 0:
+        return []
+    top = np.argpartition(-score, count - 1)[:count]
+    # 同分时按ID排序，结果稳定
+    top = top[np.lexsort((index.ids[top], -score[top]))]
+    return [
+        {
+            "id": int(index.ids[i]),
+            "name": index.names[i],
+            "scientific_name": index.scientific_names[i],
+            "category": index.categories[i],
+            "height": None if np.isnan(index.heights[i]) else float(index.heights[i]),
+            "spread": None if np.isnan(index.spreads[i]) else float(index.spreads[i]),
+            "score": round(float(score[i]), 4),
+            "scores": {name: float(values[i]) for name, values in scores.items()},
+        }
+        for i in top
+    ]
@@ -0,0 +1,42 @@
+# landscape_lab/utils/responses.py
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# NumPy数组按原生类型直接序列化；dict键允许为整数等非字符串类型
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def _default(value: Any) -> Any:
+    """orjson无法直接处理的类型"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, BaseModel):
+        return value.dict()
+    # 走到这里的NumPy对象说明numpy已导入，此处导入不会增加启动时间
+    import numpy as np
+
+    if isinstance(value, np.ndarray):
+        # 非连续数组或orjson不支持的dtype
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def dumps(content: Any) -> bytes:
+    """序列化为JSON字节串"""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+class FastJSONResponse(JSONResponse):
+    """使用orjson序列化的JSON响应
+
+    端点直接返回该响应（而非dict）时跳过FastAPI的jsonable_encoder，
+    NumPy数组不会先逐元素转换为Python对象。
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
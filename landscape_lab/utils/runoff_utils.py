@@ -0,0 +1,407 @@
+# landscape_lab/utils/runoff_utils.py
+"""雨水径流模拟
+
+1. 将场地模型栅格化为高程（DEM），每个单元取最高的表面及其材料透水率
+2. D8流向：流向坡度最大的相邻单元；平地按单元序号打破平局，保证无环
+3. 按流向汇入的洼地划分集水区，在集水区图上做优先级淹没，
+   得到每个集水区的溢出口（溢出高程）与下游集水区
+4. 填满-溢出：按上游到下游的顺序计算各集水区的蓄水量与溢出量，
+   再按拓扑顺序逐层计算汇流量
+5. 结果保存为 .npy 图层，按瓦片读取（见 raster_utils）
+
+除集水区级的循环外均为向量化运算，单元数与集水区数相比可以相差几个数量级。
+"""
+import heapq
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+from .metrics import timed
+from .raster_utils import load_raster_manifest, save_raster_result
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# 未匹配到材料的表面的透水率（裸土）
+DEFAULT_PERMEABILITY = 0.3
+# 栅格单元数上限
+MAX_RUNOFF_CELLS = 25_000_000
+# 栅格化时每批处理的候选单元数
+RASTER_CHUNK_CELLS = 4_000_000
+# D8方向：(行偏移, 列偏移)，行号沿Y轴增大
+D8_OFFSETS = ((0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0), (-1, 1))
+# 保存的图层
+RUNOFF_LAYERS = ("elevation", "permeability", "flow_direction", "accumulation", "ponding")
+RUNOFF_MANIFEST_NAME = "runoff.json"
+
+def load_scene_surfaces(model_path: str) -> List[Tuple[List[str], Any]]:
+    """加载模型中的各个几何体（已应用场景变换），返回 [(节点/几何体/材质名称, 网格)]"""
+    import trimesh
+
+    scene = trimesh.load(model_path, force="scene")
+    surfaces = []
+    for node in scene.graph.nodes_geometry:
+        transform, geometry_name = scene.graph[node]
+        geometry = scene.geometry[geometry_name]
+        if not isinstance(geometry, trimesh.Trimesh) or len(geometry.faces) == 0:
+            continue
+        mesh = geometry.copy()
+        mesh.apply_transform(transform)
+        names = [str(node), str(geometry_name)]
+        material = getattr(getattr(geometry, "visual", None), "material", None)
+        if getattr(material, "name", None):
+            names.append(str(material.name))
+        surfaces.append((names, mesh))
+    return surfaces
+
+def match_permeability(names: List[str], permeabilities: Dict[str, float]) -> float:
+    """按名称匹配材料透水率（材料名包含在节点、几何体或材质名称中，不区分大小写）"""
+    lowered = [name.lower() for name in names]
+    for material_name, permeability in permeabilities.items():
+        if any(material_name.lower() in name for name in lowered):
+            return permeability
+    return DEFAULT_PERMEABILITY
+
+def rasterize_surfaces(surfaces: List[Tuple[Any, float]],
+                       resolution: float) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """栅格化表面，返回 (高程, 透水率, 原点)；没有表面的单元高程为NaN
+
+    每个三角形展开为其外包框内的候选单元，单元中心落在三角形内时按重心坐标插值高程。
+    """
+    import numpy as np
+
+    triangles = np.concatenate([mesh.triangles for mesh, _ in surfaces])
+    values = np.concatenate([
+        np.full(len(mesh.faces), permeability) for mesh, permeability in surfaces
+    ])
+    origin = triangles[:, :, :2].reshape(-1, 2).min(axis=0)
+    extent = triangles[:, :, :2].reshape(-1, 2).max(axis=0) - origin
+    shape = (int(np.ceil(extent[1] / resolution)) + 1, int(np.ceil(extent[0] / resolution)) + 1)
+    if shape[0] * shape[1] > MAX_RUNOFF_CELLS:
+        raise ValueError(f"Raster too large: {shape[0]}x{shape[1]} cells")
+
+    elevation = np.full(shape[0] * shape[1], -np.inf)
+    permeability = np.full(shape[0] * shape[1], DEFAULT_PERMEABILITY)
+
+    # 网格坐标（单位为单元），第c列单元中心位于 c + 0.5
+    grid = (triangles[:, :, :2] - origin) / resolution
+    a, b, c = grid[:, 0], grid[:, 1], grid[:, 2]
+    v0, v1 = b - a, c - a
+    denominator = v0[:, 0] * v1[:, 1] - v1[:, 0] * v0[:, 1]
+    # 竖直面的投影面积为0，不影响高程
+    keep = np.abs(denominator) > 1e-12
+    a, v0, v1, denominator = a[keep], v0[keep], v1[keep], denominator[keep]
+    triangles, values, grid = triangles[keep], values[keep], grid[keep]
+
+    # 重心坐标与高程都是网格坐标的线性函数：u = au*x + bu*y + cu，依此类推
+    au, bu = v1[:, 1] / denominator, -v1[:, 0] / denominator
+    cu = -(au * a[:, 0] + bu * a[:, 1])
+    av, bv = -v0[:, 1] / denominator, v0[:, 0] / denominator
+    cv = -(av * a[:, 0] + bv * a[:, 1])
+    z0 = triangles[:, 0, 2]
+    dz1, dz2 = triangles[:, 1, 2] - z0, triangles[:, 2, 2] - z0
+
+    col_min = np.clip(np.ceil(grid[:, :, 0].min(axis=1) - 0.5), 0, shape[1] - 1).astype(np.int64)
+    col_max = np.clip(np.floor(grid[:, :, 0].max(axis=1) - 0.5), 0, shape[1] - 1).astype(np.int64)
+    row_min = np.clip(np.ceil(grid[:, :, 1].min(axis=1) - 0.5), 0, shape[0] - 1).astype(np.int64)
+    row_max = np.clip(np.floor(grid[:, :, 1].max(axis=1) - 0.5), 0, shape[0] - 1).astype(np.int64)
+    widths = np.maximum(col_max - col_min + 1, 0)
+    counts = widths * np.maximum(row_max - row_min + 1, 0)
+    cumulative = np.cumsum(counts)
+
+    start = 0
+    while start < len(triangles):
+        # 按候选单元数分批，避免大三角形一次展开占用过多内存
+        limit = (cumulative[start - 1] if start else 0) + RASTER_CHUNK_CELLS
+        end = min(len(triangles), max(start + 1, int(np.searchsorted(cumulative, limit, side="right"))))
+        chunk = slice(start, end)
+        start = end
+        chunk_counts = counts[chunk]
+        total = int(chunk_counts.sum())
+        if total == 0:
+            continue
+
+        def expand(per_triangle):
+            return np.repeat(per_triangle[chunk], chunk_counts)
+
+        local = np.arange(total) - np.repeat(np.cumsum(chunk_counts) - chunk_counts, chunk_counts)
+        chunk_widths = expand(widths)
+        rows = expand(row_min) + local // chunk_widths
+        cols = expand(col_min) + local % chunk_widths
+        x, y = cols + 0.5, rows + 0.5
+        u = expand(au) * x + expand(bu) * y + expand(cu)
+        v = expand(av) * x + expand(bv) * y + expand(cv)
+        inside = (u >= -1e-9) & (v >= -1e-9) & (u + v <= 1 + 1e-9)
+
+        cells = (rows * shape[1] + cols)[inside]
+        u, v = u[inside], v[inside]
+        z = expand(z0)[inside] + u * expand(dz1)[inside] + v * expand(dz2)[inside]
+
+        # 每个单元取最高的表面，透水率随最高表面更新
+        np.maximum.at(elevation, cells, z)
+        top = z >= elevation[cells]
+        permeability[cells[top]] = expand(values)[inside][top]
+
+    elevation[np.isinf(elevation)] = np.nan
+    return elevation.reshape(shape), permeability.reshape(shape), origin
+
+def compute_flow_directions(elevation: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+    """D8流向，返回 (方向编号 0-7，洼地与无数据为-1；下游单元的扁平索引，洼地指向自身)"""
+    import numpy as np
+
+    rows, cols = elevation.shape
+    padded = np.pad(elevation, 1, constant_values=np.nan)
+    index = np.arange(rows * cols).reshape(rows, cols)
+    padded_index = np.pad(index, 1, constant_values=-1)
+
+    best_drop = np.zeros((rows, cols))
+    direction = np.full((rows, cols), -1, dtype=np.int8)
+    flat_direction = np.full((rows, cols), -1, dtype=np.int8)
+    for k, (dr, dc) in enumerate(D8_OFFSETS):
+        neighbor = padded[1 + dr:1 + dr + rows, 1 + dc:1 + dc + cols]
+        neighbor_index = padded_index[1 + dr:1 + dr + rows, 1 + dc:1 + dc + cols]
+        with np.errstate(invalid="ignore"):
+            drop = (elevation - neighbor) / np.hypot(dr, dc)
+            steeper = drop > best_drop
+            # 平地流向序号更小的相邻单元
+            flat = (drop == 0) & (neighbor_index < index) & (flat_direction < 0)
+        best_drop[steeper] = drop[steeper]
+        direction[steeper] = k
+        flat_direction[flat] = k
+    use_flat = (direction < 0) & (flat_direction >= 0)
+    direction[use_flat] = flat_direction[use_flat]
+    direction[np.isnan(elevation)] = -1
+
+    offsets = np.array([dr * cols + dc for dr, dc in D8_OFFSETS])
+    codes = direction.ravel()
+    receiver = np.arange(rows * cols)
+    flowing = codes >= 0
+    receiver[flowing] += offsets[codes[flowing]]
+    return direction, receiver
+
+def label_basins(receiver: "np.ndarray") -> "np.ndarray":
+    """沿流向找到每个单元最终汇入的洼地（指针跳跃，迭代次数为最长流径的对数）"""
+    import numpy as np
+
+    labels = receiver.copy()
+    while True:
+        jumped = labels[labels]
+        if np.array_equal(jumped, labels):
+            return labels
+        labels = jumped
+
+def accumulate_flow(receiver: "np.ndarray", sources: "np.ndarray") -> "np.ndarray":
+    """按拓扑顺序逐层累加汇流量，每层只处理当前入度为0的单元"""
+    import numpy as np
+
+    accumulation = sources.astype(np.float64).copy()
+    flowing = receiver != np.arange(len(receiver))
+    indegree = np.bincount(receiver[flowing], minlength=len(receiver))
+    frontier = np.flatnonzero(flowing & (indegree == 0))
+    stamp = np.empty(len(receiver), dtype=np.int64)
+    while len(frontier):
+        targets = receiver[frontier]
+        np.add.at(accumulation, targets, accumulation[frontier])
+        np.subtract.at(indegree, targets, 1)
+        ready = targets[(indegree[targets] == 0) & flowing[targets]]
+        # 去重：同一单元在本层出现多次时只保留一次
+        stamp[ready] = np.arange(len(ready))
+        frontier = ready[stamp[ready] == np.arange(len(ready))]
+    return accumulation
+
+def _basin_spill_edges(elevation: "np.ndarray", labels: "np.ndarray", valid: "np.ndarray"):
+    """相邻集水区之间的最低溢出点：返回 (集水区a, 集水区b, 溢出高程, b侧单元)，含双向
+
+    场地边界（网格边缘或与无数据单元相邻）视为外部集水区 -1，溢出高程为边界单元高程。
+    """
+    import numpy as np
+
+    rows, cols = elevation.shape
+    labels = labels.reshape(rows, cols)
+    valid = valid.reshape(rows, cols)
+    index = np.arange(rows * cols).reshape(rows, cols)
+
+    padded_valid = np.pad(valid, 1, constant_values=False)
+    interior = valid.copy()
+    for dr, dc in D8_OFFSETS:
+        interior &= padded_valid[1 + dr:1 + dr + rows, 1 + dc:1 + dc + cols]
+    boundary = valid & ~interior
+    sources = [labels[boundary]]
+    targets = [np.full(int(boundary.sum()), -1)]
+    spills = [elevation[boundary]]
+    entry_cells = [np.full(int(boundary.sum()), -1)]
+
+    # 每对相邻单元只需检查一次（一半方向），两个方向的边同时加入
+    for dr, dc in D8_OFFSETS[:4]:
+        r0, r1 = max(0, -dr), rows - max(0, dr)
+        c0, c1 = max(0, -dc), cols - max(0, dc)
+        here = (slice(r0, r1), slice(c0, c1))
+        there = (slice(r0 + dr, r1 + dr), slice(c0 + dc, c1 + dc))
+        pair = valid[here] & valid[there] & (labels[here] != labels[there])
+        a, b = index[here][pair], index[there][pair]
+        spill = np.maximum(elevation[here][pair], elevation[there][pair])
+        label_a, label_b = labels[here][pair], labels[there][pair]
+        sources += [label_a, label_b]
+        targets += [label_b, label_a]
+        spills += [spill, spill]
+        entry_cells += [b, a]
+
+    sources = np.concatenate(sources)
+    targets = np.concatenate(targets)
+    spills = np.concatenate(spills)
+    entry_cells = np.concatenate(entry_cells)
+    # 每对集水区只保留最低的溢出点
+    order = np.lexsort((spills, targets, sources))
+    sources, targets = sources[order], targets[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = (sources[1:] != sources[:-1]) | (targets[1:] != targets[:-1])
+    return sources[first], targets[first], spills[order][first], entry_cells[order][first]
+
+def route_basins(edges) -> Tuple[List[int], Dict[int, Tuple[int, float, int]]]:
+    """在集水区图上从外部开始做优先级淹没（最小化路径上的最高溢出高程）
+
+    返回 (从下游到上游的集水区顺序, {集水区: (下游集水区, 溢出高程, 进入下游的单元)})
+    """
+    import numpy as np
+
+    sources, targets, spills, entry_cells = edges
+    # 按目标集水区建立邻接表：从已淹没的集水区向其上游扩展
+    order = np.argsort(targets, kind="stable")
+    sorted_targets = targets[order]
+
+    outlet = {}
+    visited = {-1}
+    routing_order = []
+    heap = []
+
+    def push_neighbors(basin: int):
+        lo = np.searchsorted(sorted_targets, basin, side="left")
+        hi = np.searchsorted(sorted_targets, basin, side="right")
+        for edge in order[lo:hi]:
+            upstream = int(sources[edge])
+            if upstream not in visited:
+                heapq.heappush(heap, (float(spills[edge]), upstream, basin, int(entry_cells[edge])))
+
+    push_neighbors(-1)
+    while heap:
+        spill, basin, downstream, entry = heapq.heappop(heap)
+        if basin in visited:
+            continue
+        visited.add(basin)
+        outlet[basin] = (downstream, spill, entry)
+        routing_order.append(basin)
+        push_neighbors(basin)
+    return routing_order, outlet
+
+def _pond_levels(elevation: "np.ndarray", cell_basin: "np.ndarray", sills: "np.ndarray",
+                 stored: "np.ndarray", cell_area: float) -> "np.ndarray":
+    """求各集水区蓄水后的水位：溢出高程以下的单元按高程排序，找到蓄水量对应的水位"""
+    import numpy as np
+
+    levels = np.full(len(sills), -np.inf)
+    cells = np.flatnonzero(elevation < sills[cell_basin])
+    order = np.lexsort((elevation[cells], cell_basin[cells]))
+    cells = cells[order]
+    bounds = np.searchsorted(cell_basin[cells], np.arange(len(sills) + 1))
+
+    for i in np.flatnonzero(stored > 0):
+        z = elevation[cells[bounds[i]:bounds[i + 1]]]
+        if not len(z):
+            continue
+        # 水位位于第m与第m+1个单元高程之间时，蓄水量为 (m * 水位 - 前m个高程之和) * 单元面积
+        volume_at = (np.arange(1, len(z) + 1) * z - np.cumsum(z)) * cell_area
+        m = int(np.searchsorted(volume_at, stored[i], side="right"))
+        levels[i] = min(sills[i], (stored[i] / cell_area + z[:m].sum()) / m)
+    return levels
+
+@timed("simulate_runoff")
+def simulate_runoff(surfaces: List[Tuple[Any, float]],
+                    rainfall_mm: float,
+                    resolution: float = 0.5) -> Dict[str, Any]:
+    """对已赋透水率的表面模拟一次降雨的径流，返回各图层数组与汇总"""
+    try:
+        import numpy as np
+
+        elevation, permeability, origin = rasterize_surfaces(surfaces, resolution)
+        shape = elevation.shape
+        flat_elevation = elevation.ravel()
+        valid = ~np.isnan(flat_elevation)
+        cell_area = resolution ** 2
+
+        direction, receiver = compute_flow_directions(elevation)
+        labels = label_basins(receiver)
+        labels[~valid] = -1
+
+        # 产流量（立方米）= 降雨深度 × (1 - 透水率) × 单元面积
+        rainfall = np.where(valid, rainfall_mm / 1000 * cell_area, 0.0)
+        runoff = rainfall * (1 - permeability.ravel())
+
+        basins = np.unique(labels[valid])
+        edges = _basin_spill_edges(elevation, labels, valid)
+        routing_order, outlet = route_basins(edges)
+
+        # 各集水区的蓄水容量：溢出高程以下的容积
+        position = np.full(len(flat_elevation), -1)
+        position[basins] = np.arange(len(basins))
+        cell_basin = position[labels[valid]]
+        sills = np.array([outlet[int(basin)][1] if int(basin) in outlet else np.inf for basin in basins])
+        depth_below_sill = np.maximum(0.0, sills[cell_basin] - flat_elevation[valid])
+        capacity = np.bincount(cell_basin, depth_below_sill, minlength=len(basins)) * cell_area
+        inflow = np.bincount(cell_basin, runoff[valid], minlength=len(basins))
+
+        # 填满-溢出：从上游到下游传递溢出量
+        stored = np.zeros(len(basins))
+        injected = np.zeros(len(flat_elevation))
+        outflow = 0.0
+        for basin in reversed(routing_order):
+            i = position[basin]
+            stored[i] = min(inflow[i], capacity[i])
+            spill = inflow[i] - stored[i]
+            downstream, _, entry = outlet[basin]
+            if downstream < 0:
+                outflow += spill
+            else:
+                inflow[position[downstream]] += spill
+                injected[entry] += spill
+
+        accumulation = accumulate_flow(receiver, runoff + injected)
+        levels = _pond_levels(flat_elevation[valid], cell_basin, sills, stored, cell_area)
+        ponding = np.zeros(len(flat_elevation))
+        ponding[valid] = np.maximum(0.0, levels[cell_basin] - flat_elevation[valid])
+
+        accumulation[~valid] = np.nan
+        ponding[~valid] = np.nan
+        permeability = permeability.ravel().copy()
+        permeability[~valid] = np.nan
+        return {
+            "layers": {
+                "elevation": elevation.astype(np.float32),
+                "permeability": permeability.reshape(shape).astype(np.float32),
+                "flow_direction": direction,
+                "accumulation": accumulation.reshape(shape).astype(np.float32),
+                "ponding": ponding.reshape(shape).astype(np.float32),
+            },
+            "origin": origin.tolist(),
+            "resolution": resolution,
+            "shape": list(shape),
+            "summary": {
+                "rainfall_mm": rainfall_mm,
+                "rainfall_volume": float(rainfall.sum()),
+                "infiltration_volume": float((rainfall - runoff).sum()),
+                "runoff_volume": float(runoff.sum()),
+                "ponding_volume": float(stored.sum()),
+                "outflow_volume": float(outflow),
+                "ponded_area": float((ponding > 0.001).sum() * cell_area),
+                "max_ponding_depth": float(np.nanmax(ponding)) if valid.any() else 0.0,
+                "basin_count": int(len(basins)),
+            },
+        }
+    except Exception as e:
+        print(f"Error simulating runoff: {e}")
+        return {}
+
+def save_runoff_result(result: Dict[str, Any], output_dir: str, tile_size: int) -> Dict[str, Any]:
+    """保存各图层（.npy）及索引，返回索引"""
+    return save_raster_result(result, output_dir, tile_size, RUNOFF_MANIFEST_NAME)
+
+def load_runoff_manifest(output_dir: str) -> Dict[str, Any]:
+    """读取径流结果索引"""
+    return load_raster_manifest(output_dir, RUNOFF_MANIFEST_NAME)
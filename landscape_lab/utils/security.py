@@ -1,10 +1,59 @@
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional, Tuple
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from config import settings
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import get_db
+from ..models.revoked_token import RevokedToken
+from ..models.user import User
+from .cache import LRUCache
+from .state import get_state_backend
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+REFRESH_TOKEN_EXPIRE_DAYS = settings.REFRESH_TOKEN_EXPIRE_DAYS
+REFRESH_TOKEN_TYPE = "refresh"
+
+# 成本因子与配置不一致的旧哈希会被标记为需要更新
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/token")
+
+# 已验证令牌的声明缓存（条目随令牌过期失效）
+_token_cache = LRUCache(maxsize=settings.TOKEN_CACHE_SIZE)
+# 当前用户短时缓存（按用户名），条目附带缓存时的用户版本号
+_user_cache = LRUCache(maxsize=settings.USER_CACHE_SIZE)
+# 共享状态中的用户版本号，任一工作进程修改用户后递增，使所有进程的缓存失效
+USER_VERSION_PREFIX = "user-version:"
+# 未过期的已吊销令牌ID（jti或令牌族）及其过期时间，数据库为权威来源
+# 不在集合中的ID不查询数据库；任一工作进程吊销令牌后递增共享版本号，其他进程据此增量加载
+REVOKED_TOKENS_VERSION_KEY = "revoked-tokens-version"
+# 增量加载时回看的时长，覆盖写入时间早于提交时间的记录
+REVOKED_TOKENS_SYNC_OVERLAP = timedelta(seconds=60)
+_revoked_ids: Dict[str, datetime] = {}
+_revoked_version: Optional[float] = None
+_revoked_synced_at: Optional[datetime] = None
+_revoked_lock = threading.Lock()
+
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -12,6 +61,41 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+# 专用的密码哈希线程池，bcrypt计算时释放GIL，不占用请求线程池
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+# 准入控制：执行中与排队中的哈希任务总数上限
+_hash_slots = threading.BoundedSemaphore(
+    settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_SIZE
+)
+
+async def _run_password_hashing(func, *args):
+    """在哈希线程池中执行，队列已满时返回429"""
+    if not _hash_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many concurrent login requests",
+            headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER)},
+        )
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, func, *args)
+    finally:
+        _hash_slots.release()
+
+async def get_password_hash_async(password: str) -> str:
+    """异步计算密码哈希"""
+    return await _run_password_hashing(pwd_context.hash, password)
+
+async def verify_and_update_password(plain_password: str,
+                                     hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """异步验证密码，哈希参数变化时同时返回新哈希"""
+    return await _run_password_hashing(
+        pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -21,3 +105,157 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
+
+def decode_access_token(token: str) -> dict:
+    """验证并解码访问令牌，重复出现的令牌直接使用缓存的声明"""
+    claims = _token_cache.get(token)
+    if claims is not None:
+        return claims
+
+    try:
+        claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        raise credentials_exception
+    # 刷新令牌不能用作访问令牌
+    if claims.get("type") == REFRESH_TOKEN_TYPE:
+        raise credentials_exception
+
+    # jose已校验exp，缓存到令牌过期为止
+    expires_at = claims.get("exp")
+    if expires_at is None:
+        expires_at = time.time() + ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    _token_cache.set(token, claims, expires_at)
+    return claims
+
+def create_refresh_token(username: str, family: Optional[str] = None) -> str:
+    """创建刷新令牌，轮换得到的新令牌沿用同一令牌族"""
+    expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    to_encode = {
+        "sub": username,
+        "type": REFRESH_TOKEN_TYPE,
+        "jti": uuid.uuid4().hex,
+        "fam": family or uuid.uuid4().hex,
+        "exp": expire
+    }
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+def create_token_pair(username: str, family: Optional[str] = None) -> dict:
+    """签发访问令牌与刷新令牌"""
+    access_token = create_access_token(
+        data={"sub": username},
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    return {
+        "access_token": access_token,
+        "refresh_token": create_refresh_token(username, family),
+        "token_type": "bearer"
+    }
+
+def _sync_revoked_ids(db: Session):
+    """共享版本号变化后从数据库加载新吊销的ID，并丢弃已过期的ID"""
+    global _revoked_version, _revoked_synced_at
+    version = get_state_backend().get(REVOKED_TOKENS_VERSION_KEY) or 0
+    with _revoked_lock:
+        if version == _revoked_version:
+            return
+        now = datetime.utcnow()
+        query = db.query(RevokedToken.jti, RevokedToken.expires_at).filter(RevokedToken.expires_at > now)
+        if _revoked_synced_at is not None:
+            query = query.filter(RevokedToken.revoked_at >= _revoked_synced_at - REVOKED_TOKENS_SYNC_OVERLAP)
+        _revoked_ids.update(query.all())
+        for token_id in [token_id for token_id, expires_at in _revoked_ids.items() if expires_at <= now]:
+            del _revoked_ids[token_id]
+        _revoked_version, _revoked_synced_at = version, now
+
+def is_token_revoked(db: Session, token_id: str) -> bool:
+    """检查令牌或令牌族是否已吊销，只有内存集合中存在的ID才查询数据库确认"""
+    _sync_revoked_ids(db)
+    expires_at = _revoked_ids.get(token_id)
+    if expires_at is None or expires_at <= datetime.utcnow():
+        return False
+    return db.query(RevokedToken.jti).filter(RevokedToken.jti == token_id).first() is not None
+
+def revoke_token(db: Session, token_id: str, expires_at: datetime):
+    """吊销令牌或令牌族，同一ID重复吊销时抛出IntegrityError"""
+    global _revoked_version
+    now = datetime.utcnow()
+    db.query(RevokedToken).filter(RevokedToken.expires_at < now).delete(synchronize_session=False)
+    db.add(RevokedToken(jti=token_id, expires_at=expires_at))
+    db.commit()
+    version = get_state_backend().incr(REVOKED_TOKENS_VERSION_KEY)
+    with _revoked_lock:
+        _revoked_ids[token_id] = expires_at
+        # 期间没有其他进程吊销令牌时无需重新加载
+        if _revoked_version is not None and version == _revoked_version + 1:
+            _revoked_version = version
+
+def rotate_refresh_token(db: Session, token: str) -> dict:
+    """验证刷新令牌并轮换，返回新的令牌对
+
+    已使用过的刷新令牌再次出现时视为泄露，整个令牌族一并吊销。
+    """
+    try:
+        claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        raise credentials_exception
+    if claims.get("type") != REFRESH_TOKEN_TYPE:
+        raise credentials_exception
+
+    username, jti, family = claims.get("sub"), claims.get("jti"), claims.get("fam")
+    if not (username and jti and family) or is_token_revoked(db, family):
+        raise credentials_exception
+
+    try:
+        # 主键唯一约束保证同一刷新令牌只能成功轮换一次
+        revoke_token(db, jti, datetime.utcfromtimestamp(claims["exp"]))
+    except IntegrityError:
+        db.rollback()
+        family_expires = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+        try:
+            revoke_token(db, family, family_expires)
+        except IntegrityError:
+            db.rollback()
+        raise credentials_exception
+
+    if db.query(User.id).filter(User.username == username).first() is None:
+        raise credentials_exception
+    return create_token_pair(username, family)
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+    """获取当前登录用户"""
+    return get_user_from_token(db, token)
+
+def get_user_from_token(db: Session, token: str) -> User:
+    """根据访问令牌获取用户（优先使用缓存）"""
+    claims = decode_access_token(token)
+    username = claims.get("sub")
+    if username is None:
+        raise credentials_exception
+
+    version = get_state_backend().get(USER_VERSION_PREFIX + username) or 0
+    cached = _user_cache.get(username)
+    if cached is not None and cached[1] == version:
+        return cached[0]
+
+    user = db.query(User).filter(User.username == username).first()
+    if user is None:
+        raise credentials_exception
+
+    # 与会话分离后缓存，只供读取已加载的字段
+    db.expunge(user)
+    _user_cache.set(username, (user, version), time.time() + settings.USER_CACHE_TTL_SECONDS)
+    return user
+
+def invalidate_user_cache(username: str):
+    """使指定用户在所有工作进程中的缓存失效"""
+    _user_cache.pop(username)
+    # 版本号只需比缓存条目存活得久
+    get_state_backend().incr(USER_VERSION_PREFIX + username, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    """用户信息更新或删除后清除缓存（含修改前的用户名）"""
+    history = inspect(target).attrs.username.history
+    for username in list(history.deleted or []) + [target.username]:
+        invalidate_user_cache(username)
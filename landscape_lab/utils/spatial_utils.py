@@ -0,0 +1,58 @@
+# landscape_lab/utils/spatial_utils.py
+from typing import TYPE_CHECKING, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# 均匀网格中相邻单元的一半（含自身），每对单元只检查一次
+HALF_NEIGHBORHOOD = ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+# 每批处理的点数，限制候选点对数组的内存
+PAIR_CHUNK_SIZE = 20_000
+
+def find_neighbor_pairs(points: "np.ndarray",
+                        max_distance: float) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """用均匀网格查找平面距离不超过 max_distance 的点对
+
+    返回 (i, j, 距离)，i < j。单元边长等于 max_distance，
+    每个点只需与相邻单元中的点比较。
+    """
+    import numpy as np
+
+    points = np.asarray(points, dtype=np.float64)[:, :2]
+    empty = np.empty(0, dtype=np.int64)
+    if len(points) < 2 or max_distance <= 0:
+        return empty, empty, np.empty(0)
+
+    cells = np.floor((points - points.min(axis=0)) / max_distance).astype(np.int64)
+    # 单元编号编码为一个整数，两侧各留一列使偏移后不越界
+    width = int(cells[:, 0].max()) + 3
+    keys = (cells[:, 1] + 1) * width + (cells[:, 0] + 1)
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+
+    result_i, result_j, result_d = [], [], []
+    for chunk_start in range(0, len(points), PAIR_CHUNK_SIZE):
+        chunk = np.arange(chunk_start, min(chunk_start + PAIR_CHUNK_SIZE, len(points)))
+        for dx, dy in HALF_NEIGHBORHOOD:
+            target = keys[chunk] + dy * width + dx
+            start = np.searchsorted(sorted_keys, target, side="left")
+            counts = np.searchsorted(sorted_keys, target, side="right") - start
+            total = int(counts.sum())
+            if total == 0:
+                continue
+            # 展开每个点在目标单元中的全部候选点
+            i = np.repeat(chunk, counts)
+            offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            j = order[np.repeat(start, counts) + offsets]
+
+            d = np.hypot(*(points[i] - points[j]).T)
+            mask = d <= max_distance
+            if dx == 0 and dy == 0:
+                mask &= i < j
+            result_i.append(np.minimum(i[mask], j[mask]))
+            result_j.append(np.maximum(i[mask], j[mask]))
+            result_d.append(d[mask])
+
+    if not result_i:
+        return empty, empty, np.empty(0)
+    return np.concatenate(result_i), np.concatenate(result_j), np.concatenate(result_d)
@@ -0,0 +1,344 @@
+# landscape_lab/utils/state.py
+"""跨工作进程共享的状态（缓存版本号、任务状态、指标快照等）
+
+单进程运行时使用内存后端；多个工作进程时使用SQLite后端，数据库文件
+默认放在 /dev/shm（内存文件系统）中，读写不经过磁盘。
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from ..config import settings
+
+# 每写入多少次清理一次过期条目
+PRUNE_EVERY = 1000
+
+class StateBackend:
+    """共享状态接口，值需可JSON序列化，ttl为秒"""
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        raise NotImplementedError
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """键不存在（或已过期）时写入，返回是否写入成功"""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def incr(self, key: str, amount: float = 1, ttl: Optional[float] = None) -> float:
+        """原子递增并返回新值"""
+        raise NotImplementedError
+
+    def items(self, prefix: str) -> Dict[str, Any]:
+        """获取指定前缀下所有未过期的条目"""
+        raise NotImplementedError
+
+    def take_token(self, key: str, rate: float, capacity: float, cost: float = 1) -> float:
+        """从令牌桶中原子地取出令牌，成功返回0，否则返回需等待的秒数"""
+        raise NotImplementedError
+
+def _expires_at(ttl: Optional[float]) -> Optional[float]:
+    return time.time() + ttl if ttl is not None else None
+
+def _refill_bucket(bucket: Optional[list], rate: float, capacity: float,
+                   cost: float) -> Tuple[list, float]:
+    """按经过的时间补充令牌并尝试取出，返回 ([剩余令牌, 时间], 需等待的秒数)"""
+    now = time.time()
+    tokens, updated_at = bucket if bucket else (capacity, now)
+    tokens = min(capacity, tokens + (now - updated_at) * rate)
+    if tokens >= cost:
+        return [tokens - cost, now], 0.0
+    return [tokens, now], (cost - tokens) / rate
+
+class MemoryStateBackend(StateBackend):
+    """进程内后端，仅适用于单个工作进程"""
+
+    def __init__(self):
+        self._entries: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _get_entry(self, key: str):
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.time():
+            del self._entries[key]
+            return None
+        return entry
+
+    def _prune(self):
+        # 过期条目只在再次读取同一键时删除；按IP等大量一次性键需定期整体清理
+        self._writes += 1
+        if self._writes % PRUNE_EVERY == 0:
+            now = time.time()
+            expired = [key for key, (_, expires_at) in self._entries.items()
+                       if expires_at is not None and expires_at <= now]
+            for key in expired:
+                del self._entries[key]
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._get_entry(key)
+            return entry[0] if entry else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        with self._lock:
+            self._entries[key] = (value, _expires_at(ttl))
+            self._prune()
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        with self._lock:
+            if self._get_entry(key) is not None:
+                return False
+            self._entries[key] = (value, _expires_at(ttl))
+            self._prune()
+            return True
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def incr(self, key: str, amount: float = 1, ttl: Optional[float] = None) -> float:
+        with self._lock:
+            entry = self._get_entry(key)
+            value = (entry[0] if entry else 0) + amount
+            expires_at = entry[1] if entry else _expires_at(ttl)
+            self._entries[key] = (value, expires_at)
+            self._prune()
+            return value
+
+    def items(self, prefix: str) -> Dict[str, Any]:
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            result = {}
+            for key in keys:
+                entry = self._get_entry(key)
+                if entry is not None:
+                    result[key] = entry[0]
+            return result
+
+    def take_token(self, key: str, rate: float, capacity: float, cost: float = 1) -> float:
+        with self._lock:
+            entry = self._get_entry(key)
+            bucket, wait = _refill_bucket(entry[0] if entry else None, rate, capacity, cost)
+            # 桶补满后条目可以丢弃，缺失即视为满桶
+            self._entries[key] = (bucket, _expires_at(capacity / rate))
+            self._prune()
+            return wait
+
+class SQLiteStateBackend(StateBackend):
+    """SQLite后端，同一主机上的所有工作进程共用一个数据库文件"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS state ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+                               isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=OFF")
+        return conn
+
+    def _connection(self) -> sqlite3.Connection:
+        # 每个线程一个连接；fork出的子进程不复用父进程的连接
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._local.conn = self._connect()
+            self._local.pid = os.getpid()
+        return conn
+
+    def _prune(self, conn: sqlite3.Connection):
+        self._writes += 1
+        if self._writes % PRUNE_EVERY == 0:
+            conn.execute("DELETE FROM state WHERE expires_at <= ?", (time.time(),))
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self._connection().execute(
+            "SELECT value FROM state WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO state (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), _expires_at(ttl))
+        )
+        self._prune(conn)
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM state WHERE key = ? AND expires_at <= ?", (key, time.time()))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO state (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), _expires_at(ttl))
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return cursor.rowcount == 1
+
+    def delete(self, key: str):
+        self._connection().execute("DELETE FROM state WHERE key = ?", (key,))
+
+    def incr(self, key: str, amount: float = 1, ttl: Optional[float] = None) -> float:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT value, expires_at FROM state WHERE key = ? "
+                "AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time())
+            ).fetchone()
+            value = (json.loads(row[0]) if row else 0) + amount
+            expires_at = row[1] if row else _expires_at(ttl)
+            conn.execute(
+                "INSERT OR REPLACE INTO state (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires_at)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return value
+
+    def items(self, prefix: str) -> Dict[str, Any]:
+        # 前缀匹配用范围查询，可以利用主键索引
+        rows = self._connection().execute(
+            "SELECT key, value FROM state WHERE key >= ? AND key < ? "
+            "AND (expires_at IS NULL OR expires_at > ?)",
+            (prefix, prefix + "\uffff", time.time())
+        ).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def take_token(self, key: str, rate: float, capacity: float, cost: float = 1) -> float:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT value FROM state WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time())
+            ).fetchone()
+            bucket, wait = _refill_bucket(json.loads(row[0]) if row else None, rate, capacity, cost)
+            conn.execute(
+                "INSERT OR REPLACE INTO state (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(bucket), _expires_at(capacity / rate))
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._prune(conn)
+        return wait
+
+def get_default_state_path() -> str:
+    """默认状态文件路径：优先使用 /dev/shm"""
+    root = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(root, "landscape_lab_state.db")
+
+def create_state_backend(name: Optional[str] = None) -> StateBackend:
+    """按配置创建共享状态后端"""
+    name = name or settings.STATE_BACKEND
+    if name == "sqlite":
+        return SQLiteStateBackend(settings.STATE_DB_PATH or get_default_state_path())
+    if name == "memory":
+        return MemoryStateBackend()
+    raise ValueError(f"Unknown state backend: {name}")
+
+_backend: Optional[StateBackend] = None
+_backend_lock = threading.Lock()
+
+def get_state_backend() -> StateBackend:
+    """获取当前进程的共享状态后端"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_state_backend()
+    return _backend
+
+# 后台任务状态；执行中的任务另有锁条目，防止多个进程重复执行
+# 锁由执行进程的续期线程定期延长，进程退出后很快过期，不会长时间阻止任务重新执行
+JOB_KEY_PREFIX = "job:"
+JOB_LOCK_PREFIX = "job-lock:"
+
+_job_heartbeats: Dict[str, Tuple[threading.Thread, threading.Event]] = {}
+_job_heartbeats_lock = threading.Lock()
+
+def _refresh_job_lock(job_id: str, stop: threading.Event):
+    """任务执行期间定期延长锁的有效期"""
+    backend = get_state_backend()
+    ttl = settings.JOB_LOCK_TTL_SECONDS
+    while not stop.wait(ttl / 3):
+        backend.set(JOB_LOCK_PREFIX + job_id, os.getpid(), ttl=ttl)
+
+def start_job(job_id: str) -> bool:
+    """登记任务开始，同一任务已在执行时返回False"""
+    backend = get_state_backend()
+    if not backend.add(JOB_LOCK_PREFIX + job_id, os.getpid(), ttl=settings.JOB_LOCK_TTL_SECONDS):
+        return False
+    backend.set(JOB_KEY_PREFIX + job_id, {"status": "running", "started_at": time.time()},
+                ttl=settings.JOB_STATUS_TTL_SECONDS)
+    stop = threading.Event()
+    thread = threading.Thread(target=_refresh_job_lock, args=(job_id, stop),
+                              name=f"job-lock:{job_id}", daemon=True)
+    with _job_heartbeats_lock:
+        _job_heartbeats[job_id] = (thread, stop)
+    thread.start()
+    return True
+
+def update_job(job_id: str, **details: Any):
+    """更新执行中任务的进度信息"""
+    backend = get_state_backend()
+    job_status = backend.get(JOB_KEY_PREFIX + job_id) or {"status": "running"}
+    backend.set(JOB_KEY_PREFIX + job_id, {**job_status, **details}, ttl=settings.JOB_STATUS_TTL_SECONDS)
+
+def finish_job(job_id: str, succeeded: bool, **details: Any):
+    """记录任务结果，停止续期并释放锁"""
+    backend = get_state_backend()
+    backend.set(
+        JOB_KEY_PREFIX + job_id,
+        {"status": "done" if succeeded else "failed", "finished_at": time.time(), **details},
+        ttl=settings.JOB_STATUS_TTL_SECONDS
+    )
+    with _job_heartbeats_lock:
+        heartbeat = _job_heartbeats.pop(job_id, None)
+    if heartbeat is not None:
+        thread, stop = heartbeat
+        stop.set()
+        # 等待进行中的续期写入完成，避免释放后锁又被写回
+        thread.join()
+    backend.delete(JOB_LOCK_PREFIX + job_id)
+
+def get_job_status(job_id: str) -> Optional[Dict[str, Any]]:
+    """获取任务状态，执行进程退出导致锁已过期的任务报告为失败"""
+    backend = get_state_backend()
+    job_status = backend.get(JOB_KEY_PREFIX + job_id)
+    if not job_status or job_status.get("status") != "running":
+        return job_status
+    if backend.get(JOB_LOCK_PREFIX + job_id) is not None:
+        return job_status
+    # finish_job 先写结果再释放锁，重新读取以免把刚完成的任务误判为失败
+    job_status = backend.get(JOB_KEY_PREFIX + job_id)
+    if job_status and job_status.get("status") == "running":
+        return {**job_status, "status": "failed", "error": "Job worker exited before finishing"}
+    return job_status
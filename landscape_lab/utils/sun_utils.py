@@ -0,0 +1,179 @@
+# landscape_lab/utils/sun_utils.py
+"""场地日照时数栅格分析
+
+1. 在平面网格每个单元中心竖直向下投射射线，取最高的表面作为采样点
+2. 在日期范围内按固定步长采样太阳位置，太阳在地平线以上时，从各采样点
+   向太阳方向投射射线，未被遮挡即计入日照
+3. 采样点分批交给进程池，网格只在每个进程启动时传递一次
+
+结果为日均日照时数（小时），保存为 .npy 图层，按瓦片读取（见 raster_utils）。
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import TYPE_CHECKING, Any, Dict, Tuple
+
+from .metrics import timed
+from .raster_utils import load_raster_manifest, save_raster_result
+
+if TYPE_CHECKING:
+    import numpy as np
+    import trimesh
+
+# 栅格单元数上限
+MAX_SUN_CELLS = 4_000_000
+# 采样点沿法向抬升的距离（米），避免射线与所在表面自身相交
+RAY_OFFSET = 0.01
+SUN_MANIFEST_NAME = "sun_hours.json"
+
+# 进程池中各进程持有的网格
+_worker_mesh = None
+
+def sun_directions(start_date: date, end_date: date, latitude: float, longitude: float,
+                   timestep_minutes: int, day_step: int) -> Tuple["np.ndarray", float, int]:
+    """日期范围内太阳在地平线以上时的方向向量（X向东、Y向北、Z向上）
+
+    每个采样日从UTC零点起采样24小时。返回 (方向, 每个时刻代表的小时数, 采样天数)。
+    """
+    import numpy as np
+    from suncalc import get_position
+
+    days = np.arange(np.datetime64(start_date), np.datetime64(end_date) + 1, day_step)
+    offsets = np.arange(0, 24 * 60, timestep_minutes).astype("timedelta64[m]")
+    times = (days[:, None] + offsets[None, :]).ravel().astype("datetime64[ns]")
+
+    position = get_position(times, longitude, latitude)
+    altitude, azimuth = np.asarray(position["altitude"]), np.asarray(position["azimuth"])
+    # suncalc 的方位角自正南起算、向西为正
+    directions = np.stack([
+        -np.sin(azimuth) * np.cos(altitude),
+        -np.cos(azimuth) * np.cos(altitude),
+        np.sin(altitude),
+    ], axis=1)
+    return directions[altitude > 0], timestep_minutes / 60, len(days)
+
+def sample_ground(mesh: "trimesh.Trimesh", resolution: float):
+    """竖直向下投射射线取每个单元中心处最高的表面
+
+    返回 (采样点, 表面法向, 命中单元, 栅格形状, 原点, 分辨率)，单元数超过上限时放大分辨率。
+    """
+    import numpy as np
+
+    bounds = mesh.bounds
+    extent = bounds[1, :2] - bounds[0, :2]
+    resolution = max(resolution, float(np.sqrt(max(extent.prod(), 0) / MAX_SUN_CELLS)))
+    shape = (max(1, int(np.ceil(extent[1] / resolution))), max(1, int(np.ceil(extent[0] / resolution))))
+    origin = bounds[0, :2]
+
+    rows, cols = np.divmod(np.arange(shape[0] * shape[1]), shape[1])
+    origins = np.column_stack([
+        origin[0] + (cols + 0.5) * resolution,
+        origin[1] + (rows + 0.5) * resolution,
+        np.full(len(rows), bounds[1, 2] + 1.0),
+    ])
+    down = np.tile([0.0, 0.0, -1.0], (len(origins), 1))
+    locations, index_ray, index_tri = mesh.ray.intersects_location(origins, down, multiple_hits=False)
+
+    normals = mesh.face_normals[index_tri]
+    # 朝下的面取反，采样点总是抬升到表面上方
+    normals = np.where(normals[:, 2:3] < 0, -normals, normals)
+    return locations + normals * RAY_OFFSET, normals, index_ray, shape, origin, resolution
+
+def _init_worker(vertices: "np.ndarray", faces: "np.ndarray"):
+    """进程池初始化：重建网格及其射线求交结构"""
+    import trimesh
+
+    global _worker_mesh
+    _worker_mesh = trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+
+def _sunlit_hours(args) -> "np.ndarray":
+    """一批采样点的累计日照小时数（在进程池中执行）"""
+    import numpy as np
+
+    points, normals, directions, hours_per_step = args
+    hours = np.zeros(len(points))
+    for direction in directions:
+        # 背向太阳的表面无需求交
+        facing = normals @ direction > 0
+        if not facing.any():
+            continue
+        rays = np.tile(direction, (int(facing.sum()), 1))
+        blocked = _worker_mesh.ray.intersects_any(points[facing], rays)
+        hours[np.flatnonzero(facing)[~blocked]] += hours_per_step
+    return hours
+
+@timed("compute_sun_hours")
+def compute_sun_hours(mesh: "trimesh.Trimesh",
+                      start_date: date,
+                      end_date: date,
+                      latitude: float,
+                      longitude: float,
+                      resolution: float = 2.0,
+                      timestep_minutes: int = 30,
+                      day_step: int = 7,
+                      workers: int = 0,
+                      batch_size: int = 20000) -> Dict[str, Any]:
+    """计算场地日均日照时数栅格，返回图层数组与汇总"""
+    try:
+        import numpy as np
+
+        directions, hours_per_step, day_count = sun_directions(
+            start_date, end_date, latitude, longitude, timestep_minutes, day_step
+        )
+        points, normals, cells, shape, origin, resolution = sample_ground(mesh, resolution)
+
+        batches = [
+            (points[i:i + batch_size], normals[i:i + batch_size], directions, hours_per_step)
+            for i in range(0, len(points), batch_size)
+        ]
+        workers = min(workers or os.cpu_count() or 1, len(batches))
+        if workers > 1:
+            # 在服务进程（多线程）中调用，使用spawn避免fork继承其他线程持有的锁
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_worker,
+                                     initargs=(mesh.vertices, mesh.faces)) as pool:
+                hours = list(pool.map(_sunlit_hours, batches))
+        else:
+            _init_worker(mesh.vertices, mesh.faces)
+            hours = [_sunlit_hours(batch) for batch in batches]
+
+        sun_hours = np.full(shape[0] * shape[1], np.nan)
+        if hours:
+            sun_hours[cells] = np.concatenate(hours) / day_count
+        lit = sun_hours[cells]
+        return {
+            "layers": {"sun_hours": sun_hours.reshape(shape).astype(np.float32)},
+            "origin": origin.tolist(),
+            "resolution": resolution,
+            "shape": list(shape),
+            "summary": {
+                "start_date": start_date.isoformat(),
+                "end_date": end_date.isoformat(),
+                "latitude": latitude,
+                "longitude": longitude,
+                "sampled_days": day_count,
+                "daylight_hours": len(directions) * hours_per_step / day_count,
+                "mean_sun_hours": float(lit.mean()) if len(lit) else 0.0,
+                "max_sun_hours": float(lit.max()) if len(lit) else 0.0,
+                "ray_count": int(len(points) * len(directions)),
+            },
+        }
+    except Exception as e:
+        print(f"Error computing sun hours: {e}")
+        return {}
+
+def get_sun_cache_key(**params: Any) -> str:
+    """按分析参数（项目版本、模型文件、日期范围等）生成缓存键"""
+    encoded = json.dumps(params, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+def save_sun_hours(result: Dict[str, Any], output_dir: str, tile_size: int) -> Dict[str, Any]:
+    """保存日照时数图层及索引，返回索引"""
+    return save_raster_result(result, output_dir, tile_size, SUN_MANIFEST_NAME)
+
+def load_sun_manifest(output_dir: str) -> Dict[str, Any]:
+    """读取日照时数结果索引"""
+    return load_raster_manifest(output_dir, SUN_MANIFEST_NAME)
@@ -0,0 +1,181 @@
+# landscape_lab/utils/version_utils.py
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..models.project_file import ProjectFile
+from ..models.project_materials import project_materials
+from ..models.project_plants import project_plants
+from ..models.project_version import ProjectVersion
+
+# 版本快照中记录的项目字段
+PROJECT_FIELDS = ("name", "description", "location", "area", "status", "owner_id",
+                  "latitude", "longitude", "footprint")
+
+# 增量格式：{分区: {键: {"o": 旧值, "n": 新值}}}
+# 新增的键只有"n"，删除的键只有"o"
+
+def _to_json_value(value: Any) -> Any:
+    """将字段值转换为可JSON序列化的值"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def capture_project_state(db: Session, project) -> Dict[str, Dict[str, Any]]:
+    """采集项目当前状态：项目字段、植物/材料数量及文件哈希"""
+    plant_rows = db.query(
+        project_plants.c.plant_id, func.sum(project_plants.c.quantity)
+    ).filter(
+        project_plants.c.project_id == project.id
+    ).group_by(project_plants.c.plant_id).all()
+    material_rows = db.query(
+        project_materials.c.material_id, func.sum(project_materials.c.quantity)
+    ).filter(
+        project_materials.c.project_id == project.id
+    ).group_by(project_materials.c.material_id).all()
+    file_rows = db.query(ProjectFile.file_name, ProjectFile.file_hash).filter(
+        ProjectFile.project_id == project.id
+    ).order_by(ProjectFile.id).all()
+
+    return {
+        "project": {field: _to_json_value(getattr(project, field)) for field in PROJECT_FIELDS},
+        "plants": {str(plant_id): quantity for plant_id, quantity in plant_rows},
+        "materials": {str(material_id): quantity for material_id, quantity in material_rows},
+        # 同名文件以最后上传的为准
+        "files": {name: file_hash for name, file_hash in file_rows}
+    }
+
+def compute_delta(old_state: Dict[str, Dict[str, Any]],
+                  new_state: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """计算两个状态之间的增量"""
+    delta = {}
+    for section in set(old_state) | set(new_state):
+        old = old_state.get(section, {})
+        new = new_state.get(section, {})
+        changes = {}
+        for key in set(old) | set(new):
+            if key in old and key in new and old[key] == new[key]:
+                continue
+            change = {}
+            if key in old:
+                change["o"] = old[key]
+            if key in new:
+                change["n"] = new[key]
+            changes[key] = change
+        if changes:
+            delta[section] = changes
+    return delta
+
+def apply_delta(state: Dict[str, Dict[str, Any]],
+                delta: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """在状态上应用增量，返回新状态"""
+    result = {section: dict(values) for section, values in state.items()}
+    for section, changes in delta.items():
+        values = result.setdefault(section, {})
+        for key, change in changes.items():
+            if "n" in change:
+                values[key] = change["n"]
+            else:
+                values.pop(key, None)
+    return result
+
+def compose_deltas(deltas: Iterable[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """按顺序合并多个增量，耗时只与增量大小成正比"""
+    net: Dict[str, Dict[str, Any]] = {}
+    for delta in deltas:
+        for section, changes in delta.items():
+            section_net = net.setdefault(section, {})
+            for key, change in changes.items():
+                previous = section_net.get(key)
+                if previous is None:
+                    section_net[key] = dict(change)
+                    continue
+                # 保留最早的旧值和最新的新值
+                merged = {}
+                if "o" in previous:
+                    merged["o"] = previous["o"]
+                if "n" in change:
+                    merged["n"] = change["n"]
+                section_net[key] = merged
+
+    result = {}
+    for section, changes in net.items():
+        kept = {
+            key: change for key, change in changes.items()
+            if ("o" in change) != ("n" in change)
+            or ("o" in change and change["o"] != change["n"])
+        }
+        if kept:
+            result[section] = kept
+    return result
+
+def invert_delta(delta: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """反转增量方向"""
+    inverted = {}
+    for section, changes in delta.items():
+        inverted[section] = {}
+        for key, change in changes.items():
+            reverse = {}
+            if "n" in change:
+                reverse["o"] = change["n"]
+            if "o" in change:
+                reverse["n"] = change["o"]
+            inverted[section][key] = reverse
+    return inverted
+
+def count_changes(delta: Dict[str, Dict[str, Any]]) -> int:
+    """统计增量中的变更条目数"""
+    return sum(len(changes) for changes in delta.values())
+
+def summarize_delta(delta: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """将增量整理为新增/删除/修改三类"""
+    summary = {}
+    for section, changes in delta.items():
+        added, removed, modified = {}, {}, {}
+        for key, change in changes.items():
+            if "o" not in change:
+                added[key] = change["n"]
+            elif "n" not in change:
+                removed[key] = change["o"]
+            else:
+                modified[key] = {"old": change["o"], "new": change["n"]}
+        summary[section] = {"added": added, "removed": removed, "modified": modified}
+    return summary
+
+def load_version_state(db: Session, version: ProjectVersion) -> Dict[str, Dict[str, Any]]:
+    """从最近的完整快照开始回放增量，还原指定版本的状态"""
+    checkpoint = db.query(ProjectVersion).filter(
+        ProjectVersion.project_id == version.project_id,
+        ProjectVersion.sequence <= version.sequence,
+        ProjectVersion.snapshot.isnot(None)
+    ).order_by(ProjectVersion.sequence.desc()).first()
+
+    state = json.loads(checkpoint.snapshot) if checkpoint else {}
+    start = checkpoint.sequence if checkpoint else 0
+    for (delta,) in db.query(ProjectVersion.delta).filter(
+        ProjectVersion.project_id == version.project_id,
+        ProjectVersion.sequence > start,
+        ProjectVersion.sequence <= version.sequence
+    ).order_by(ProjectVersion.sequence):
+        state = apply_delta(state, json.loads(delta))
+    return state
+
+def diff_versions(db: Session,
+                  base: ProjectVersion,
+                  target: ProjectVersion) -> Dict[str, Dict[str, Any]]:
+    """比较同一项目的两个版本，只读取两者之间的增量"""
+    low, high = sorted((base.sequence, target.sequence))
+    deltas: List[Dict[str, Dict[str, Any]]] = [
+        json.loads(delta) for (delta,) in db.query(ProjectVersion.delta).filter(
+            ProjectVersion.project_id == base.project_id,
+            ProjectVersion.sequence > low,
+            ProjectVersion.sequence <= high
+        ).order_by(ProjectVersion.sequence)
+    ]
+    delta = compose_deltas(deltas)
+    if base.sequence > target.sequence:
+        delta = invert_delta(delta)
+    return summarize_delta(delta)
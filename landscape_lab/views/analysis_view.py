@@ -0,0 +1,477 @@
+# landscape_lab/views/analysis_view.py
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from datetime import date
+from typing import Dict, Optional
+import math
+import re
+from ..config import settings
+from ..database import get_db
+from ..models.analysis_artifact import AnalysisArtifact
+from ..models.material import Material, MaterialUsage
+from ..models.plant import Plant, PlantLocation
+from ..models.project import Project
+from ..models.project_version import ProjectVersion
+from ..models.user import User
+from ..utils.analysis_graph import get_analysis_job_id, get_report_path, schedule_analysis_update
+from ..utils.file_utils import UPLOAD_ROOT
+from ..utils.growth_utils import simulate_growth
+from ..utils.mesh_utils import load_scene_mesh
+from ..utils.raster_utils import (
+    TILE_MEDIA_TYPES,
+    encode_tile_npy,
+    encode_tile_png,
+    read_raster_tile,
+    sample_raster
+)
+from ..utils.recommend_utils import get_plant_index, recommend_plants
+from ..utils.responses import FastJSONResponse
+from ..utils.runoff_utils import (
+    RUNOFF_LAYERS,
+    load_runoff_manifest,
+    load_scene_surfaces,
+    match_permeability,
+    save_runoff_result,
+    simulate_runoff
+)
+from ..utils.sun_utils import compute_sun_hours, get_sun_cache_key, load_sun_manifest, save_sun_hours
+from ..utils.security import get_current_user
+from ..utils.state import finish_job, get_job_status, start_job
+from .project_view import get_project_model_file
+
+# 日照时数缓存键（十六进制），同时防止路径穿越
+SUN_CACHE_KEY_PATTERN = re.compile(r"^[0-9a-f]{16}$")
+
+# 场地分析接口：结果含大量数组，直接返回 FastJSONResponse 跳过 jsonable_encoder
+router = APIRouter(
+    prefix="/api/projects",
+    tags=["analysis"],
+    responses={404: {"description": "Not found"}},
+    default_response_class=FastJSONResponse,
+)
+
+def get_project_or_404(project_id: int, db: Session) -> Project:
+    """获取项目，不存在时返回404"""
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return project
+
+def render_raster_tile(tile, layer: str, fmt: str, manifest: dict, cache_control: str) -> Response:
+    """将栅格瓦片编码为PNG或NPY响应"""
+    if fmt == "png":
+        value_range = manifest["layers"][layer]
+        content = encode_tile_png(tile, layer, (value_range["min"], value_range["max"]))
+    else:
+        content = encode_tile_npy(tile)
+    return Response(content, media_type=TILE_MEDIA_TYPES[fmt], headers={"Cache-Control": cache_control})
+
+@router.get("/{project_id}/growth")
+def simulate_project_growth(
+    project_id: int,
+    years: int = Query(20, ge=1, le=100),
+    resolution: float = Query(1.0, ge=0.1, le=10.0),
+    db: Session = Depends(get_db)
+):
+    """模拟项目植物的多年生长（每个配置条目视为一株，需有平面坐标）"""
+    project = get_project_or_404(project_id, db)
+    rows = db.query(
+        PlantLocation.id,
+        PlantLocation.position_x,
+        PlantLocation.position_y,
+        Plant.height,
+        Plant.spread,
+        Plant.growth_rate
+    ).join(Plant, Plant.id == PlantLocation.plant_id).filter(
+        PlantLocation.project_id == project_id,
+        PlantLocation.position_x.isnot(None),
+        PlantLocation.position_y.isnot(None)
+    ).order_by(PlantLocation.id).all()
+    if not rows:
+        raise HTTPException(status_code=400, detail="Project has no positioned plants")
+
+    ids, xs, ys, heights, spreads, growth_rates = zip(*rows)
+    result = simulate_growth(
+        list(zip(xs, ys)), heights, spreads, growth_rates,
+        years=years, resolution=resolution, site_area=project.area, ids=ids
+    )
+    if not result:
+        raise HTTPException(status_code=500, detail="Growth simulation failed")
+    return FastJSONResponse(result)
+
+def get_runoff_dir(project_id: int, file_id: int) -> str:
+    """获取模型文件的径流模拟结果目录"""
+    return str(UPLOAD_ROOT / str(project_id) / "runoff" / str(file_id))
+
+def get_runoff_job_id(project_id: int, file_id: int) -> str:
+    """径流模拟任务ID"""
+    return f"runoff:{project_id}:{file_id}"
+
+def get_project_permeabilities(project_id: int, db: Session) -> Dict[str, float]:
+    """项目所用材料中填写了透水率的部分，{材料名: 透水率}"""
+    rows = db.query(Material.name, Material.permeability).join(
+        MaterialUsage, MaterialUsage.material_id == Material.id
+    ).filter(
+        MaterialUsage.project_id == project_id,
+        Material.permeability.isnot(None)
+    ).distinct().all()
+    # 长名称优先匹配，避免 "透水砖" 被 "砖" 抢先匹配
+    return dict(sorted(rows, key=lambda row: len(row[0]), reverse=True))
+
+def run_runoff_job(job_id: str, model_path: str, output_dir: str, permeabilities: Dict[str, float],
+                   rainfall_mm: float, resolution: float):
+    """执行径流模拟并记录任务结果"""
+    manifest = {}
+    try:
+        surfaces = [
+            (mesh, match_permeability(names, permeabilities))
+            for names, mesh in load_scene_surfaces(model_path)
+        ]
+        result = simulate_runoff(surfaces, rainfall_mm, resolution)
+        if result:
+            manifest = save_runoff_result(result, output_dir, settings.RUNOFF_TILE_SIZE)
+    except Exception as e:
+        print(f"Error running runoff simulation: {e}")
+    finally:
+        finish_job(job_id, bool(manifest), summary=manifest.get("summary"))
+
+@router.post("/{project_id}/files/{file_id}/runoff/")
+def simulate_project_runoff(
+    project_id: int,
+    file_id: int,
+    background_tasks: BackgroundTasks,
+    rainfall_mm: float = Query(..., gt=0, le=1000),
+    resolution: float = Query(None, ge=0.1, le=10.0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """对项目模型模拟一次降雨的地表径流（后台执行）"""
+    project = get_project_or_404(project_id, db)
+    if project.owner_id != current_user.id and not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Permission denied")
+
+    db_file = get_project_model_file(project_id, file_id, db)
+    job_id = get_runoff_job_id(project_id, file_id)
+    if not start_job(job_id):
+        raise HTTPException(status_code=409, detail="Runoff simulation already running")
+
+    background_tasks.add_task(
+        run_runoff_job, job_id, db_file.file_path, get_runoff_dir(project_id, file_id),
+        get_project_permeabilities(project_id, db), rainfall_mm, resolution or settings.RUNOFF_RESOLUTION
+    )
+    return {"message": "Runoff simulation started", "job_id": job_id}
+
+@router.get("/{project_id}/files/{file_id}/runoff/status")
+def read_project_runoff_status(
+    project_id: int,
+    file_id: int,
+    db: Session = Depends(get_db)
+):
+    get_project_model_file(project_id, file_id, db)
+    job_status = get_job_status(get_runoff_job_id(project_id, file_id))
+    if not job_status:
+        raise HTTPException(status_code=404, detail="Runoff simulation not started")
+    return job_status
+
+@router.get("/{project_id}/files/{file_id}/runoff/")
+def read_project_runoff(
+    project_id: int,
+    file_id: int,
+    db: Session = Depends(get_db)
+):
+    """径流模拟结果索引：栅格范围、瓦片数、各图层取值范围与水量汇总"""
+    get_project_model_file(project_id, file_id, db)
+    manifest = load_runoff_manifest(get_runoff_dir(project_id, file_id))
+    if not manifest:
+        raise HTTPException(status_code=404, detail="Runoff not simulated")
+    return manifest
+
+@router.get("/{project_id}/files/{file_id}/runoff/{layer}/{tile_x}/{tile_y}.{fmt}")
+def read_project_runoff_tile(
+    project_id: int,
+    file_id: int,
+    layer: str,
+    tile_x: int,
+    tile_y: int,
+    fmt: str
+):
+    """径流图层瓦片：png 用于显示，npy 为原始数值"""
+    if layer not in RUNOFF_LAYERS or fmt not in TILE_MEDIA_TYPES:
+        raise HTTPException(status_code=404, detail="Tile not found")
+    output_dir = get_runoff_dir(project_id, file_id)
+    manifest = load_runoff_manifest(output_dir)
+    tile = read_raster_tile(output_dir, layer, tile_x, tile_y, manifest.get("tile_size", 0)) if manifest else None
+    if tile is None:
+        raise HTTPException(status_code=404, detail="Tile not found")
+    return render_raster_tile(tile, layer, fmt, manifest, "public, max-age=3600")
+
+def get_sun_dir(project_id: int, cache_key: str) -> str:
+    """获取日照时数结果目录，缓存键格式不正确时返回404"""
+    if not SUN_CACHE_KEY_PATTERN.match(cache_key):
+        raise HTTPException(status_code=404, detail="Sun hours not found")
+    return str(UPLOAD_ROOT / str(project_id) / "sun" / cache_key)
+
+def get_sun_job_id(project_id: int, cache_key: str) -> str:
+    """日照时数计算任务ID"""
+    return f"sun:{project_id}:{cache_key}"
+
+def run_sun_hours_job(job_id: str, model_path: str, output_dir: str, start_date: date, end_date: date,
+                      latitude: float, longitude: float):
+    """执行日照时数计算并记录任务结果"""
+    manifest = {}
+    try:
+        result = compute_sun_hours(
+            load_scene_mesh(model_path), start_date, end_date, latitude, longitude,
+            resolution=settings.SUN_RESOLUTION,
+            timestep_minutes=settings.SUN_TIMESTEP_MINUTES,
+            day_step=settings.SUN_DAY_STEP,
+            workers=settings.SUN_WORKERS,
+            batch_size=settings.SUN_BATCH_SIZE
+        )
+        if result:
+            manifest = save_sun_hours(result, output_dir, settings.SUN_TILE_SIZE)
+    except Exception as e:
+        print(f"Error running sun hours analysis: {e}")
+    finally:
+        finish_job(job_id, bool(manifest), summary=manifest.get("summary"))
+
+@router.post("/{project_id}/files/{file_id}/sun-hours/")
+def request_project_sun_hours(
+    project_id: int,
+    file_id: int,
+    background_tasks: BackgroundTasks,
+    response: Response,
+    start_date: date,
+    end_date: date,
+    latitude: Optional[float] = Query(None, ge=-90, le=90),
+    longitude: Optional[float] = Query(None, ge=-180, le=180),
+    version: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """场地日均日照时数栅格
+
+    结果按项目版本、模型文件、日期范围与分析参数缓存，参数相同时直接返回已有结果；
+    否则在后台计算并返回202，用返回的 cache_key 查询状态与瓦片。
+    未指定经纬度时使用项目坐标。
+    """
+    project = get_project_or_404(project_id, db)
+    if project.owner_id != current_user.id and not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Permission denied")
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be earlier than start_date")
+    if latitude is None or longitude is None:
+        latitude, longitude = project.latitude, project.longitude
+    if latitude is None or longitude is None:
+        raise HTTPException(status_code=400, detail="latitude and longitude are required when the project has no location")
+
+    db_file = get_project_model_file(project_id, file_id, db)
+    query = db.query(ProjectVersion.sequence).filter(ProjectVersion.project_id == project_id)
+    if version:
+        query = query.filter(ProjectVersion.version == version)
+    project_version = query.order_by(ProjectVersion.sequence.desc()).first()
+    if version and not project_version:
+        raise HTTPException(status_code=404, detail="Version not found")
+
+    cache_key = get_sun_cache_key(
+        project_id=project_id,
+        version=project_version.sequence if project_version else 0,
+        file_id=file_id,
+        file_hash=db_file.file_hash or db_file.file_path,
+        start_date=start_date,
+        end_date=end_date,
+        latitude=round(latitude, 4),
+        longitude=round(longitude, 4),
+        resolution=settings.SUN_RESOLUTION,
+        timestep_minutes=settings.SUN_TIMESTEP_MINUTES,
+        day_step=settings.SUN_DAY_STEP
+    )
+    output_dir = get_sun_dir(project_id, cache_key)
+    manifest = load_sun_manifest(output_dir)
+    if manifest:
+        return {"cache_key": cache_key, "status": "done", "manifest": manifest}
+
+    response.status_code = 202
+    job_id = get_sun_job_id(project_id, cache_key)
+    if start_job(job_id):
+        # 射线求交耗时较长，放到后台执行
+        background_tasks.add_task(
+            run_sun_hours_job, job_id, db_file.file_path, output_dir,
+            start_date, end_date, latitude, longitude
+        )
+    return {"cache_key": cache_key, "status": "running", "job_id": job_id}
+
+@router.get("/{project_id}/sun-hours/{cache_key}/status")
+def read_project_sun_hours_status(project_id: int, cache_key: str):
+    get_sun_dir(project_id, cache_key)
+    job_status = get_job_status(get_sun_job_id(project_id, cache_key))
+    if not job_status:
+        raise HTTPException(status_code=404, detail="Sun hours analysis not started")
+    return job_status
+
+@router.get("/{project_id}/sun-hours/{cache_key}/")
+def read_project_sun_hours(project_id: int, cache_key: str):
+    """日照时数结果索引：栅格范围、瓦片数、取值范围与汇总"""
+    manifest = load_sun_manifest(get_sun_dir(project_id, cache_key))
+    if not manifest:
+        raise HTTPException(status_code=404, detail="Sun hours not found")
+    return manifest
+
+@router.get("/{project_id}/sun-hours/{cache_key}/plants")
+def read_project_plant_sun_hours(
+    project_id: int,
+    cache_key: str,
+    db: Session = Depends(get_db)
+):
+    """各植物配置点的日均日照时数，附植物的日照需求以便对照"""
+    output_dir = get_sun_dir(project_id, cache_key)
+    manifest = load_sun_manifest(output_dir)
+    if not manifest:
+        raise HTTPException(status_code=404, detail="Sun hours not found")
+    rows = db.query(
+        PlantLocation.id,
+        PlantLocation.plant_id,
+        Plant.name,
+        Plant.sunlight,
+        PlantLocation.position_x,
+        PlantLocation.position_y
+    ).join(Plant, Plant.id == PlantLocation.plant_id).filter(
+        PlantLocation.project_id == project_id,
+        PlantLocation.position_x.isnot(None),
+        PlantLocation.position_y.isnot(None)
+    ).order_by(PlantLocation.id).all()
+    if not rows:
+        return FastJSONResponse([])
+
+    values = sample_raster(output_dir, "sun_hours", manifest, [(row[4], row[5]) for row in rows])
+    return FastJSONResponse([
+        {
+            "location_id": location_id,
+            "plant_id": plant_id,
+            "name": name,
+            "sunlight": sunlight,
+            "sun_hours": None if math.isnan(value) else round(float(value), 2),
+        }
+        for (location_id, plant_id, name, sunlight, _, _), value in zip(rows, values)
+    ])
+
+@router.get("/{project_id}/sun-hours/{cache_key}/recommendations")
+def read_project_sun_hours_recommendations(
+    project_id: int,
+    cache_key: str,
+    x: float,
+    y: float,
+    water: Optional[str] = Query(None, max_length=100),
+    soil: Optional[str] = Query(None, max_length=100),
+    hardiness_zone: Optional[str] = Query(None, max_length=20),
+    category: Optional[str] = None,
+    max_height: Optional[float] = Query(None, gt=0),
+    limit: int = Query(20, ge=1, le=200),
+    db: Session = Depends(get_db)
+):
+    """按场地某点（模型平面坐标）的日照时数及其他条件推荐植物"""
+    output_dir = get_sun_dir(project_id, cache_key)
+    manifest = load_sun_manifest(output_dir)
+    if not manifest:
+        raise HTTPException(status_code=404, detail="Sun hours not found")
+    sun_hours = float(sample_raster(output_dir, "sun_hours", manifest, [(x, y)])[0])
+    if math.isnan(sun_hours):
+        raise HTTPException(status_code=400, detail="Point is outside the analysed area")
+    try:
+        results = recommend_plants(
+            get_plant_index(db), sun_hours=sun_hours, water=water, soil=soil,
+            hardiness_zone=hardiness_zone, category=category, max_height=max_height, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"sun_hours": round(sun_hours, 2), "plants": results}
+
+@router.get("/{project_id}/sun-hours/{cache_key}/{tile_x}/{tile_y}.{fmt}")
+def read_project_sun_hours_tile(
+    project_id: int,
+    cache_key: str,
+    tile_x: int,
+    tile_y: int,
+    fmt: str
+):
+    """日照时数瓦片：缓存键对应的结果不会改变，浏览器可长期缓存"""
+    if fmt not in TILE_MEDIA_TYPES:
+        raise HTTPException(status_code=404, detail="Tile not found")
+    output_dir = get_sun_dir(project_id, cache_key)
+    manifest = load_sun_manifest(output_dir)
+    tile = read_raster_tile(output_dir, "sun_hours", tile_x, tile_y, manifest.get("tile_size", 0)) if manifest else None
+    if tile is None:
+        raise HTTPException(status_code=404, detail="Tile not found")
+    return render_raster_tile(tile, "sun_hours", fmt, manifest, "public, max-age=31536000, immutable")
+
+@router.post("/{project_id}/analysis/")
+def request_project_analysis_update(
+    project_id: int,
+    background_tasks: BackgroundTasks,
+    force: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """更新项目分析产物（后台执行），只重新计算输入发生变化的产物"""
+    project = get_project_or_404(project_id, db)
+    if project.owner_id != current_user.id and not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Permission denied")
+    job_id = schedule_analysis_update(background_tasks, project_id, force)
+    if job_id is None:
+        raise HTTPException(status_code=409, detail="Analysis update already running")
+    return {"message": "Analysis update started", "job_id": job_id}
+
+@router.get("/{project_id}/analysis/status")
+def read_project_analysis_status(project_id: int):
+    job_status = get_job_status(get_analysis_job_id(project_id))
+    if not job_status:
+        raise HTTPException(status_code=404, detail="Analysis update not started")
+    return job_status
+
+@router.get("/{project_id}/analysis/")
+def read_project_analysis(
+    project_id: int,
+    db: Session = Depends(get_db)
+):
+    """项目分析产物列表（不含结果），dirty 为True的产物待更新"""
+    get_project_or_404(project_id, db)
+    artifacts = db.query(
+        AnalysisArtifact.name,
+        AnalysisArtifact.kind,
+        AnalysisArtifact.dirty,
+        AnalysisArtifact.result_hash,
+        AnalysisArtifact.duration_ms,
+        AnalysisArtifact.updated_at
+    ).filter(AnalysisArtifact.project_id == project_id).order_by(AnalysisArtifact.name).all()
+    return [dict(artifact._mapping) for artifact in artifacts]
+
+@router.get("/{project_id}/analysis/report.xlsx")
+def read_project_analysis_report(project_id: int):
+    report_path = get_report_path(project_id)
+    if not report_path.exists():
+        raise HTTPException(status_code=404, detail="Report not generated")
+    return FileResponse(
+        report_path,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        filename=report_path.name
+    )
+
+@router.get("/{project_id}/analysis/{name:path}")
+def read_project_analysis_artifact(
+    project_id: int,
+    name: str,
+    db: Session = Depends(get_db)
+):
+    """单个分析产物的结果（已保存的JSON原样返回）"""
+    artifact = db.query(AnalysisArtifact).filter(
+        AnalysisArtifact.project_id == project_id,
+        AnalysisArtifact.name == name
+    ).first()
+    if not artifact or artifact.result is None:
+        raise HTTPException(status_code=404, detail="Analysis artifact not found")
+    return Response(
+        artifact.result,
+        media_type="application/json",
+        headers={"ETag": f'"{artifact.result_hash}"', "X-Analysis-Dirty": str(artifact.dirty).lower()}
+    )
@@ -0,0 +1,54 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from ..database import get_db
+from ..models.audit_log import AuditLog
+from ..models.user import User
+from ..utils.audit import parse_audit_details
+from .profiling_view import require_admin
+
+router = APIRouter(prefix="/api/audit-logs", tags=["audit"])
+
+@router.get("/")
+def read_audit_logs(
+    user_id: Optional[int] = None,
+    action: Optional[str] = None,
+    resource_type: Optional[str] = None,
+    resource_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """查询操作日志（按时间倒序），事件在写入前有最多 AUDIT_FLUSH_INTERVAL 秒的延迟"""
+    query = db.query(AuditLog)
+    if user_id is not None:
+        query = query.filter(AuditLog.user_id == user_id)
+    if action:
+        query = query.filter(AuditLog.action == action)
+    if resource_type:
+        query = query.filter(AuditLog.resource_type == resource_type)
+    if resource_id is not None:
+        query = query.filter(AuditLog.resource_id == resource_id)
+    if since:
+        query = query.filter(AuditLog.occurred_at >= since)
+    if until:
+        query = query.filter(AuditLog.occurred_at < until)
+    logs = query.order_by(AuditLog.occurred_at.desc(), AuditLog.id.desc()).offset(skip).limit(limit).all()
+    return [
+        {
+            "id": log.id,
+            "occurred_at": log.occurred_at,
+            "user_id": log.user_id,
+            "action": log.action,
+            "resource_type": log.resource_type,
+            "resource_id": log.resource_id,
+            "details": parse_audit_details(log.details),
+        }
+        for log in logs
+    ]
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+
+from ..models.user import User
+from ..utils.profiling import get_profile_path, read_slow_requests
+from ..utils.security import get_current_user
+
+router = APIRouter(prefix="/api/profiles", tags=["profiling"])
+
+def require_admin(current_user: User = Depends(get_current_user)) -> User:
+    """仅管理员可访问"""
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Permission denied")
+    return current_user
+
+@router.get("/slow")
+def read_slow_requests_log(limit: int = 50, current_user: User = Depends(require_admin)):
+    """获取最近的慢请求记录"""
+    return read_slow_requests(limit)
+
+@router.get("/{profile_id}")
+def read_profile(profile_id: str, current_user: User = Depends(require_admin)):
+    """下载speedscope格式的分析结果"""
+    profile_path = get_profile_path(profile_id)
+    if not profile_path.exists():
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(
+        profile_path,
+        media_type="application/json",
+        filename=profile_path.name
+    )
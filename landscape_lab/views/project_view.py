@@ -1,149 +1,213 @@
 # landscape_lab/views/project_view.py
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
-from typing import List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.responses import FileResponse
+from typing import Optional
 from sqlalchemy.orm import Session
-from ..database import get_db
-from ..models.project import (
-    ProjectInDB,
-    ProjectCreate,
-    ProjectUpdate,
-    ProjectPublic,
-    ProjectSearchResult,
-    ProjectStatistics,
-    ProjectFile
-)
-from ..models.user import UserInDB
+from ..database import SessionLocal, get_db
+from ..models.project import Project
+from ..models.project_file import ProjectFile
+from ..models.user import User
 from ..utils.security import get_current_user
-from ..utils.file_utils import save_uploaded_file
+from ..utils.audit import record_audit
+from ..utils.responses import FastJSONResponse
+from ..utils.file_utils import UPLOAD_ROOT, validate_file_extension
+from ..utils.gis_utils import GIS_EXTENSIONS, import_plant_features
+from ..utils.mesh_utils import build_lod_tiles, get_tile_path, load_tile_manifest
+from ..utils.state import finish_job, get_job_status, start_job, update_job
+from ..config import settings
 from datetime import datetime
 import os
 
+# 支持生成LOD瓦片的模型格式
+MODEL_EXTENSIONS = {".fbx", ".obj", ".glb", ".gltf", ".ply", ".stl"}
+
 router = APIRouter(
     prefix="/api/projects",
     tags=["projects"],
     responses={404: {"description": "Not found"}},
+    default_response_class=FastJSONResponse,
 )
 
-@router.post("/", response_model=ProjectPublic)
-def create_project(
-    project: ProjectCreate,
+def get_tiles_dir(project_id: int, file_id: int) -> str:
+    """获取模型文件的瓦片存储目录"""
+    return str(UPLOAD_ROOT / str(project_id) / "tiles" / str(file_id))
+
+def get_project_model_file(project_id: int, file_id: int, db: Session):
+    """获取项目中的模型文件"""
+    db_file = db.query(ProjectFile).filter(
+        ProjectFile.id == file_id,
+        ProjectFile.project_id == project_id
+    ).first()
+    if not db_file:
+        raise HTTPException(status_code=404, detail="File not found")
+    if not validate_file_extension(db_file.file_name, MODEL_EXTENSIONS):
+        raise HTTPException(status_code=400, detail="Unsupported model format")
+    return db_file
+
+def get_tiles_job_id(project_id: int, file_id: int) -> str:
+    """瓦片生成任务ID"""
+    return f"tiles:{project_id}:{file_id}"
+
+def run_tiles_job(job_id: str, model_path: str, output_dir: str):
+    """执行瓦片生成并记录任务结果"""
+    manifest = {}
+    try:
+        manifest = build_lod_tiles(model_path, output_dir, settings.LOD_TILE_SIZE, settings.LOD_RATIOS)
+    finally:
+        finish_job(job_id, bool(manifest), levels=len(manifest.get("levels", [])))
+
+@router.post("/{project_id}/files/{file_id}/tiles/")
+def build_project_file_tiles(
+    project_id: int,
+    file_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
-    db_project = ProjectInDB(**project.dict(), created_by=current_user.id)
-    db.add(db_project)
-    db.commit()
-    db.refresh(db_project)
-    return db_project
-
-@router.get("/", response_model=List[ProjectSearchResult])
-def read_projects(
-    skip: int = 0,
-    limit: int = 100,
-    search: Optional[str] = Query(None, min_length=2, max_length=100),
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if project.owner_id != current_user.id and not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Permission denied")
+
+    db_file = get_project_model_file(project_id, file_id, db)
+
+    # 任务状态保存在共享状态中，其他工作进程也能查询，并避免重复生成
+    job_id = get_tiles_job_id(project_id, file_id)
+    if not start_job(job_id):
+        raise HTTPException(status_code=409, detail="Tile generation already running")
+
+    # 模型简化耗时较长，放到后台执行
+    background_tasks.add_task(run_tiles_job, job_id, db_file.file_path, get_tiles_dir(project_id, file_id))
+    return {"message": "Tile generation started", "job_id": job_id}
+
+@router.get("/{project_id}/files/{file_id}/tiles/status")
+def read_project_file_tiles_status(
+    project_id: int,
+    file_id: int,
     db: Session = Depends(get_db)
 ):
-    query = db.query(ProjectInDB)
-    if search:
-        query = query.filter(ProjectInDB.name.ilike(f"%{search}%"))
-    projects = query.offset(skip).limit(limit).all()
-    return projects
-
-@router.get("/{project_id}", response_model=ProjectPublic)
-def read_project(
+    get_project_model_file(project_id, file_id, db)
+    job_status = get_job_status(get_tiles_job_id(project_id, file_id))
+    if not job_status:
+        raise HTTPException(status_code=404, detail="Tile generation not started")
+    return job_status
+
+@router.get("/{project_id}/files/{file_id}/tiles/")
+def read_project_file_tileset(
     project_id: int,
+    file_id: int,
     db: Session = Depends(get_db)
 ):
-    project = db.query(ProjectInDB).filter(ProjectInDB.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-    return project
+    get_project_model_file(project_id, file_id, db)
+    manifest = load_tile_manifest(get_tiles_dir(project_id, file_id))
+    if not manifest:
+        raise HTTPException(status_code=404, detail="Tiles not generated")
+    return manifest
 
-@router.put("/{project_id}", response_model=ProjectPublic)
-def update_project(
+@router.get("/{project_id}/files/{file_id}/tiles/{level}/{tile_x}/{tile_y}.glb")
+def read_project_file_tile(
     project_id: int,
-    project: ProjectUpdate,
-    db: Session = Depends(get_db),
-    current_user: UserInDB = Depends(get_current_user)
+    file_id: int,
+    level: int,
+    tile_x: int,
+    tile_y: int
 ):
-    db_project = db.query(ProjectInDB).filter(ProjectInDB.id == project_id).first()
-    if not db_project:
-        raise HTTPException(status_code=404, detail="Project not found")
-    if db_project.created_by != current_user.id and not current_user.is_admin:
-        raise HTTPException(status_code=403, detail="Permission denied")
-    
-    update_data = project.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_project, key, value)
-    
-    db.commit()
-    db.refresh(db_project)
-    return db_project
-
-@router.delete("/{project_id}")
-def delete_project(
+    tile_path = get_tile_path(get_tiles_dir(project_id, file_id), level, tile_x, tile_y)
+    if not tile_path.exists():
+        raise HTTPException(status_code=404, detail="Tile not found")
+    return FileResponse(
+        tile_path,
+        media_type="model/gltf-binary",
+        headers={"Cache-Control": "public, max-age=3600"}
+    )
+
+def get_project_gis_file(project_id: int, file_id: int, db: Session):
+    """获取项目中的GIS数据文件（GeoJSON或zip压缩的Shapefile）"""
+    db_file = db.query(ProjectFile).filter(
+        ProjectFile.id == file_id,
+        ProjectFile.project_id == project_id
+    ).first()
+    if not db_file:
+        raise HTTPException(status_code=404, detail="File not found")
+    if not validate_file_extension(db_file.file_name, GIS_EXTENSIONS):
+        raise HTTPException(status_code=400, detail="Unsupported GIS format")
+    return db_file
+
+def get_plant_import_job_id(project_id: int, file_id: int) -> str:
+    """植物点位导入任务ID"""
+    return f"plant-import:{project_id}:{file_id}"
+
+def run_plant_import_job(job_id: str, project_id: int, file_path: str, origin: tuple, **options):
+    """在独立的数据库会话中导入植物点位并记录任务结果"""
+    summary, error = {}, None
+    db = SessionLocal()
+    try:
+        summary = import_plant_features(
+            db, project_id, file_path, origin,
+            batch_size=settings.GIS_IMPORT_BATCH_SIZE,
+            chunk_size=settings.GIS_READ_CHUNK_SIZE,
+            progress=lambda progress: update_job(job_id, **progress),
+            **options
+        )
+    except Exception as e:
+        print(f"Error importing plant features: {e}")
+        error = str(e)
+    finally:
+        db.close()
+        finish_job(job_id, error is None, error=error, **summary)
+
+@router.post("/{project_id}/files/{file_id}/plants/import/")
+def import_project_file_plants(
     project_id: int,
+    file_id: int,
+    background_tasks: BackgroundTasks,
+    source_crs: Optional[str] = None,
+    species_field: Optional[str] = None,
+    name_field: Optional[str] = None,
+    create_missing: bool = False,
     db: Session = Depends(get_db),
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
-    project = db.query(ProjectInDB).filter(ProjectInDB.id == project_id).first()
+    """将GIS文件中的树木点位导入为项目植物配置（后台执行）
+
+    坐标转换为以项目坐标为原点的平面坐标，项目需先设置经纬度。
+    source_crs 覆盖文件中声明的坐标系（如 EPSG:4547），未声明时按WGS84处理。
+    每次导入都会追加配置条目。
+    """
+    project = db.query(Project).filter(Project.id == project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    if project.created_by != current_user.id and not current_user.is_admin:
+    if project.owner_id != current_user.id and not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Permission denied")
-    
-    db.delete(project)
-    db.commit()
-    return {"message": "Project deleted successfully"}
+    if project.latitude is None or project.longitude is None:
+        raise HTTPException(status_code=400, detail="Project location is required to place imported plants")
 
-@router.get("/statistics/", response_model=ProjectStatistics)
-def get_project_statistics(
-    db: Session = Depends(get_db),
-    current_user: UserInDB = Depends(get_current_user)
-):
-    if not current_user.is_admin:
-        raise HTTPException(status_code=403, detail="Permission denied")
-    
-    total_projects = db.query(ProjectInDB).count()
-    
-    # 获取项目状态统计
-    project_statuses = db.query(
-        ProjectInDB.status,
-        db.func.count(ProjectInDB.id).label("count")
-    ).group_by(ProjectInDB.status).all()
-    
-    # 获取最近添加的项目
-    recent_projects = db.query(ProjectInDB).order_by(
-        ProjectInDB.created_at.desc()
-    ).limit(5).all()
-    
-    return ProjectStatistics(
-        total_projects=total_projects,
-        project_statuses=[{"status": ps[0], "count": ps[1]} for ps in project_statuses],
-        recent_additions=recent_projects
+    db_file = get_project_gis_file(project_id, file_id, db)
+    job_id = get_plant_import_job_id(project_id, file_id)
+    if not start_job(job_id):
+        raise HTTPException(status_code=409, detail="Plant import already running")
+
+    background_tasks.add_task(
+        run_plant_import_job, job_id, project_id, db_file.file_path,
+        (project.latitude, project.longitude),
+        source_crs=source_crs,
+        species_fields=[species_field] if species_field else settings.GIS_SPECIES_FIELDS,
+        name_fields=[name_field] if name_field else settings.GIS_NAME_FIELDS,
+        create_missing=create_missing,
+        created_by=current_user.id
     )
+    record_audit("import", "project_plants", project_id, current_user, file_id=file_id, job_id=job_id)
+    return {"message": "Plant import started", "job_id": job_id}
 
-@router.post("/{project_id}/files/", response_model=ProjectFile)
-def upload_project_file(
+@router.get("/{project_id}/files/{file_id}/plants/import/status")
+def read_project_file_plants_import_status(
     project_id: int,
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    current_user: UserInDB = Depends(get_current_user)
+    file_id: int,
+    db: Session = Depends(get_db)
 ):
-    project = db.query(ProjectInDB).filter(ProjectInDB.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-    if project.created_by != current_user.id and not current_user.is_admin:
-        raise HTTPException(status_code=403, detail="Permission denied")
-    
-    file_path = save_uploaded_file(file, project_id)
-    db_file = ProjectFile(
-        project_id=project_id,
-        file_name=file.filename,
-        file_path=file_path,
-        uploaded_by=current_user.id
-    )
-    db.add(db_file)
-    db.commit()
-    db.refresh(db_file)
-    return db_file
+    get_project_gis_file(project_id, file_id, db)
+    job_status = get_job_status(get_plant_import_job_id(project_id, file_id))
+    if not job_status:
+        raise HTTPException(status_code=404, detail="Plant import not started")
+    return job_status
@@ -1,57 +1,82 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from typing import List
-
-from database import get_db
-from models.user import User
-from schemas.user import UserCreate, UserInDB, Token
-from utils.security import (
-    get_password_hash,
-    create_access_token,
-    get_current_user,
-    ACCESS_TOKEN_EXPIRE_MINUTES
+from typing import List, Optional
+
+from ..database import get_db
+from ..models.user import User
+from ..schemas.user import UserCreate, UserInDB, Token, TokenRefresh
+from ..utils.security import (
+    get_password_hash_async,
+    verify_and_update_password,
+    create_token_pair,
+    rotate_refresh_token,
+    get_current_user
 )
+from ..utils.audit import record_audit
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+def get_user_by_username(db: Session, username: str) -> Optional[User]:
+    """按用户名查询用户"""
+    return db.query(User).filter(User.username == username).first()
+
+def save_user(db: Session, db_user: User) -> User:
+    """保存用户并刷新"""
+    db.add(db_user)
+    db.commit()
+    db.refresh(db_user)
+    return db_user
+
+# 处理函数为异步函数，bcrypt在专用线程池中执行，数据库操作放入请求线程池
 @router.post("/", response_model=UserInDB)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
+async def create_user(user: UserCreate, db: Session = Depends(get_db)):
     """创建新用户"""
-    db_user = db.query(User).filter(User.username == user.username).first()
+    db_user = await run_in_threadpool(get_user_by_username, db, user.username)
     if db_user:
         raise HTTPException(status_code=400, detail="用户名已存在")
     
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
         hashed_password=hashed_password
     )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    db_user = await run_in_threadpool(save_user, db, db_user)
+    record_audit("create", "user", db_user.id, db_user, username=db_user.username)
     return db_user
 
 @router.post("/token", response_model=Token)
-def login_for_access_token(
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
     """用户登录获取访问令牌"""
-    user = db.query(User).filter(User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await run_in_threadpool(get_user_by_username, db, form_data.username)
+    if not user:
+        raise HTTPException(
+            status_code=400,
+            detail="用户名或密码错误"
+        )
+    verified, new_hash = await verify_and_update_password(form_data.password, user.hashed_password)
+    if not verified:
         raise HTTPException(
             status_code=400,
             detail="用户名或密码错误"
         )
+
+    # 成本因子调整后，登录时透明地更新密码哈希
+    if new_hash:
+        user.hashed_password = new_hash
+        await run_in_threadpool(save_user, db, user)
     
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username}, 
-        expires_delta=access_token_expires
-    )
-    return {"access_token": access_token, "token_type": "bearer"}
+    return create_token_pair(user.username)
+
+@router.post("/token/refresh", response_model=Token)
+def refresh_access_token(request: TokenRefresh, db: Session = Depends(get_db)):
+    """使用刷新令牌换取新的令牌对（无需重新验证密码）"""
+    return rotate_refresh_token(db, request.refresh_token)
 
 @router.get("/me", response_model=UserInDB)
 def read_users_me(current_user: User = Depends(get_current_user)):
@@ -1,27 +0,0 @@
-# landscape_lab/models/project.py
-from datetime import datetime
-from typing import List, Optional
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
-from database.db import Base
-
-class Project(Base):
-    """项目模型"""
-    __tablename__ = "projects"
-
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(100), unique=True, index=True, nullable=False)
-    description = Column(Text, nullable=True)
-    location = Column(String(200), nullable=True)
-    area_size = Column(Float, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-
-    # 关系
-    owner_id = Column(Integer, ForeignKey("users.id"))
-    owner = relationship("User", back_populates="projects")
-    plants = relationship("Plant", back_populates="project")
-    materials = relationship("Material", back_populates="project")
-
-    def __repr__(self):
-        return f"<Project(id={self.id}, name={self.name})>"
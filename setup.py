@@ -3,20 +3,35 @@ from setuptools import setup, find_packages
 setup(
     name="landscape_lab",
     version="0.1",
-    packages=find_packages(where="src"),
-    package_dir={"": "src"},
+    packages=find_packages(include=["landscape_lab", "landscape_lab.*"]),
     include_package_data=True,
+    python_requires=">=3.8",
     install_requires=[
         'fastapi',
         'uvicorn[standard]',
-        'sqlalchemy',
+        'gunicorn; platform_system != "Windows"',
+        'sqlalchemy>=1.4,<2.0',
+        'pydantic[email]<2.0',
+        'python-dotenv',
         'python-multipart',
         'python-jose[cryptography]',
         'passlib[bcrypt]',
         'pillow',
         'ezdxf',
-        'trimesh'
+        'trimesh',
+        'rtree',
+        'numpy',
+        'orjson',
+        'pandas',
+        'openpyxl',
+        'suncalc'
     ],
+    extras_require={
+        'bench': ['httpx'],
+        'compress': ['brotli', 'zstandard'],
+        'gis': ['pyproj', 'pyshp'],
+        'test': ['pytest', 'httpx'],
+    },
     entry_points={
         'console_scripts': [
             'landscape-lab=landscape_lab.cli:main',
@@ -24,9 +39,7 @@ setup(
     },
     package_data={
         'landscape_lab': [
-            'database/*.py',
-            'models/*.py',
-            'templates/*.html',
+            'templates/*/*.html',
             'static/css/*',
             'static/js/*'
         ]
@@ -0,0 +1,72 @@
+# tests/conftest.py
+"""测试配置：在导入 landscape_lab 之前将数据库等指向临时目录"""
+import os
+import tempfile
+
+_TEST_DIR = tempfile.mkdtemp(prefix="landscape-lab-test-")
+os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{_TEST_DIR}/test.db"
+os.environ["AUDIT_LOG_FILE"] = os.path.join(_TEST_DIR, "audit.log")
+os.environ["PROFILE_DIR"] = os.path.join(_TEST_DIR, "profiles")
+# 操作日志、限流与慢请求分析由各自的测试显式开启
+os.environ["AUDIT_LOG_ENABLED"] = "false"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["SLOW_REQUEST_PROFILING"] = "false"
+
+import pytest
+
+@pytest.fixture(scope="session")
+def engine():
+    from landscape_lab.database import engine, init_db
+
+    init_db()
+    return engine
+
+@pytest.fixture
+def db(engine):
+    """数据库会话，测试结束后清空全部表"""
+    from landscape_lab.database import SessionLocal
+    from landscape_lab.models.base import Base
+    from landscape_lab.utils.geo_utils import SPATIAL_INDEX_TABLE
+    from landscape_lab.utils.recommend_utils import invalidate_plant_index
+
+    # 提交后不过期，接口在其他线程中读取测试创建的对象时不会再查询
+    session = SessionLocal(expire_on_commit=False)
+    yield session
+    session.close()
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+        connection.exec_driver_sql(f"DELETE FROM {SPATIAL_INDEX_TABLE}")
+    invalidate_plant_index()
+
+@pytest.fixture
+def make_user(db):
+    """创建用户"""
+    from landscape_lab.models.user import User
+
+    def create(username: str, is_admin: bool = False) -> User:
+        user = User(username=username, email=f"{username}@example.com",
+                    hashed_password="!", is_admin=is_admin)
+        db.add(user)
+        db.commit()
+        return user
+    return create
+
+@pytest.fixture
+def client(db):
+    from fastapi.testclient import TestClient
+    from landscape_lab.main import app
+
+    return TestClient(app)
+
+@pytest.fixture
+def login():
+    """以给定用户身份调用接口（替换 get_current_user）"""
+    from landscape_lab.main import app
+    from landscape_lab.utils.security import get_current_user
+
+    def login_as(user):
+        app.dependency_overrides[get_current_user] = lambda: user
+        return user
+    yield login_as
+    app.dependency_overrides.pop(get_current_user, None)
@@ -0,0 +1,100 @@
+import pytest
+
+from landscape_lab.benchmarks.datagen import write_scene_file
+from landscape_lab.models.analysis_artifact import AnalysisArtifact
+from landscape_lab.models.project import Project
+from landscape_lab.models.project_file import ProjectFile
+from landscape_lab.utils import analysis_graph
+from landscape_lab.utils.analysis_graph import (
+    build_analysis_graph,
+    mark_file_changed,
+    update_project_analysis
+)
+from landscape_lab.utils.file_utils import get_file_hash
+
+@pytest.fixture
+def project(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(analysis_graph, "UPLOAD_ROOT", tmp_path / "uploads")
+    project = Project(name="analysis")
+    db.add(project)
+    db.commit()
+    return project
+
+@pytest.fixture
+def add_file(db, project, tmp_path):
+    """写入模型文件并登记为项目文件（同名视为替换）"""
+    def add(file_name: str, plant_count: int, seed: int = 0) -> ProjectFile:
+        path = write_scene_file(str(tmp_path / f"{seed}-{plant_count}-{file_name}"), plant_count, seed)
+        db_file = ProjectFile(project_id=project.id, file_name=file_name, file_path=path,
+                              file_hash=get_file_hash(path))
+        db.add(db_file)
+        db.commit()
+        return db_file
+    return add
+
+def test_build_analysis_graph_orders_dependencies():
+    files = {name: ProjectFile(file_name=name) for name in ("b.glb", "a.dxf", "notes.txt", "a.obj")}
+    graph = build_analysis_graph(files, catalogue="c1")
+    assert list(graph) == [
+        "drawing:a.dxf", "distribution:a.obj", "distribution:b.glb",
+        "plants", "coverage", "drawings", "report",
+    ]
+    assert graph["distribution:a.obj"]["inputs"] == ["file:a.obj"]
+    assert graph["plants"]["inputs"] == ["distribution:a.obj", "distribution:b.glb"]
+    assert graph["plants"]["params"] == {"catalogue": "c1"}
+    assert graph["drawings"]["inputs"] == ["drawing:a.dxf"]
+    assert graph["report"]["inputs"] == ["plants", "coverage"]
+
+def test_unchanged_inputs_are_reused(db, project, add_file):
+    add_file("site.glb", 20)
+    first = update_project_analysis(db, project.id)
+    assert set(first["recomputed"]) == {"distribution:site.glb", "plants", "coverage", "drawings", "report"}
+    assert first["failed"] == []
+    assert analysis_graph.get_report_path(project.id).exists()
+
+    second = update_project_analysis(db, project.id)
+    assert second["recomputed"] == []
+    assert set(second["reused"]) == set(first["recomputed"])
+
+    # 重新上传相同内容：标记为脏，但指纹不变，不重算
+    add_file("site.glb", 20)
+    assert "distribution:site.glb" in mark_file_changed(db, project.id, "site.glb")
+    assert update_project_analysis(db, project.id)["recomputed"] == []
+    assert not db.query(AnalysisArtifact).filter(AnalysisArtifact.dirty.is_(True)).count()
+
+def test_new_file_recomputes_only_affected_nodes(db, project, add_file):
+    add_file("site.glb", 20)
+    update_project_analysis(db, project.id)
+
+    add_file("extra.glb", 10, seed=1)
+    assert mark_file_changed(db, project.id, "extra.glb") == ["coverage", "plants", "report"]
+    summary = update_project_analysis(db, project.id)
+    assert set(summary["recomputed"]) == {"distribution:extra.glb", "plants", "coverage", "report"}
+    assert set(summary["reused"]) == {"distribution:site.glb", "drawings"}
+
+    plants = db.query(AnalysisArtifact).filter_by(project_id=project.id, name="plants").one()
+    assert '"plant_count": 30' in plants.result
+
+def test_removed_file_drops_its_artifact(db, project, add_file):
+    db_file = add_file("site.glb", 5)
+    update_project_analysis(db, project.id)
+    db.delete(db_file)
+    db.commit()
+    summary = update_project_analysis(db, project.id)
+    assert summary["removed"] == ["distribution:site.glb"]
+    assert "plants" in summary["recomputed"]
+
+def test_analysis_endpoints(client, db, project, add_file, make_user, login):
+    add_file("site.glb", 20)
+    login(make_user("stranger"))
+    assert client.post(f"/api/projects/{project.id}/analysis/").status_code == 403
+
+    project.owner_id = login(make_user("owner")).id
+    db.commit()
+    response = client.post(f"/api/projects/{project.id}/analysis/")
+    assert response.status_code == 200
+    # TestClient 在返回前已执行完后台任务
+    status = client.get(f"/api/projects/{project.id}/analysis/status").json()
+    assert status["status"] == "done"
+    artifacts = client.get(f"/api/projects/{project.id}/analysis/").json()
+    assert artifacts
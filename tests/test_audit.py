@@ -0,0 +1,86 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from landscape_lab.config import settings
+from landscape_lab.models.audit_log import AuditLog
+from landscape_lab.utils.audit import (
+    AuditLogWriter,
+    parse_audit_details,
+    record_audit,
+    start_audit_writer,
+    stop_audit_writer
+)
+
+def make_event(index: int, **details) -> dict:
+    return {
+        "occurred_at": datetime(2024, 1, 1, 0, 0, index),
+        "user_id": 1,
+        "action": "update",
+        "resource_type": "plant",
+        "resource_id": str(index),
+        "details": details or None,
+    }
+
+@pytest.fixture
+def audit_enabled(engine, monkeypatch):
+    """开启操作日志，写入线程写入测试数据库，测试结束后写完剩余事件"""
+    monkeypatch.setattr(settings, "AUDIT_LOG_ENABLED", True)
+    start_audit_writer(bind=engine)
+    yield
+    stop_audit_writer()
+
+def test_file_backend_writes_json_lines(tmp_path):
+    path = tmp_path / "logs" / "audit.log"
+    writer = AuditLogWriter(backend="file", file_path=str(path), batch_size=2, flush_interval=0.05)
+    writer.start()
+    for index in range(5):
+        assert writer.put(make_event(index, fields=["height"]), timeout=1)
+    writer.stop()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["resource_id"] for line in lines] == ["0", "1", "2", "3", "4"]
+    assert lines[0]["occurred_at"] == "2024-01-01T00:00:00"
+    assert lines[0]["details"] == {"fields": ["height"]}
+
+def test_database_backend_writes_to_bound_engine(db, engine):
+    writer = AuditLogWriter(backend="database", flush_interval=0.05, bind=engine)
+    writer.start()
+    writer.put(make_event(1, name="银杏"), timeout=1)
+    writer.put(make_event(2), timeout=1)
+    writer.stop()
+
+    logs = db.query(AuditLog).order_by(AuditLog.id).all()
+    assert [log.resource_id for log in logs] == ["1", "2"]
+    assert parse_audit_details(logs[0].details) == {"name": "银杏"}
+    assert logs[1].details is None
+
+def test_full_queue_drops_events():
+    writer = AuditLogWriter(backend="file", file_path="unused", queue_size=1)
+    assert writer.put(make_event(1), timeout=0)
+    assert not writer.put(make_event(2), timeout=0.01)
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        AuditLogWriter(backend="syslog")
+
+def test_record_audit_is_noop_when_disabled():
+    assert not record_audit("create", "plant", 1)
+
+def test_api_changes_are_audited(client, db, make_user, login, audit_enabled):
+    admin = login(make_user("admin", is_admin=True))
+    plant_id = client.post("/api/plants/", json={"name": "银杏", "scientific_name": "Ginkgo biloba"}).json()["id"]
+    client.put(f"/api/plants/{plant_id}", json={"height": 3.0, "spread": 2.0})
+    client.delete(f"/api/plants/{plant_id}")
+    stop_audit_writer()
+
+    logs = client.get("/api/audit-logs/", params={"resource_type": "plant"}).json()
+    assert [log["action"] for log in logs] == ["delete", "update", "create"]
+    assert {log["user_id"] for log in logs} == {admin.id}
+    assert logs[1]["details"] == {"fields": ["height", "spread"]}
+    assert logs[2]["details"] == {"name": "银杏"}
+
+def test_audit_logs_require_admin(client, make_user, login):
+    login(make_user("visitor"))
+    assert client.get("/api/audit-logs/").status_code == 403
@@ -0,0 +1,57 @@
+import pytest
+
+from landscape_lab.utils.classify_utils import (
+    classify_nodes,
+    clean_species_label,
+    compile_node_rules,
+    get_node_classifier,
+    group_species_labels
+)
+
+def classify_names(classifier, names):
+    return classify_nodes(classifier, [(name,) for name in names])
+
+def test_default_rules_extract_species():
+    labels = classify_names(get_node_classifier(), [
+        "plant_Ginkgo_biloba_12", "Tree-Acer palmatum 3", "Oak_tree_12", "myPlant7", "bench_1",
+    ])
+    assert labels == ["Ginkgo biloba", "Acer palmatum", "Oak", "myPlant", None]
+
+def test_result_does_not_depend_on_neighbouring_names():
+    # 默认规则含 [\s_\-:.]+，批量匹配时不能跨到相邻名称
+    names = ["Tree", "Box001", "Shrub_", "Camera"]
+    classifier = get_node_classifier()
+    batch = classify_names(classifier, names)
+    assert batch == [None, None, None, None]
+    assert batch == [classify_names(classifier, [name])[0] for name in names]
+
+def test_rule_order_sources_and_ignore():
+    classifier = compile_node_rules([
+        {"source": "layer", "match": "glob", "pattern": "TREES_*", "species": "Quercus robur"},
+        {"source": "material", "pattern": r"mat_(?P<species>.+)"},
+        {"match": "glob", "pattern": "*proxy*", "category": "ignore"},
+        {"match": "glob", "pattern": "*"},
+    ])
+    labels = classify_nodes(classifier, [
+        ("a", "g", "mat_Ginkgo", None),
+        ("b", "g", None, "TREES_1"),
+        # 图层规则排在材质规则之前
+        ("c", "g", "mat_Ginkgo", "TREES_2"),
+        ("x_proxy", None, None, None),
+        ("Foo_2", None, None, None),
+    ])
+    assert labels == ["Ginkgo", "Quercus robur", "Quercus robur", None, "Foo"]
+
+def test_invalid_rules_raise_value_error():
+    with pytest.raises(ValueError):
+        compile_node_rules([{"pattern": "(unclosed"}])
+    with pytest.raises(ValueError):
+        compile_node_rules([{"pattern": "x", "source": "colour"}])
+    with pytest.raises(ValueError):
+        compile_node_rules([{"pattern": "x", "category": "maybe"}])
+
+def test_clean_and_group_labels():
+    assert clean_species_label("Ginkgo_biloba_012") == "Ginkgo biloba"
+    assert clean_species_label("Acer.003") == "Acer"
+    groups = group_species_labels(["Ginkgo biloba", "ginkgo_biloba", None, "Acer"])
+    assert groups == {"Ginkgo biloba": "Ginkgo biloba", "ginkgo_biloba": "Ginkgo biloba", "Acer": "Acer"}
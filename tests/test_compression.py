@@ -0,0 +1,92 @@
+import asyncio
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from landscape_lab.config import settings
+from landscape_lab.utils.compression import CompressionMiddleware, choose_encoding
+
+BODY = "银杏 Ginkgo biloba " * 200
+CHUNKS = [f"chunk {index} ".encode() * 100 for index in range(5)]
+
+async def plain(request):
+    return PlainTextResponse(BODY)
+
+async def small(request):
+    return PlainTextResponse("ok")
+
+async def streamed(request):
+    async def generate():
+        for chunk in CHUNKS:
+            yield chunk
+    return StreamingResponse(generate(), media_type="text/plain")
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(settings, "COMPRESSION_ENABLED", True)
+    monkeypatch.setattr(settings, "COMPRESSION_MIN_SIZE", 100)
+    monkeypatch.setattr(settings, "COMPRESSION_ENCODINGS", ["gzip"])
+    routes = [Route("/plain", plain), Route("/small", small), Route("/stream", streamed)]
+    return CompressionMiddleware(Starlette(routes=routes))
+
+def call(app, path: str, accept_encoding: str = "gzip"):
+    """直接调用ASGI应用，返回 (响应头, 各块响应体)，响应体不解压"""
+    messages = []
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        # 流式响应在发送期间等待客户端断开
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http", "method": "GET", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "scheme": "http", "server": ("test", 80), "client": ("127.0.0.1", 1000),
+        "http_version": "1.1", "headers": [(b"accept-encoding", accept_encoding.encode())],
+    }
+    asyncio.run(app(scope, receive, send))
+    headers = {name.decode(): value.decode() for name, value in messages[0]["headers"]}
+    return headers, [message.get("body", b"") for message in messages[1:]]
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", "gzip"),
+    ("br;q=1.0, gzip;q=0.5", "gzip"),
+    ("gzip;q=0", None),
+    ("*", "gzip"),
+    ("*;q=0", None),
+    ("*, gzip;q=0", None),
+    ("identity", None),
+    ("", None),
+])
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header, ["gzip"]) == expected
+
+def test_plain_response_is_compressed(app):
+    headers, chunks = call(app, "/plain")
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Accept-Encoding"
+    assert int(headers["content-length"]) == len(chunks[0])
+    assert gzip.decompress(b"".join(chunks)).decode() == BODY
+
+def test_small_and_refused_responses_pass_through(app):
+    headers, chunks = call(app, "/small")
+    assert "content-encoding" not in headers
+    assert chunks == [b"ok"]
+
+    headers, chunks = call(app, "/plain", accept_encoding="gzip;q=0")
+    assert "content-encoding" not in headers
+    assert b"".join(chunks).decode() == BODY
+
+def test_streaming_response_is_compressed_per_chunk(app):
+    headers, chunks = call(app, "/stream")
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    assert len(chunks) > 1
+    assert gzip.decompress(b"".join(chunks)) == b"".join(CHUNKS)
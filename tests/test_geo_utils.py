@@ -0,0 +1,105 @@
+import math
+
+import pytest
+
+from landscape_lab.models.project import Project
+from landscape_lab.utils import geo_utils
+from landscape_lab.utils.geo_utils import (
+    footprint_bounds,
+    footprint_centroid_and_area,
+    haversine_km,
+    radius_bounds,
+    validate_footprint
+)
+
+def square(lon: float, lat: float, size: float = 0.01) -> dict:
+    return {"type": "Polygon", "coordinates": [[
+        [lon, lat], [lon + size, lat], [lon + size, lat + size], [lon, lat + size], [lon, lat],
+    ]]}
+
+@pytest.fixture(params=[True, False], ids=["rtree", "lat-lon-index"])
+def spatial_index(request, engine, monkeypatch):
+    """分别在有、无R*Tree空间索引时运行"""
+    monkeypatch.setitem(geo_utils._spatial_index_available, str(engine.url), request.param)
+    return request.param
+
+@pytest.fixture
+def projects(db, spatial_index):
+    rows = [
+        Project(name="beijing", latitude=39.9042, longitude=116.4074),
+        Project(name="tianjin", latitude=39.3434, longitude=117.3616),
+        Project(name="shanghai", footprint=square(121.47, 31.23)),
+        Project(name="nowhere"),
+    ]
+    db.add_all(rows)
+    db.commit()
+    return {project.name: project.id for project in rows}
+
+def test_haversine_km():
+    assert haversine_km(0, 0, 0, 1) == pytest.approx(111.195, abs=0.01)
+    assert haversine_km(39.9042, 116.4074, 31.2304, 121.4737) == pytest.approx(1067, abs=2)
+
+def test_radius_bounds_contains_circle():
+    min_lon, min_lat, max_lon, max_lat = radius_bounds(60.0, 10.0, 100)
+    assert haversine_km(60.0, 10.0, max_lat, 10.0) == pytest.approx(100, abs=0.1)
+    # 高纬度处经度跨度更大
+    assert max_lon - 10.0 > max_lat - 60.0
+
+def test_footprint_centroid_and_area():
+    footprint = square(116.0, 39.0)
+    longitude, latitude, area = footprint_centroid_and_area(footprint)
+    assert (longitude, latitude) == pytest.approx((116.005, 39.005))
+    side_m = 0.01 * geo_utils.KM_PER_DEGREE * 1000
+    assert area == pytest.approx(side_m * side_m * math.cos(math.radians(39.005)), rel=0.01)
+    assert footprint_bounds(footprint) == pytest.approx((116.0, 39.0, 116.01, 39.01))
+
+def test_validate_footprint_rejects_invalid_geometry():
+    with pytest.raises(ValueError):
+        validate_footprint({"type": "Point", "coordinates": [0, 0]})
+    with pytest.raises(ValueError):
+        validate_footprint({"type": "Polygon", "coordinates": [[[0, 0], [1, 0], [0, 0]]]})
+
+def test_footprint_fills_and_refreshes_location(db, spatial_index):
+    project = Project(name="site", footprint=square(116.0, 39.0))
+    db.add(project)
+    db.commit()
+    assert (project.longitude, project.latitude) == pytest.approx((116.005, 39.005))
+
+    project.footprint = square(120.0, 30.0)
+    db.commit()
+    assert (project.longitude, project.latitude) == pytest.approx((120.005, 30.005))
+
+    # 同一次修改中显式给出的坐标保持不变
+    project.footprint = square(121.0, 31.0)
+    project.latitude, project.longitude = 10.0, 20.0
+    db.commit()
+    assert (project.longitude, project.latitude) == (20.0, 10.0)
+
+def test_within_endpoint(client, projects):
+    response = client.get("/api/projects/within/", params={
+        "min_lon": 116, "min_lat": 39, "max_lon": 122, "max_lat": 40,
+    })
+    assert response.status_code == 200
+    assert {row["id"] for row in response.json()} == {projects["beijing"], projects["tianjin"]}
+
+    response = client.get("/api/projects/within/", params={
+        "min_lon": 121.475, "min_lat": 31.235, "max_lon": 121.6, "max_lat": 31.3, "include_footprint": True,
+    })
+    assert [row["id"] for row in response.json()] == [projects["shanghai"]]
+    assert response.json()[0]["footprint"]["type"] == "Polygon"
+
+    assert client.get("/api/projects/within/", params={
+        "min_lon": 10, "min_lat": 0, "max_lon": 0, "max_lat": 1,
+    }).status_code == 400
+
+def test_nearby_endpoint_sorts_by_distance(client, projects):
+    response = client.get("/api/projects/nearby/", params={
+        "latitude": 39.9, "longitude": 116.4, "radius_km": 150,
+    })
+    rows = response.json()
+    assert [row["id"] for row in rows] == [projects["beijing"], projects["tianjin"]]
+    assert rows[0]["distance_km"] < 1 < rows[1]["distance_km"] < 150
+
+def test_nearest_endpoint_expands_radius(client, projects):
+    response = client.get("/api/projects/nearest/", params={"latitude": 31.0, "longitude": 121.0, "k": 2})
+    assert [row["id"] for row in response.json()] == [projects["shanghai"], projects["tianjin"]]
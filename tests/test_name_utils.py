@@ -0,0 +1,59 @@
+import pytest
+
+from landscape_lab.models.plant import Plant
+from landscape_lab.utils.name_utils import (
+    get_name_index,
+    match_names,
+    match_plant_id,
+    name_trigrams,
+    normalize_name
+)
+
+@pytest.fixture
+def plants(db):
+    rows = [
+        Plant(name="鸡爪槭", scientific_name="Acer palmatum"),
+        Plant(name="银杏", scientific_name="Ginkgo biloba"),
+        Plant(name="悬铃木", scientific_name="Platanus acerifolia"),
+    ]
+    db.add_all(rows)
+    db.commit()
+    return {plant.scientific_name: plant.id for plant in rows}
+
+def test_normalize_name_drops_sizes_and_cultivar_quotes():
+    assert normalize_name("Acer palm. 'Bloodgood' 3m") == "acer palm bloodgood"
+    assert normalize_name("ACER_PALMATUM-12") == normalize_name("acer palmatum 12")
+    assert normalize_name(None) == ""
+
+def test_normalize_name_applies_synonyms():
+    assert normalize_name("法国梧桐") == normalize_name("悬铃木")
+    assert normalize_name("London Plane") == "platanus acerifolia"
+
+def test_name_trigrams_pad_each_word():
+    assert name_trigrams("ab") == {"  a", " ab", "ab "}
+
+def test_match_names_ranks_best_candidate_first(db, plants):
+    results = match_names(get_name_index(db), ["Acer palmatum 'Bloodgood'", "Ginko biloba", "xyz"])
+    assert [result["query"] for result in results] == ["Acer palmatum 'Bloodgood'", "Ginko biloba", "xyz"]
+    assert results[0]["candidates"][0]["id"] == plants["Acer palmatum"]
+    assert results[0]["candidates"][0]["matched_field"] == "scientific_name"
+    assert results[1]["candidates"][0]["id"] == plants["Ginkgo biloba"]
+    assert results[2]["candidates"] == []
+
+def test_match_plant_id_requires_auto_score(db, plants):
+    index = get_name_index(db)
+    assert match_plant_id(index, "法桐") == plants["Platanus acerifolia"]
+    assert match_plant_id(index, "Acer") is None
+
+def test_name_index_is_rebuilt_after_catalogue_change(db, plants):
+    assert match_plant_id(get_name_index(db), "Cinnamomum camphora") is None
+    db.add(Plant(name="香樟", scientific_name="Cinnamomum camphora"))
+    db.commit()
+    assert match_plant_id(get_name_index(db), "Cinnamomum camphora") is not None
+
+def test_match_endpoint(client, plants):
+    response = client.post("/api/plants/match/", json={"names": ["银杏", "ginkgo"], "limit": 1})
+    assert response.status_code == 200
+    body = response.json()
+    assert [len(result["candidates"]) for result in body] == [1, 1]
+    assert {result["candidates"][0]["id"] for result in body} == {plants["Ginkgo biloba"]}
@@ -0,0 +1,115 @@
+import pytest
+
+from landscape_lab.models.material import Material, MaterialUsage, rebuild_material_usage
+from landscape_lab.models.plant import Plant, PlantLocation, rebuild_plant_usage
+from landscape_lab.models.project import Project
+from landscape_lab.models.project_plants import project_plants
+
+@pytest.fixture
+def owner(make_user):
+    return make_user("owner")
+
+@pytest.fixture
+def stranger(make_user):
+    return make_user("stranger")
+
+@pytest.fixture
+def catalogue(db, owner):
+    plant = Plant(name="银杏", scientific_name="Ginkgo biloba", created_by=owner.id)
+    material = Material(name="花岗岩", type="stone", unit="m2", unit_price=120.0, created_by=owner.id)
+    project = Project(name="park", owner_id=owner.id)
+    db.add_all([plant, material, project])
+    db.commit()
+    return plant, material, project
+
+def test_line_items_require_project_owner(client, catalogue, owner, stranger, login):
+    plant, material, project = catalogue
+    login(stranger)
+    assert client.post("/api/plants/locations/", json={
+        "project_id": project.id, "plant_id": plant.id,
+    }).status_code == 403
+    assert client.post("/api/materials/usages/", json={
+        "project_id": project.id, "material_id": material.id, "quantity": 5,
+    }).status_code == 403
+
+    login(owner)
+    location = client.post("/api/plants/locations/", json={"project_id": project.id, "plant_id": plant.id}).json()
+    usage = client.post("/api/materials/usages/", json={
+        "project_id": project.id, "material_id": material.id, "quantity": 5,
+    }).json()
+    assert usage["unit"] == "m2"
+
+    login(stranger)
+    assert client.delete(f"/api/plants/locations/{location['id']}").status_code == 403
+    assert client.delete(f"/api/materials/usages/{usage['id']}").status_code == 403
+    login(owner)
+    assert client.delete(f"/api/plants/locations/{location['id']}").status_code == 200
+    assert client.delete(f"/api/materials/usages/{usage['id']}").status_code == 200
+
+def test_line_items_require_existing_catalogue_entry(client, db, catalogue, owner, login):
+    plant, material, project = catalogue
+    login(owner)
+    response = client.post("/api/plants/locations/", json={"project_id": project.id, "plant_id": 999})
+    assert (response.status_code, response.json()["detail"]) == (404, "Plant not found")
+    response = client.post("/api/materials/usages/", json={
+        "project_id": project.id, "material_id": 999, "quantity": 5,
+    })
+    assert (response.status_code, response.json()["detail"]) == (404, "Material not found")
+    assert not db.query(PlantLocation).count() and not db.query(MaterialUsage).count()
+
+def test_catalogue_updates_require_creator(client, catalogue, owner, stranger, make_user, login):
+    plant, material, _ = catalogue
+    login(stranger)
+    assert client.put(f"/api/plants/{plant.id}", json={"height": 3.0}).status_code == 403
+    assert client.put(f"/api/materials/{material.id}", json={"unit_price": 1.0}).status_code == 403
+    login(owner)
+    assert client.put(f"/api/plants/{plant.id}", json={"height": 3.0}).json()["height"] == 3.0
+    # 删除仅限管理员
+    assert client.delete(f"/api/plants/{plant.id}").status_code == 403
+    login(make_user("admin", is_admin=True))
+    assert client.put(f"/api/materials/{material.id}", json={"unit_price": 1.0}).status_code == 200
+
+def test_bill_of_quantities(client, db, catalogue):
+    plant, material, project = catalogue
+    db.add_all([
+        MaterialUsage(project_id=project.id, material_id=material.id, quantity=5, unit="m2"),
+        MaterialUsage(project_id=project.id, material_id=material.id, quantity=2.5, unit="m2"),
+        PlantLocation(project_id=project.id, plant_id=plant.id, quantity=3),
+        PlantLocation(project_id=project.id, plant_id=plant.id, quantity=1),
+    ])
+    db.commit()
+
+    bill = client.get(f"/api/projects/{project.id}/bill-of-quantities").json()
+    assert bill["materials"] == [{
+        "material_id": material.id, "name": "花岗岩", "unit": "m2", "unit_price": 120.0,
+        "quantity": 7.5, "line_items": 2, "total_cost": 900.0,
+    }]
+    assert [(row["plant_id"], row["quantity"], row["line_items"]) for row in bill["plants"]] == [(plant.id, 4, 2)]
+    assert bill["total_cost"] == 900.0
+    assert client.get("/api/projects/999/bill-of-quantities").status_code == 404
+
+def test_usage_counts_follow_line_items_and_can_be_rebuilt(db, engine, catalogue):
+    plant, material, project = catalogue
+    location = PlantLocation(project_id=project.id, plant_id=plant.id)
+    db.add_all([location, MaterialUsage(project_id=project.id, material_id=material.id, quantity=1)])
+    db.commit()
+    db.refresh(plant)
+    db.refresh(material)
+    assert (plant.usage_count, material.usage_count) == (1, 1)
+
+    db.delete(location)
+    db.commit()
+    db.refresh(plant)
+    assert plant.usage_count == 0
+
+    # 批量写入绕过ORM事件，需重新统计
+    db.execute(project_plants.insert(), [{"project_id": project.id, "plant_id": plant.id, "quantity": 1}] * 3)
+    db.commit()
+    db.refresh(plant)
+    assert plant.usage_count == 0
+    with engine.begin() as connection:
+        rebuild_plant_usage(connection)
+        rebuild_material_usage(connection)
+    db.refresh(plant)
+    db.refresh(material)
+    assert (plant.usage_count, material.usage_count) == (3, 1)
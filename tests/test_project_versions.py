@@ -0,0 +1,27 @@
+from landscape_lab.models.plant import Plant, PlantLocation
+from landscape_lab.models.project import Project
+
+def test_project_versions(client, db, make_user, login):
+    owner = login(make_user("owner"))
+    plant = Plant(name="银杏", scientific_name="Ginkgo biloba", created_by=owner.id)
+    project = Project(name="park", owner_id=owner.id)
+    db.add_all([plant, project])
+    db.commit()
+
+    first = client.post(f"/api/projects/{project.id}/versions/", params={"version": "v1"}).json()
+    db.add(PlantLocation(project_id=project.id, plant_id=plant.id, quantity=2))
+    db.commit()
+    client.put(f"/api/projects/{project.id}", json={"status": "construction"})
+    second = client.post(f"/api/projects/{project.id}/versions/", params={"version": "v2"}).json()
+    assert second["sequence"] == first["sequence"] + 1
+    assert second["change_count"] > 0
+
+    versions = client.get(f"/api/projects/{project.id}/versions/").json()
+    assert {version["version"] for version in versions} == {"v1", "v2"}
+    state = client.get(f"/api/projects/{project.id}/versions/{second['id']}").json()["state"]
+    assert state["project"]["status"] == "construction"
+
+    diff = client.get(f"/api/projects/{project.id}/versions/diff", params={
+        "base_version_id": first["id"], "target_version_id": second["id"],
+    }).json()
+    assert diff["changes"]
@@ -0,0 +1,5 @@
+from landscape_lab.benchmarks.query_plans import check_query_plans
+
+def test_hot_paths_use_indexes():
+    # 与 landscape-lab check-plans 相同：热点接口的语句不得出现全表扫描
+    assert check_query_plans() == {}
@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from landscape_lab.config import settings
+from landscape_lab.utils import state
+from landscape_lab.utils.rate_limit import RateLimiter, RateLimitMiddleware
+from landscape_lab.utils.state import MemoryStateBackend, SQLiteStateBackend
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    return MemoryStateBackend() if request.param == "memory" else SQLiteStateBackend(str(tmp_path / "state.db"))
+
+def test_token_bucket_refills(backend):
+    assert backend.take_token("bucket", rate=10, capacity=1) == 0
+    assert backend.take_token("bucket", rate=10, capacity=1) == pytest.approx(0.1, abs=0.02)
+    time.sleep(0.12)
+    assert backend.take_token("bucket", rate=10, capacity=1) == 0
+
+def test_route_bucket_is_separate_from_default(backend):
+    limiter = RateLimiter(backend, "100/second", {"GET /heavy": "1/minute"})
+    assert limiter.check("GET /heavy", "ip:1") == 0
+    assert limiter.check("GET /heavy", "ip:1") > 1
+    assert limiter.check("GET /heavy", "ip:2") == 0
+    assert limiter.check("GET /light", "ip:1") == 0
+
+def test_memory_backend_prunes_expired_entries(monkeypatch):
+    monkeypatch.setattr(state, "PRUNE_EVERY", 10)
+    backend = MemoryStateBackend()
+    backend.set("kept", 1)
+    # 每个新IP一个只写入一次的桶，第10次写入时统一清理
+    for index in range(8):
+        backend.take_token(f"ratelimit:*:ip:{index}", rate=1000, capacity=1)
+    time.sleep(0.01)
+    assert len(backend._entries) == 9
+    backend.set("trigger", 1)
+    assert set(backend._entries) == {"kept", "trigger"}
+
+@pytest.fixture
+def limited_app(monkeypatch):
+    """挂载限流中间件的最小应用，/heavy 为重型接口，调用 release 前一直等待"""
+    monkeypatch.setattr(state, "_backend", MemoryStateBackend())
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMIT_BACKEND", "")
+    monkeypatch.setattr(settings, "STATE_BACKEND", "memory")
+    monkeypatch.setattr(settings, "RATE_LIMIT_DEFAULT", "1000/minute")
+    monkeypatch.setattr(settings, "RATE_LIMITS", {"GET /limited": "2/minute"})
+    monkeypatch.setattr(settings, "CONCURRENCY_LIMITS", {"GET /heavy": 2})
+    monkeypatch.setattr(settings, "CONCURRENCY_PER_USER", 1)
+    monkeypatch.setattr(settings, "CONCURRENCY_RETRY_AFTER", 3)
+
+    app = FastAPI()
+    app.state.release = asyncio.Event()
+
+    @app.get("/limited")
+    async def limited():
+        return {"ok": True}
+
+    @app.get("/heavy")
+    async def heavy():
+        await app.state.release.wait()
+        return {"ok": True}
+
+    app.add_middleware(RateLimitMiddleware)
+    return app
+
+def run_requests(app, *ips):
+    """以各IP并发请求 /heavy：前面的请求占住名额后发出最后一个，返回 (最后一个的响应, 其余响应)"""
+    async def call():
+        app.state.release = asyncio.Event()
+        clients = [httpx.AsyncClient(transport=httpx.ASGITransport(app=app, client=(ip, 1000)),
+                                     base_url="http://test") for ip in ips]
+        try:
+            pending = [asyncio.ensure_future(client.get("/heavy")) for client in clients[:-1]]
+            await asyncio.sleep(0.05)
+            last = await clients[-1].get("/heavy")
+            app.state.release.set()
+            return last, await asyncio.gather(*pending)
+        finally:
+            for client in clients:
+                await client.aclose()
+    return asyncio.run(call())
+
+def test_rate_limit_returns_429_with_retry_after(limited_app):
+    async def call():
+        transport = httpx.ASGITransport(app=limited_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [await client.get("/limited") for _ in range(3)]
+
+    responses = asyncio.run(call())
+    assert [response.status_code for response in responses] == [200, 200, 429]
+    assert 1 <= int(responses[2].headers["Retry-After"]) <= 30
+
+def test_concurrency_cap_per_user(limited_app):
+    rejected, completed = run_requests(limited_app, "10.0.0.1", "10.0.0.1")
+    assert rejected.status_code == 429
+    assert rejected.headers["Retry-After"] == "3"
+    assert [response.status_code for response in completed] == [200]
+
+def test_concurrency_cap_per_route(limited_app):
+    rejected, completed = run_requests(limited_app, "10.0.0.1", "10.0.0.2", "10.0.0.3")
+    assert rejected.status_code == 503
+    assert rejected.headers["Retry-After"] == "3"
+    assert [response.status_code for response in completed] == [200, 200]
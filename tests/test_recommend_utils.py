@@ -0,0 +1,87 @@
+import math
+
+import pytest
+
+from landscape_lab.models.plant import Plant
+from landscape_lab.utils.recommend_utils import (
+    SUNLIGHT_LEVELS,
+    encode_soil,
+    encode_sunlight,
+    get_plant_index,
+    parse_hardiness_zone,
+    recommend_plants,
+    sun_hours_to_level
+)
+
+@pytest.fixture
+def plants(db):
+    rows = [
+        Plant(name="sun-lover", scientific_name="Sol maximus", category="tree", height=8.0,
+              sunlight="full sun", water_requirements="low", soil_type="sandy, well drained",
+              hardiness_zone="6-9"),
+        Plant(name="shade-lover", scientific_name="Umbra minor", category="shrub", height=1.0,
+              sunlight="full shade", water_requirements="high", soil_type="clay",
+              hardiness_zone="4-7"),
+        Plant(name="unknown", scientific_name="Ignotus", category="shrub"),
+        Plant(name="tropical", scientific_name="Calidus", category="tree", sunlight="full sun",
+              hardiness_zone="10-12"),
+    ]
+    db.add_all(rows)
+    db.commit()
+    return {plant.name: plant.id for plant in rows}
+
+def test_encoders_recognise_keywords():
+    assert encode_sunlight("Full sun to partial shade") == 0b011
+    assert encode_sunlight(None) == 0
+    assert encode_soil("sandy loam") == encode_soil("sand") | encode_soil("loam")
+
+def test_parse_hardiness_zone():
+    assert parse_hardiness_zone("5-9") == (5.0, 9.5)
+    assert parse_hardiness_zone("USDA 7b") == (7.5, 7.5)
+    assert all(math.isnan(value) for value in parse_hardiness_zone("n/a"))
+
+def test_sun_hours_to_level():
+    assert sun_hours_to_level(8) == 1 << SUNLIGHT_LEVELS.index("full_sun")
+    assert sun_hours_to_level(4) == 1 << SUNLIGHT_LEVELS.index("partial_shade")
+    assert sun_hours_to_level(1) == 1 << SUNLIGHT_LEVELS.index("full_shade")
+
+def test_recommend_ranks_matching_plants_first(db, plants):
+    results = recommend_plants(get_plant_index(db), sun_hours=9, water="low", soil="sand")
+    assert results[0]["id"] == plants["sun-lover"]
+    assert results[0]["score"] == 1.0
+    assert results[-1]["id"] == plants["shade-lover"]
+    # 要求未知的条件计0.5分
+    unknown = next(result for result in results if result["id"] == plants["unknown"])
+    assert unknown["scores"] == {"sunlight": 0.5, "water": 0.5, "soil": 0.5}
+
+def test_recommend_filters(db, plants):
+    index = get_plant_index(db)
+    zoned = recommend_plants(index, sunlight="full sun", hardiness_zone="8")
+    assert plants["tropical"] not in {result["id"] for result in zoned}
+    assert plants["unknown"] in {result["id"] for result in zoned}
+    shrubs = recommend_plants(index, sunlight="shade", category="Shrub", max_height=2)
+    assert {result["id"] for result in shrubs} == {plants["shade-lover"], plants["unknown"]}
+
+def test_recommend_rejects_missing_or_unknown_conditions(db, plants):
+    index = get_plant_index(db)
+    with pytest.raises(ValueError):
+        recommend_plants(index)
+    with pytest.raises(ValueError):
+        recommend_plants(index, water="sometimes")
+
+def test_recommendations_endpoint(client, plants):
+    response = client.get("/api/plants/recommendations/", params={"sun_hours": 2, "limit": 1})
+    assert response.status_code == 200
+    assert [result["id"] for result in response.json()] == [plants["shade-lover"]]
+    assert client.get("/api/plants/recommendations/").status_code == 400
+
+def test_cli_import_refreshes_index(db, plants, tmp_path):
+    from argparse import Namespace
+
+    from landscape_lab.cli import import_data
+
+    assert len(get_plant_index(db)) == 4
+    path = tmp_path / "plants.csv"
+    path.write_text("name,scientific_name,sunlight\nimported,Novus importus,full sun\n")
+    assert import_data(Namespace(table="plants", path=path, batch_size=100)) == 0
+    assert len(get_plant_index(db)) == 5
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from landscape_lab.models.revoked_token import RevokedToken
+from landscape_lab.utils.security import (
+    REVOKED_TOKENS_VERSION_KEY,
+    create_token_pair,
+    is_token_revoked,
+    revoke_token
+)
+from landscape_lab.utils.state import get_state_backend
+
+@pytest.fixture
+def tokens(make_user):
+    return create_token_pair(make_user("alice").username)
+
+def refresh(client, token: str):
+    return client.post("/users/token/refresh", json={"refresh_token": token})
+
+def test_refresh_rotates_tokens(client, tokens):
+    response = refresh(client, tokens["refresh_token"])
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+    headers = {"Authorization": f"Bearer {rotated['access_token']}"}
+    assert client.get("/users/me", headers=headers).json()["username"] == "alice"
+    assert refresh(client, rotated["refresh_token"]).status_code == 200
+
+def test_replayed_refresh_token_revokes_family(client, tokens):
+    rotated = refresh(client, tokens["refresh_token"]).json()
+    # 已使用的刷新令牌再次出现：拒绝，并吊销同族的所有令牌
+    assert refresh(client, tokens["refresh_token"]).status_code == 401
+    assert refresh(client, rotated["refresh_token"]).status_code == 401
+
+def test_token_types_are_not_interchangeable(client, tokens):
+    assert refresh(client, tokens["access_token"]).status_code == 401
+    headers = {"Authorization": f"Bearer {tokens['refresh_token']}"}
+    assert client.get("/users/me", headers=headers).status_code == 401
+
+def test_unrevoked_ids_skip_the_database(db, engine):
+    revoke_token(db, "revoked", datetime.utcnow() + timedelta(days=1))
+    assert is_token_revoked(db, "revoked")
+
+    statements = []
+    def record(*args):
+        statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        assert not is_token_revoked(db, "live")
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert statements == []
+
+def test_revocations_by_other_workers_are_loaded(db):
+    assert not is_token_revoked(db, "family")
+    # 模拟其他工作进程：直接写入数据库并递增共享版本号
+    db.add(RevokedToken(jti="family", expires_at=datetime.utcnow() + timedelta(days=1)))
+    db.commit()
+    assert not is_token_revoked(db, "family")
+    get_state_backend().incr(REVOKED_TOKENS_VERSION_KEY)
+    assert is_token_revoked(db, "family")
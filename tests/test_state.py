@@ -0,0 +1,64 @@
+import time
+
+import pytest
+
+from landscape_lab.config import settings
+from landscape_lab.utils import state
+from landscape_lab.utils.state import (
+    JOB_LOCK_PREFIX,
+    MemoryStateBackend,
+    SQLiteStateBackend,
+    finish_job,
+    get_job_status,
+    start_job,
+    update_job
+)
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path, monkeypatch):
+    backend = MemoryStateBackend() if request.param == "memory" else SQLiteStateBackend(str(tmp_path / "state.db"))
+    monkeypatch.setattr(state, "_backend", backend)
+    monkeypatch.setattr(settings, "JOB_LOCK_TTL_SECONDS", 1)
+    return backend
+
+def test_job_lifecycle(backend):
+    assert start_job("job")
+    assert not start_job("job")
+    update_job("job", imported=10)
+    assert get_job_status("job")["imported"] == 10
+    finish_job("job", True, imported=12)
+    assert get_job_status("job")["status"] == "done"
+    assert backend.get(JOB_LOCK_PREFIX + "job") is None
+    assert start_job("job")
+    finish_job("job", False)
+
+def test_running_job_keeps_its_lock(backend):
+    assert start_job("job")
+    time.sleep(settings.JOB_LOCK_TTL_SECONDS * 2)
+    assert not start_job("job")
+    finish_job("job", True)
+
+def test_lock_of_dead_worker_expires(backend):
+    # 被终止的进程不再续期
+    backend.add(JOB_LOCK_PREFIX + "job", 1, ttl=settings.JOB_LOCK_TTL_SECONDS)
+    assert not start_job("job")
+    time.sleep(settings.JOB_LOCK_TTL_SECONDS + 0.2)
+    assert start_job("job")
+    finish_job("job", True)
+
+def test_job_of_dead_worker_reports_failed(backend):
+    assert start_job("job")
+    update_job("job", imported=3)
+    # 模拟进程被终止：续期线程与锁一起消失
+    state._job_heartbeats.pop("job")[1].set()
+    backend.delete(JOB_LOCK_PREFIX + "job")
+    job_status = get_job_status("job")
+    assert (job_status["status"], job_status["imported"]) == ("failed", 3)
+    assert start_job("job")
+    assert get_job_status("job")["status"] == "running"
+    finish_job("job", True)
+
+def test_token_bucket(backend):
+    assert backend.take_token("bucket", rate=1, capacity=2) == 0
+    assert backend.take_token("bucket", rate=1, capacity=2) == 0
+    assert backend.take_token("bucket", rate=1, capacity=2) > 0
@@ -1,25 +0,0 @@
-# landscape_lab/models/user.py
-from datetime import datetime
-from typing import Optional
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
-from sqlalchemy.orm import relationship
-from database.db import Base
-
-class User(Base):
-    """用户模型"""
-    __tablename__ = "users"
-
-    id = Column(Integer, primary_key=True, index=True)
-    username = Column(String(50), unique=True, index=True, nullable=False)
-    email = Column(String(100), unique=True, index=True, nullable=False)
-    hashed_password = Column(String(255), nullable=False)
-    is_active = Column(Boolean, default=True)
-    is_superuser = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-
-    # 关系
-    projects = relationship("Project", back_populates="owner")
-
-    def __repr__(self):
-        return f"<User(id={self.id}, username={self.username})>"